@@ -1,8 +1,24 @@
-import json
-import os
+import time
+from config.settings import settings
 from scripts.generation.ad_script_genrator import AdScriptGenerator
+from scripts.utils.instrumentation import metrics
 
-def get_script(target_brand,live_moment):
+_generator = None
+
+def get_generator():
+    """One long-lived generator (and BrandManager) per process."""
+    global _generator
+    if _generator is None:
+        _generator = AdScriptGenerator()
+    return _generator
+
+def get_script(target_brand,live_moment, outputs=None):
+    """
+    Writes and saves one ad script for `target_brand` around `live_moment`.
+    Returns {"brand", "script", "path"}, or None if generation failed.
+    `outputs` (settings.output_paths()) says where the script is written.
+    """
+    outputs = outputs or settings.output_paths()
     # ==========================================
     # 1. DEFINE INPUTS
     # ==========================================
@@ -15,8 +31,8 @@ def get_script(target_brand,live_moment):
     # ==========================================
     # 2. INITIALIZE GENERATOR
     # ==========================================
-    # This initializes the Azure OpenAI client and the Brand Manager
-    generator = AdScriptGenerator()
+    # Reused across calls: the Brand Manager and the pooled Azure transport
+    generator = get_generator()
 
     # ==========================================
     # 3. GENERATE SCRIPT
@@ -34,16 +50,39 @@ def get_script(target_brand,live_moment):
         # ==========================================
         # 4. SAVE OUTPUT
         # ==========================================
-        output_dir = "data/output_scripts"
-        os.makedirs(output_dir, exist_ok=True)
-        
-        filename = f"{target_brand}_{live_moment['event_type']}_{live_moment['start_time'].replace(':','-')}.txt"
-        output_path = os.path.join(output_dir, filename)
-        
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(final_script)
-            
+        output_path = generator.save_script(target_brand, live_moment, final_script, output_dir=outputs["scripts"])
         print(f"\n✅ Script saved to: {output_path}")
+        metrics.write_report()
+        return {"brand": target_brand, "script": final_script, "path": output_path}
 
     except Exception as e:
         print(f"\n❌ Error generating script: {e}")
+        return None
+
+
+def get_scripts(target_brands, live_moments, max_concurrency=None, outputs=None):
+    """
+    Scripts for every sponsor brand × moment, generated concurrently.
+    Yields each result (see AdScriptGenerator.create_scripts) as soon as it is saved
+    to outputs["scripts"] (settings.output_paths() by default).
+    """
+    outputs = outputs or settings.output_paths()
+    generator = get_generator()
+    print(f"🚀 Generating {len(target_brands)} brands × {len(live_moments)} moments of ad scripts...")
+
+    done = failed = 0
+    t0 = time.perf_counter()
+    for result in generator.create_scripts(target_brands, live_moments, max_concurrency=max_concurrency):
+        if result["script"] is None:
+            failed += 1
+            print(f"❌ {result['brand']} / {result['moment'].get('event_type')}: {result['error']}")
+        else:
+            done += 1
+            result["path"] = generator.save_script(result["brand"], result["moment"], result["script"],
+                                                   output_dir=outputs["scripts"])
+            print(f"✨ {result['brand']} / {result['moment'].get('event_type')} "
+                  f"({result['seconds']:.1f}s) -> {result['path']}")
+        yield result
+
+    print(f"\n✅ {done} scripts saved, {failed} failed in {time.perf_counter() - t0:.1f}s")
+    metrics.write_report()
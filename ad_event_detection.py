@@ -1,25 +1,34 @@
 import os
 import json
 from config.settings import settings
-from src.detection.transcriber import Transcriber
-from src.detection.event_finder import EventFinder
-from src.detection.confidence import ConfidenceRefiner
-from src.utils.transcript_utils import TranscriptUtils
-from src.media.video_manager import VideoManager
+from scripts.detection.transcriber import Transcriber
+from scripts.detection.batch_event_finder import BatchEventFinder
+from scripts.detection.confidence import ConfidenceRefiner
+from scripts.detection.rule_detector import RuleEventDetector
+from scripts.utils.transcript_utils import TranscriptUtils
+from scripts.utils.transcript_index import TranscriptIndex
+from scripts.media.video_manager import VideoManager
+from scripts.detection.live_detector import LiveEventDetector
+from scripts.utils.instrumentation import metrics
 
-def get_event(video_path):
-    
+def get_event(video_path, outputs=None):
+    """
+    Transcribes `video_path` and detects its events (cutting highlight clips when
+    EXTRACT_CLIPS is set). Returns the events, most confident first, or None if the
+    video is missing. `outputs` (settings.output_paths()) says where files are written.
+    """
     if not os.path.exists(video_path):
         print(f"❌ Video not found: {video_path}")
         return
+    outputs = outputs or settings.output_paths()
 
     # 2. Transcribe
     transcriber = Transcriber()
     segments = transcriber.create_transcript(video_path)
     
     # Save transcript
-    os.makedirs(os.path.dirname(settings.TRANSCRIPT_FILE), exist_ok=True)
-    with open(settings.TRANSCRIPT_FILE, "w") as f:
+    os.makedirs(os.path.dirname(outputs["transcript"]), exist_ok=True)
+    with open(outputs["transcript"], "w") as f:
         json.dump(segments, f, indent=2)
 
     # 3. Filter & Detect
@@ -28,30 +37,33 @@ def get_event(video_path):
     else:
         candidate_segments = segments
 
-    # Limit payload
-    candidate_segments = candidate_segments[:150]
+    # Token-budgeted batches over all candidates, sent concurrently
+    finder = BatchEventFinder()
+
+    # The index serves the refiner's context lookups and the clip boundary snapping
+    index = TranscriptIndex.from_segments(segments)
+
+    # Unambiguous fours/sixes/wickets/milestones are resolved locally; the rest go to the LLM
+    rule_events = []
+    if settings.RULE_DETECTOR_ENABLED:
+        rule_events, candidate_segments = RuleEventDetector().split(candidate_segments, planner=finder, index=index)
 
-    finder = EventFinder()
-    raw_events = finder.detect_events_via_llm(candidate_segments)
+    raw_events = finder.detect_events(candidate_segments)
     
-    print(f"🧩 Detected {len(raw_events)} potential events.")
+    print(f"🧩 Detected {len(raw_events)} potential events ({len(rule_events)} more from rules).")
 
-    # 4. Refine Confidence
+    # 4. Refine Confidence in one pass, folding duplicate reports together
+    #    (rule events already carry a score from the same refiner)
     refiner = ConfidenceRefiner()
-    final_events = []
-
-    for event in raw_events:
-        llm_conf = event.get("confidence", 0.5)
-        new_conf = refiner.refine(event, segments, llm_conf)
-        event["confidence"] = new_conf
-        final_events.append(event)
+    final_events = refiner.refine_batch(raw_events, index)
+    final_events = BatchEventFinder.merge_events(final_events + rule_events)
 
     # 5. Save Detected Events
     final_events.sort(key=lambda x: x["confidence"], reverse=True)
-    with open(settings.DETECTED_EVENTS_FILE, "w") as f:
+    with open(outputs["events"], "w") as f:
         json.dump(final_events, f, indent=2)
 
-    print(f"✅ Saved events to {settings.DETECTED_EVENTS_FILE}")
+    print(f"✅ Saved events to {outputs['events']}")
 
     # --- OPTIONAL STEP: Extract Highlight Clips ---
     if settings.EXTRACT_CLIPS:
@@ -63,9 +75,34 @@ def get_event(video_path):
         if high_confidence_events:
             mgr = VideoManager()
             # Extract clips with a 2-second buffer
-            mgr.extract_event_clips(video_path, high_confidence_events, buffer_seconds=2.0)
-            print(f"✅ Extracted {len(high_confidence_events)} clips to assets/video_clips/highlights/")
+            mgr.extract_event_clips(video_path, high_confidence_events, buffer_seconds=2.0, index=index,
+                                    clips_dir=outputs["clips"])
+            print(f"✅ Extracted {len(high_confidence_events)} clips to {os.path.join(outputs['clips'], 'highlights')}/")
         else:
             print("⚠️ No high-confidence events found to extract.")
     else:
         print("\n⏩ Skipping clip extraction (EXTRACT_CLIPS = False)")
+
+    metrics.write_report()
+    return final_events
+
+
+def get_event_stream(source, follow=False):
+    """
+    Live mode: yields events while the match is still playing.
+    `source` is a growing video/audio file (with follow=True) or any ffmpeg input URL.
+    """
+    detector = LiveEventDetector()
+    print(f"📡 Streaming events from {source} "
+          f"({detector.window_seconds:.0f}s windows, {detector.overlap_seconds:.0f}s overlap)...")
+
+    for event in detector.stream_events(source, follow=follow):
+        print(f"⚡ {event.get('event_type')} @ {event.get('start_time')} "
+              f"(conf {event['confidence']}, lag {event['lag_seconds']:.1f}s)")
+        yield event
+
+    if detector.lags:
+        avg_lag = sum(detector.lags) / len(detector.lags)
+        print(f"✅ Stream ended. {len(detector.lags)} events, avg lag {avg_lag:.1f}s, max lag {max(detector.lags):.1f}s, "
+              f"{detector.llm_calls_avoided} LLM calls avoided by rules")
+    metrics.write_report()
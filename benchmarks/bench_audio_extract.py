@@ -0,0 +1,96 @@
+"""
+Compares audio extraction paths: the legacy moviepy WAV round-trip vs the ffmpeg pipe decoder.
+
+Each path runs in a fresh subprocess so import cost and peak RSS are isolated:
+
+    python -m benchmarks.bench_audio_extract path/to/match.mp4 [--repeat 3]
+"""
+import os
+import sys
+import json
+import time
+import wave
+import argparse
+import resource
+import subprocess
+import numpy as np
+
+MODES = ["moviepy_wav", "ffmpeg_pipe", "ffmpeg_mmap"]
+
+
+def _peak_rss_mb():
+    # ru_maxrss is KiB on Linux; children covers the ffmpeg subprocesses
+    self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    child_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return round(self_rss, 1), round(child_rss, 1)
+
+
+def run_child(mode, video_path):
+    t0 = time.perf_counter()
+    from config.settings import settings
+
+    if mode == "moviepy_wav":
+        from moviepy.editor import VideoFileClip
+        wav_path = f"bench_audio_{os.getpid()}.wav"
+        video = VideoFileClip(video_path)
+        video.audio.write_audiofile(
+            wav_path, fps=settings.AUDIO_SAMPLE_RATE, nbytes=2,
+            codec='pcm_s16le', verbose=False, logger=None
+        )
+        video.close()
+        # Whisper reads the WAV back before it can start
+        with wave.open(wav_path, "rb") as wf:
+            pcm = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+            channels = wf.getnchannels()
+        samples = pcm.reshape(-1, channels).mean(axis=1).astype(np.float32) / 32768.0
+        os.remove(wav_path)
+    else:
+        from scripts.media.audio_decoder import AudioDecoder
+        threshold = 0 if mode == "ffmpeg_mmap" else None
+        samples = AudioDecoder().decode(video_path, mmap_threshold_seconds=threshold)
+        # Touch every page so memmap reads are counted
+        float(np.asarray(samples).sum())
+
+    wall = time.perf_counter() - t0
+    self_rss, child_rss = _peak_rss_mb()
+    print(json.dumps({
+        "mode": mode,
+        "wall_s": round(wall, 3),
+        "samples": int(len(samples)),
+        "peak_rss_mb": self_rss,
+        "peak_child_rss_mb": child_rss,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("video_path")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.video_path)
+        return
+
+    results = []
+    for mode in args.modes:
+        runs = []
+        for _ in range(args.repeat):
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_audio_extract", args.video_path, "--child", mode],
+                capture_output=True, text=True, check=True
+            )
+            runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+        best = min(runs, key=lambda r: r["wall_s"])
+        best["peak_rss_mb"] = max(r["peak_rss_mb"] for r in runs)
+        results.append(best)
+        print(f"{mode:<12} wall {best['wall_s']:>7.2f}s   peak RSS {best['peak_rss_mb']:>7.1f} MB "
+              f"(+{best['peak_child_rss_mb']:.1f} MB ffmpeg)")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+New-brand onboarding against a stubbed Firecrawl and a local mock Azure endpoint:
+concurrent scraping with early stop and dedupe vs the one-at-a-time baseline.
+
+    python -m benchmarks.bench_brand_scrape [--urls 5] [--latency 1.0] [--slow 10]
+"""
+import json
+import time
+import random
+import argparse
+import tempfile
+from config.settings import settings
+from scripts.utils.brand_manger import BrandManager
+from benchmarks.mock_services import MockAzureServer, MockFirecrawl
+
+
+def synthetic_pages(n, chars=9000, seed=0):
+    rng = random.Random(seed)
+    vocab = "brand campaign bold energy fans stadium heritage trust speed flavour champion".split()
+    pages = {}
+    for i in range(n):
+        text = " ".join(rng.choice(vocab) + str(rng.randint(0, 999)) for _ in range(chars // 8))
+        pages[f"https://brand.example/page{i}"] = text
+    # A syndicated copy of the first page with a different footer
+    pages["https://mirror.example/page0"] = pages["https://brand.example/page0"] + " republished with permission"
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--urls", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=1.0, help="seconds per scrape")
+    parser.add_argument("--slow", type=float, default=10.0, help="latency of one straggler URL")
+    args = parser.parse_args()
+
+    pages = synthetic_pages(args.urls - 1)
+    latency = {url: args.latency for url in pages}
+    latency[list(pages)[-2]] = args.slow
+
+    baseline = sum(latency.values())  # sequential scrapes, no early stop
+    manager = BrandManager(firecrawl=MockFirecrawl(pages, latency=latency))
+    with MockAzureServer() as azure, tempfile.TemporaryDirectory() as tmp:
+        settings.AZURE_CHAT_URL = azure.url
+        t0 = time.perf_counter()
+        manager._build_knowledge_base("Bench", tmp, f"{tmp}/bench_insights.json")
+        elapsed = time.perf_counter() - t0
+
+    print(json.dumps({
+        "urls": len(pages),
+        "sequential_scrape_s": round(baseline, 3),
+        "concurrent_build_s": round(elapsed, 3),
+        "speedup": round(baseline / elapsed, 2),
+        "per_url": manager.last_scrape_report,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Frames scored per second by FrameScorer on CPU.
+
+    python -m benchmarks.bench_frame_scoring [--video path/to/match.mp4] [--frames 512] [--batch 8]
+
+Without --video, synthetic 720p frames are used; with it, frames are decoded from the
+video first (decode time is reported separately).
+"""
+import json
+import time
+import argparse
+import numpy as np
+from scripts.media.frame_scorer import FrameScorer
+
+
+def synthetic_frames(n, height=720, width=1280, seed=0):
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+    # Shift the same texture around so batches contain both similar and cut-like neighbours
+    return [np.roll(base, shift=i * 7, axis=1) if i % 10 else 255 - base for i in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--video")
+    parser.add_argument("--frames", type=int, default=512)
+    parser.add_argument("--batch", type=int, default=8, help="candidates per scene")
+    parser.add_argument("--width", type=int, default=None)
+    args = parser.parse_args()
+
+    decode_s = 0.0
+    if args.video:
+        from scripts.media.frame_sampler import FrameSampler
+        sampler = FrameSampler()
+        duration = sampler.duration(args.video)
+        timestamps = np.linspace(0, duration, args.frames, endpoint=False).tolist()
+        t0 = time.perf_counter()
+        frames = [f for f in sampler.sample(args.video, timestamps) if f is not None]
+        decode_s = time.perf_counter() - t0
+    else:
+        frames = synthetic_frames(args.frames)
+
+    scorer = FrameScorer(width=args.width)
+    scorer.best_index(frames[:args.batch])  # warm-up
+
+    t0 = time.perf_counter()
+    picks = [scorer.best_index(frames[i:i + args.batch]) for i in range(0, len(frames), args.batch)]
+    score_s = time.perf_counter() - t0
+
+    result = {
+        "frames": len(frames),
+        "frame_shape": list(frames[0].shape),
+        "batch": args.batch,
+        "score_width": scorer.width,
+        "score_s": round(score_s, 4),
+        "frames_scored_per_s": round(len(frames) / score_s, 1),
+        "scenes": len(picks),
+    }
+    if args.video:
+        result["decode_s"] = round(decode_s, 3)
+        result["frames_decoded_per_s"] = round(len(frames) / decode_s, 1)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Startup guard: imports each pipeline entry point in a fresh interpreter under
+`python -X importtime` and reports its cumulative import time, peak RSS and the
+slowest modules it pulled in. Exits non-zero when an entry point imports a heavy
+dependency (torch, faster_whisper, cv2, ...) at module level or goes over budget.
+
+    python -m benchmarks.bench_import_time [--repeat 5] [--budget-ms 500] [--top 5]
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ENTRY_POINTS = [
+    "config.settings",
+    "cli",
+    "Ad_script_pipline",
+    "ad_event_detection",
+    "storyboard_pipeline",
+    "match_job_pipeline",
+]
+# Only needed once work starts; none of these may load on a bare import
+HEAVY_MODULES = ["torch", "faster_whisper", "ctranslate2", "cv2", "PIL", "moviepy",
+                 "openai", "firecrawl", "dotenv", "requests"]
+
+CHILD = """
+import json, resource, sys
+import {module}
+print(json.dumps({{
+    "heavy": [m for m in {heavy!r} if m in sys.modules],
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}}))
+"""
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth), ...] from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cum_us), depth))
+    return rows
+
+
+def measure(module):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr.splitlines()[-1] if proc.stderr else ''}")
+    rows = parse_importtime(proc.stderr)
+    child = json.loads(proc.stdout.strip().splitlines()[-1])
+    # importtime lists children before their parent; the entry point's line is the last
+    # top-level row for it and covers everything it imported that startup hadn't already
+    end = max(i for i, r in enumerate(rows) if r[0] == module and r[3] == 0)
+    start = end
+    while start > 0 and rows[start - 1][3] > 0:
+        start -= 1
+    return rows[end][2], rows[start:end], child
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=500.0,
+                        help="fail when an entry point's median import time exceeds this")
+    parser.add_argument("--top", type=int, default=5, help="slowest direct imports to list per entry point")
+    parser.add_argument("modules", nargs="*", default=ENTRY_POINTS)
+    args = parser.parse_args()
+
+    results, failures = {}, []
+    for module in args.modules:
+        totals = []
+        for _ in range(max(1, args.repeat)):
+            total_us, rows, child = measure(module)
+            totals.append(total_us)
+        import_ms = statistics.median(totals) / 1000
+        direct = sorted((r for r in rows if r[3] == 1), key=lambda r: r[2], reverse=True)[:args.top]
+        results[module] = {
+            "import_ms": round(import_ms, 1),
+            "min_ms": round(min(totals) / 1000, 1),
+            "max_rss_mb": round(child["max_rss_mb"], 1),
+            "heavy_imported": child["heavy"],
+            "slowest": {name: round(cum / 1000, 1) for name, _, cum, _ in direct},
+        }
+        if child["heavy"]:
+            failures.append(f"{module} imports {', '.join(child['heavy'])} at module level")
+        if import_ms > args.budget_ms:
+            failures.append(f"{module} takes {import_ms:.0f}ms to import (budget {args.budget_ms:.0f}ms)")
+
+    print(json.dumps(results, indent=2))
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"✅ {len(results)} entry points import without heavy dependencies, within {args.budget_ms:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Microbenchmark: per-call regex building vs the precompiled KeywordIndex, on a
+synthetic 3-hour commentary transcript.
+
+    python -m benchmarks.bench_keyword_index [--hours 3] [--repeat 5]
+"""
+import re
+import json
+import time
+import argparse
+from config.settings import settings
+from scripts.utils.keyword_index import keyword_index
+from scripts.utils.transcript_utils import TranscriptUtils
+from scripts.detection.confidence import ConfidenceRefiner
+from benchmarks.fixtures import synthetic_match_transcript
+
+def legacy_prefilter(segments):
+    kw_regex = re.compile(r"\b(" + "|".join(re.escape(k) for k in settings.KEYWORDS) + r")\b", flags=re.I)
+    return [s for s in segments if kw_regex.search(s["text"])]
+
+
+def legacy_keyword_strength(event_type, excerpt):
+    excerpt_lower = excerpt.lower()
+    score = 0.2
+    for pattern in settings.EVENT_KEYWORDS.get(event_type, []):
+        if re.search(pattern, excerpt_lower): score += 0.4
+    return min(1.0, score)
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, default=3.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # ~4 s segments, a quarter of them carrying cricket keywords
+    segments = synthetic_match_transcript(int(args.hours * 3600 / 4), event_ratio=0.25)
+    events = [{"event_type": t, "excerpt": s["text"]}
+              for s in segments for t in ("four", "six", "wicket", "winning_celebration")]
+    refiner = ConfidenceRefiner()
+
+    # Same answers before timing anything
+    assert legacy_prefilter(segments) == TranscriptUtils.prefilter_segments(segments)
+    assert all(legacy_keyword_strength(e["event_type"], e["excerpt"]) ==
+               refiner._calculate_keyword_strength(e["event_type"], e["excerpt"]) for e in events)
+
+    # Streaming/word-level callers prefilter many small batches, paying the build each call
+    batches = [segments[i:i + 8] for i in range(0, len(segments), 8)]
+    timings = {
+        "prefilter_whole_legacy_s": best_of(lambda: legacy_prefilter(segments), args.repeat),
+        "prefilter_whole_index_s": best_of(lambda: TranscriptUtils.prefilter_segments(segments), args.repeat),
+        "prefilter_batched_legacy_s": best_of(lambda: [legacy_prefilter(b) for b in batches], args.repeat),
+        "prefilter_batched_index_s": best_of(lambda: [TranscriptUtils.prefilter_segments(b) for b in batches], args.repeat),
+        "keyword_strength_legacy_s": best_of(
+            lambda: [legacy_keyword_strength(e["event_type"], e["excerpt"]) for e in events], args.repeat),
+        "keyword_strength_index_s": best_of(
+            lambda: [refiner._calculate_keyword_strength(e["event_type"], e["excerpt"]) for e in events], args.repeat),
+        "scan_index_s": best_of(lambda: [keyword_index.scan(s["text"]) for s in segments], args.repeat),
+    }
+    result = {"segments": len(segments), "events_scored": len(events),
+              **{k: round(v, 4) for k, v in timings.items()}}
+    for name in ("prefilter_whole", "prefilter_batched", "keyword_strength"):
+        result[f"{name}_speedup"] = round(timings[f"{name}_legacy_s"] / timings[f"{name}_index_s"], 2)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
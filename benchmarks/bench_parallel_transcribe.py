@@ -0,0 +1,64 @@
+"""
+Measures how chunked multi-process transcription scales with worker count on CPU.
+
+    python -m benchmarks.bench_parallel_transcribe path/to/match.mp4 [--workers 1 2 4 8]
+
+Model loads happen in a warm-up pass per worker count and are excluded from the timing.
+"""
+import os
+import json
+import time
+import argparse
+from config.settings import settings
+from scripts.media.audio_decoder import AudioDecoder
+from scripts.detection.parallel_transcriber import ParallelTranscriber
+
+
+def main():
+    cpu_count = os.cpu_count() or 1
+    default_workers = [n for n in (1, 2, 4, 8, 16) if n <= cpu_count]
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("video_path")
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers)
+    parser.add_argument("--chunk-seconds", type=float, default=settings.PARALLEL_CHUNK_SECONDS)
+    parser.add_argument("--limit-seconds", type=float, default=None, help="only use the first N seconds of audio")
+    args = parser.parse_args()
+
+    audio = AudioDecoder().decode(args.video_path)
+    if args.limit_seconds:
+        audio = audio[:int(args.limit_seconds * settings.AUDIO_SAMPLE_RATE)]
+    audio_seconds = len(audio) / settings.AUDIO_SAMPLE_RATE
+
+    results = []
+    baseline = None
+    for n in args.workers:
+        pt = ParallelTranscriber(num_workers=n, chunk_seconds=args.chunk_seconds)
+        try:
+            # Warm up: overlapping sleeps force every worker to spawn and load its model
+            for f in [pt._get_executor().submit(time.sleep, 0.5) for _ in range(n)]:
+                f.result()
+
+            t0 = time.perf_counter()
+            segments = pt.transcribe(audio)
+            elapsed = time.perf_counter() - t0
+        finally:
+            pt.close()
+
+        baseline = baseline or elapsed
+        results.append({
+            "workers": n,
+            "threads_per_worker": pt.cpu_threads,
+            "wall_s": round(elapsed, 2),
+            "speedup": round(baseline / elapsed, 2),
+            "realtime_factor": round(audio_seconds / elapsed, 2),
+            "segments": len(segments),
+        })
+        print(f"{n:>3} workers  {elapsed:>8.1f}s  speedup {baseline / elapsed:>5.2f}x  "
+              f"{audio_seconds / elapsed:>6.1f}x real time  ({len(segments)} segments)")
+
+    print(json.dumps({"audio_seconds": round(audio_seconds, 1), "cpu_count": cpu_count, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
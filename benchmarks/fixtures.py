@@ -0,0 +1,124 @@
+"""
+Deterministic synthetic inputs for the benchmarks: a word-level cricket commentary
+transcript and a short "match" video with speech-like audio.
+
+    transcript = synthetic_match_transcript(segments=3000)
+    video = synthetic_match_video("benchmarks/.fixtures", seconds=60)
+"""
+import os
+import shutil
+import random
+import subprocess
+import numpy as np
+
+FILLER = ("the bowler runs in and delivers length ball outside off pushed into the covers "
+          "no run there good fielding crowd is quiet field set deep square leg short of a length "
+          "defended back down the pitch dot ball keeps the pressure on").split()
+PHRASES = ["that's a six", "four runs", "bowled him", "caught at slip", "not out says the umpire",
+           "huge one over long on", "fifty for the captain", "end of the over", "what a victory",
+           "almost a six?", "that's out", "to the fence", "dropped at midwicket", "review taken"]
+
+
+def synthetic_match_transcript(segments=3000, event_ratio=0.2, seed=0):
+    """
+    Word-level segments in the Transcriber output format: ~4 s each, ~11 words at
+    realistic pacing with short pauses, `event_ratio` of them carrying an event phrase.
+    """
+    rng = random.Random(seed)
+    out, t = [], 0.0
+    for seg_idx in range(1, segments + 1):
+        tokens = [rng.choice(FILLER) for _ in range(rng.randint(8, 12))]
+        if rng.random() < event_ratio:
+            tokens.insert(rng.randint(0, len(tokens)), rng.choice(PHRASES))
+        words, w_t = [], t
+        for w_idx, token in enumerate(" ".join(tokens).split(), start=1):
+            duration = 0.12 + 0.04 * len(token) + rng.random() * 0.1
+            words.append({"word_index": w_idx, "word": " " + token, "start": round(w_t, 3),
+                          "end": round(w_t + duration, 3)})
+            # Mostly run-on speech, sometimes a breath long enough to snap to
+            w_t += duration + (rng.uniform(0.35, 0.8) if rng.random() < 0.1 else rng.uniform(0.0, 0.08))
+        seg_end = words[-1]["end"]
+        out.append({
+            "segment_index": seg_idx,
+            "segment_start": words[0]["start"],
+            "segment_end": seg_end,
+            "text": "".join(w["word"] for w in words).strip(),
+            "words": words,
+        })
+        t = seg_end + rng.uniform(0.2, 0.6)
+    return out
+
+
+def synthetic_events(transcript, seed=0):
+    """LLM-style events for the phrase-carrying segments, some reported twice (as batch overlaps do)."""
+    from scripts.utils.transcript_utils import TranscriptUtils
+    rng = random.Random(seed)
+    kinds = {"six": "six", "four": "four", "fence": "four", "bowled": "wicket", "caught": "wicket",
+             "out": "wicket", "fifty": "fifty_century", "victory": "winning_celebration"}
+    events = []
+    for seg in transcript:
+        event_type = next((v for k, v in kinds.items() if k in seg["text"].split()), None)
+        if event_type is None:
+            continue
+        event = {
+            "event_type": event_type,
+            "start_time": TranscriptUtils.format_seconds(seg["segment_start"]),
+            "end_time": TranscriptUtils.format_seconds(seg["segment_end"] + rng.uniform(0, 6)),
+            "confidence": round(rng.uniform(0.5, 0.95), 2),
+            "excerpt": seg["text"],
+            "notes": "synthetic",
+        }
+        events.append(event)
+        if rng.random() < 0.15:
+            events.append(dict(event, confidence=round(rng.uniform(0.4, 0.9), 2)))
+    return events
+
+
+def synthetic_match_video(directory, seconds=60, fps=25, width=640, height=360, seed=0):
+    """
+    Writes (once, then reuses) a test video and returns {"path", "has_audio", "seconds"}.
+    With ffmpeg: H.264 test pattern plus AAC audio whose carrier is amplitude-modulated at
+    syllable rate with pauses, close enough to speech for decoding and VAD-style work.
+    Without ffmpeg: a silent mp4v video written by OpenCV, with a scene change every 5 s.
+    """
+    os.makedirs(directory, exist_ok=True)
+    name = f"match_{seconds}s_{width}x{height}_{fps}fps_{seed}"
+    if shutil.which("ffmpeg"):
+        path = os.path.join(directory, f"{name}.mp4")
+        if not os.path.exists(path):
+            # 4 Hz syllables, gated off for ~0.6 s every 3 s, over a 140-220 Hz gliding voice
+            voice = ("(0.6*sin(2*PI*(180+40*sin(2*PI*0.3*t))*t)+0.2*sin(2*PI*360*t))"
+                     "*(0.5+0.5*sin(2*PI*4*t))*gt(mod(t,3),0.6)")
+            tmp_path = f"{path}.tmp.mp4"
+            subprocess.run([
+                "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error", "-y",
+                "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate={fps}:duration={seconds}",
+                "-f", "lavfi", "-i", f"aevalsrc='{voice}+0.02*(random(0)-0.5)':s=44100:d={seconds}",
+                "-c:v", "libx264", "-preset", "veryfast", "-g", str(fps * 2), "-pix_fmt", "yuv420p",
+                "-c:a", "aac", "-b:a", "96k", "-shortest", tmp_path,
+            ], check=True)
+            os.replace(tmp_path, path)
+        return {"path": path, "has_audio": True, "seconds": seconds}
+
+    import cv2
+    path = os.path.join(directory, f"{name}_silent.mp4")
+    if not os.path.exists(path):
+        rng = np.random.default_rng(seed)
+        tmp_path = f"{path}.tmp.mp4"
+        writer = cv2.VideoWriter(tmp_path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+        yy, xx = np.mgrid[0:height, 0:width]
+        scene = None
+        for i in range(int(seconds * fps)):
+            if i % (5 * fps) == 0:
+                scene = rng.integers(0, 256, size=3)
+            # A moving gradient and ball, so frames differ in sharpness and content
+            frame = np.empty((height, width, 3), dtype=np.uint8)
+            shift = (xx + i * 4) % width
+            for c in range(3):
+                frame[..., c] = (shift * scene[c] // width + yy * (255 - scene[c]) // height) % 256
+            cx, cy = (i * 7) % width, height // 2 + int(60 * np.sin(i / 10))
+            cv2.circle(frame, (cx, cy), 18, (255, 255, 255), -1)
+            writer.write(frame)
+        writer.release()
+        os.replace(tmp_path, path)
+    return {"path": path, "has_audio": False, "seconds": seconds}
@@ -0,0 +1,161 @@
+"""
+Local stand-ins for external services so pipelines can be exercised offline.
+
+    with MockAzureServer(latency=0.2) as azure:
+        finder = BatchEventFinder(url=azure.url)
+        events = finder.detect_events(segments)
+
+    brand_manager = BrandManager(firecrawl=MockFirecrawl({"https://brand.example/about": "..."}))
+"""
+import re
+import json
+import time
+import threading
+from types import SimpleNamespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+EVENT_RULES = [
+    ("six", re.compile(r"\b(six|sixer|maximum)\b", re.I)),
+    ("four", re.compile(r"\b(four|boundary)\b", re.I)),
+    ("wicket", re.compile(r"\b(bowled|caught|lbw|stumped|run out)\b", re.I)),
+    ("fifty_century", re.compile(r"\b(fifty|century|hundred)\b", re.I)),
+]
+
+
+def mock_detect_events(segments):
+    """Deterministic keyword 'LLM' for the event-detection prompt."""
+    events = []
+    for seg in segments:
+        for event_type, pattern in EVENT_RULES:
+            if pattern.search(seg["text"]):
+                events.append({
+                    "event_type": event_type,
+                    "start_time": seg["start"],
+                    "end_time": seg["end"],
+                    "confidence": 0.8,
+                    "excerpt": seg["text"],
+                    "notes": "mock",
+                })
+                break
+    return events
+
+
+def mock_chat_content(messages):
+    user = messages[-1]["content"]
+    marker = "return JSON array: "
+    if marker in user:
+        payload = json.loads(user.split(marker, 1)[1])
+        return json.dumps(mock_detect_events(payload["segments"]))
+    if user.startswith("Analyze these frames: "):
+        frames = json.loads(user.split(": ", 1)[1])["frames"]
+        return json.dumps([
+            {"visual": f"Scene {f['id']}", "mood": "tense", "audio": "crowd", "camera": "wide"} for f in frames
+        ])
+    if "extract a JSON summary" in user:
+        return json.dumps({
+            "brand_name": "Mock", "slogan_or_tagline": "Just mock it", "core_brand_values": ["speed"],
+            "visual_style": "bold", "tone_of_voice": "energetic", "target_audience": "fans",
+            "typical_ad_structure": "hook, product, tagline",
+        })
+    return "Title: Mock\nVisual: Stadium\nAudio: Crowd roar\nVoiceover: Mock script."
+
+
+class MockFirecrawl:
+    """
+    In-process Firecrawl stand-in with the search()/scrape() surface BrandManager uses.
+    `pages` maps url -> markdown (an Exception instance makes that scrape raise);
+    `latency` is seconds per scrape, or a dict of per-url latencies.
+
+        brand_manager = BrandManager(firecrawl=MockFirecrawl(pages, latency=0.5))
+    """
+    def __init__(self, pages, latency=0.0, search_latency=0.0):
+        self.pages = dict(pages)
+        self.latency = latency
+        self.search_latency = search_latency
+        self.scrapes = []
+        self._lock = threading.Lock()
+
+    def search(self, query, limit=5):
+        time.sleep(self.search_latency)
+        return SimpleNamespace(web=[SimpleNamespace(url=u) for u in list(self.pages)[:limit]])
+
+    def scrape(self, url, **kwargs):
+        with self._lock:
+            self.scrapes.append(url)
+        delay = self.latency.get(url, 0.0) if isinstance(self.latency, dict) else self.latency
+        time.sleep(delay)
+        page = self.pages[url]
+        if isinstance(page, Exception):
+            raise page
+        return SimpleNamespace(markdown=page)
+
+
+class MockAzureServer:
+    """
+    Minimal Azure OpenAI chat-completions endpoint on localhost.
+    `latency` delays every response; `fail_every` answers every Nth request with 429.
+    """
+    def __init__(self, latency=0.0, fail_every=0, port=0):
+        self.latency = latency
+        self.fail_every = fail_every
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._make_handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/openai/deployments/mock/chat/completions?api-version=mock"
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                with server._lock:
+                    server.requests += 1
+                    n = server.requests
+                if server.latency:
+                    time.sleep(server.latency)
+
+                if server.fail_every and n % server.fail_every == 0:
+                    self._send(429, {"error": {"message": "Rate limit"}}, {"Retry-After": "0.1"})
+                    return
+
+                content = mock_chat_content(body["messages"])
+                self._send(200, {
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}],
+                    "usage": {"prompt_tokens": len(json.dumps(body)) // 4, "completion_tokens": len(content) // 4},
+                })
+
+            def _send(self, status, payload, headers=None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,283 @@
+"""
+Reproducible per-stage benchmark of the pipelines on synthetic inputs, offline and on CPU.
+
+Fixtures (benchmarks/fixtures.py) are a word-level commentary transcript, LLM-style
+events and a generated match video. Azure is a local mock endpoint
+(benchmarks/mock_services.py). Each stage is timed --repeat times. The results
+(environment, git commit, parameters, per-stage median/min) are saved as JSON, so
+two commits can be compared:
+
+    python -m benchmarks.run_suite [--segments 3000] [--video-seconds 60] [--repeat 3]
+    python -m benchmarks.run_suite --compare benchmarks/results/<baseline>.json [--threshold 0.1]
+
+Stages that need a missing tool (ffmpeg for clips and audio) are reported as skipped.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+from config.settings import settings
+from benchmarks.fixtures import synthetic_events, synthetic_match_transcript, synthetic_match_video
+from benchmarks.mock_services import MockAzureServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STAGES = [
+    "prefilter_segments", "detect_events_via_llm", "detect_events_batched", "confidence_refine",
+    "confidence_refine_batch", "transcript_index_build", "split_transcript_by_words",
+    "audio_extract", "extract_event_clips", "extract_random_frames", "process_all_frames",
+]
+
+
+class Skip(Exception):
+    """Raised by a stage that cannot run in this environment."""
+
+
+def git_info():
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    return {"commit": git("rev-parse", "--short", "HEAD"), "dirty": bool(git("status", "--porcelain", "-uno"))}
+
+
+def environment():
+    import numpy as np
+    env = {"python": platform.python_version(), "platform": platform.platform(),
+           "cpu_count": os.cpu_count(), "numpy": np.__version__, "ffmpeg": bool(shutil.which("ffmpeg"))}
+    try:
+        import cv2
+        env["opencv"] = cv2.__version__
+    except ImportError:
+        env["opencv"] = None
+    return env
+
+
+def time_stage(fn, repeat):
+    """Runs fn() `repeat` times; fn returns the number of items it processed."""
+    runs, items = [], None
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        items = fn()
+        runs.append(time.perf_counter() - t0)
+    median = statistics.median(runs)
+    result = {"median_s": round(median, 5), "min_s": round(min(runs), 5), "runs_s": [round(r, 5) for r in runs]}
+    if items:
+        result["items"] = items
+        result["items_per_s"] = round(items / median, 1) if median else None
+    return result
+
+
+class Suite:
+    def __init__(self, args, workdir, azure):
+        from scripts.utils.llm_client import llm_transport
+        from scripts.utils.transcript_index import TranscriptIndex
+
+        self.args = args
+        self.workdir = workdir
+        self.azure = azure
+        # Every repeat must reach the (mock) endpoint, not the response cache
+        llm_transport.cache = None
+
+        # Outputs go to the scratch directory, not the project's assets/ and data/
+        settings.VIDEO_CLIPS_DIR = os.path.join(workdir, "video_clips")
+        settings.FRAMES_OUTPUT_DIR = os.path.join(workdir, "frames")
+        settings.SKETCH_OUTPUT_DIR = os.path.join(workdir, "sketches")
+
+        self.transcript = synthetic_match_transcript(args.segments, seed=args.seed)
+        self.events = synthetic_events(self.transcript, seed=args.seed)
+        self.index = TranscriptIndex.from_segments(self.transcript)
+        self.video = synthetic_match_video(args.fixtures_dir, seconds=args.video_seconds, seed=args.seed)
+        self.candidates = None
+        self.splits = None
+        self.frames = None
+
+    def fixtures(self):
+        return {
+            "segments": len(self.transcript),
+            "words": sum(len(s["words"]) for s in self.transcript),
+            "transcript_seconds": round(self.transcript[-1]["segment_end"], 1),
+            "events": len(self.events),
+            "video": {**self.video, "path": os.path.relpath(self.video["path"], ROOT),
+                      "bytes": os.path.getsize(self.video["path"])},
+            "llm_latency_s": self.args.llm_latency,
+        }
+
+    # Each stage returns the number of items it processed
+
+    def prefilter_segments(self):
+        from scripts.utils.transcript_utils import TranscriptUtils
+        self.candidates = TranscriptUtils.prefilter_segments(self.transcript)
+        return len(self.transcript)
+
+    def detect_events_via_llm(self):
+        from scripts.detection.event_finder import EventFinder
+        from scripts.detection.batch_event_finder import BatchEventFinder
+        batch = BatchEventFinder().plan_batches(self._candidates())[0]
+        EventFinder(url=self.azure.url, verbose=False).detect_events_via_llm(batch)
+        return len(batch)
+
+    def detect_events_batched(self):
+        from scripts.detection.batch_event_finder import BatchEventFinder
+        BatchEventFinder(url=self.azure.url).detect_events(self._candidates())
+        return len(self._candidates())
+
+    def confidence_refine(self):
+        from scripts.detection.confidence import ConfidenceRefiner
+        refiner = ConfidenceRefiner()
+        for event in self.events:
+            refiner.refine(dict(event), self.index, event["confidence"])
+        return len(self.events)
+
+    def confidence_refine_batch(self):
+        from scripts.detection.confidence import ConfidenceRefiner
+        ConfidenceRefiner().refine_batch([dict(e) for e in self.events], self.index)
+        return len(self.events)
+
+    def transcript_index_build(self):
+        from scripts.utils.transcript_index import TranscriptIndex
+        TranscriptIndex.from_segments(self.transcript)
+        return len(self.transcript)
+
+    def split_transcript_by_words(self):
+        from scripts.media.video_manager import VideoManager
+        self.splits = VideoManager().split_transcript_by_words(self.index, num_splits=6)
+        return self.index.transcript.num_words
+
+    def audio_extract(self):
+        if not self.video["has_audio"]:
+            raise Skip("ffmpeg not found")
+        from scripts.media.audio_decoder import AudioDecoder
+        AudioDecoder().decode(self.video["path"])
+        return self.video["seconds"]
+
+    def extract_event_clips(self):
+        if not shutil.which("ffmpeg"):
+            raise Skip("ffmpeg not found")
+        from scripts.media.video_manager import VideoManager
+        from scripts.utils.transcript_utils import TranscriptUtils
+        # The transcript outlasts the video, so spread the clip events evenly across it
+        step = max(1.0, (self.video["seconds"] - 8) / max(1, self.args.clips))
+        events = [dict(self.events[i % len(self.events)],
+                       start_time=TranscriptUtils.format_seconds(2 + i * step),
+                       end_time=TranscriptUtils.format_seconds(6 + i * step))
+                  for i in range(self.args.clips)]
+        VideoManager().extract_event_clips(self.video["path"], events, buffer_seconds=2.0, index=self.index)
+        return len(events)
+
+    def extract_random_frames(self):
+        from scripts.media.video_manager import VideoManager
+        self.frames = VideoManager().extract_random_frames(
+            self.video["path"], self._video_splits(), candidates=settings.STORYBOARD_FRAME_CANDIDATES)
+        return len(self.frames)
+
+    def process_all_frames(self):
+        from scripts.media.image_manager import ImageProcessor
+        if self.frames is None:
+            self.extract_random_frames()
+        ImageProcessor().process_all_frames(self.frames)
+        return sum(f is not None for f in self.frames)
+
+    def _candidates(self):
+        if self.candidates is None:
+            self.prefilter_segments()
+        return self.candidates
+
+    def _video_splits(self):
+        # Six scenes across the generated video (the transcript is far longer than it)
+        step = self.video["seconds"] / 6
+        return [{"start": i * step, "end": (i + 1) * step} for i in range(6)]
+
+
+def compare(current, baseline, threshold):
+    """Prints the per-stage median change against `baseline`; returns the regressed stages."""
+    regressions = []
+    base_commit = (baseline.get("git") or {}).get("commit")
+    print(f"\n📈 Against {base_commit or 'baseline'} (regression = more than {threshold:.0%} slower):")
+    for stage, result in current["stages"].items():
+        before = baseline.get("stages", {}).get(stage, {})
+        if "median_s" not in result or "median_s" not in before:
+            continue
+        ratio = result["median_s"] / before["median_s"] if before["median_s"] else float("inf")
+        flag = "❌" if ratio > 1 + threshold else ("✅" if ratio < 1 - threshold else "  ")
+        print(f"   {flag} {stage:<26} {before['median_s']:>9.4f}s -> {result['median_s']:>9.4f}s  ({ratio:.2f}x)")
+        if ratio > 1 + threshold:
+            regressions.append(stage)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--segments", type=int, default=3000)
+    parser.add_argument("--video-seconds", type=int, default=60)
+    parser.add_argument("--clips", type=int, default=8, help="event clips to cut")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="mock Azure response delay (s)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES)
+    parser.add_argument("--fixtures-dir", default=os.path.join(ROOT, "benchmarks", ".fixtures"))
+    parser.add_argument("--output", default=None, help="result file (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", help="baseline result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    from scripts.utils.instrumentation import metrics
+    metrics.reset()
+    git = git_info()
+    with tempfile.TemporaryDirectory(prefix="adv_bench_") as workdir, \
+            MockAzureServer(latency=args.llm_latency) as azure:
+        suite = Suite(args, workdir, azure)
+        stages = {}
+        for stage in args.stages:
+            try:
+                stages[stage] = time_stage(getattr(suite, stage), args.repeat)
+            except Skip as e:
+                stages[stage] = {"skipped": str(e)}
+        fixtures = suite.fixtures()
+
+    result = {
+        "suite": "pipeline",
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git": git,
+        "environment": environment(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare", "fixtures_dir")},
+        "fixtures": fixtures,
+        "stages": stages,
+        # Counters from the pipeline's own spans (bytes written, LLM calls, ...)
+        "instrumentation": metrics.report()["stages"],
+    }
+
+    print(f"\n⏱️ {len(stages)} stages, {args.repeat} runs each (median / min):")
+    for stage, r in stages.items():
+        if "skipped" in r:
+            print(f"   {stage:<26} skipped: {r['skipped']}")
+        else:
+            rate = f"  {r['items_per_s']:>10} items/s" if r.get("items_per_s") else ""
+            print(f"   {stage:<26} {r['median_s']:>9.4f}s / {r['min_s']:.4f}s{rate}")
+
+    output = args.output or os.path.join(
+        ROOT, "benchmarks", "results",
+        f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{git['commit'] or 'nogit'}{'-dirty' if git['dirty'] else ''}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"\n💾 Results saved to {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(result, json.load(f), args.threshold)
+        if regressions and args.fail_on_regression:
+            print(f"❌ Regressed: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Command-line entry point for the pipelines.
+
+    python cli.py events match.mp4
+    python cli.py stream rtmp://... [--follow]
+    python cli.py storyboard match.mp4
+    python cli.py script Nike [--events data/detected_events.json] [--top 1]
+    python cli.py scripts Nike Pepsi [--events data/detected_events.json] [--top 5]
+    python cli.py match match.mp4 --brands Nike Pepsi [--clips] [--storyboard]
+    python cli.py worker [--queue-dir data/jobs] [--port 8765] [--warm-brands Nike Pepsi]
+    python cli.py submit events video_path=match.mp4
+
+Pipelines are imported by the command that runs them, so --help and `submit` start instantly.
+"""
+import sys
+import json
+import argparse
+from config.settings import settings
+
+
+def _load_moments(path, top=None):
+    """Moments from a detected-events file (a list, most confident first) or a single event."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    moments = data if isinstance(data, list) else [data]
+    return moments[:top] if top else moments
+
+
+# ---------------------------------------------------------------------- job handlers
+# kind -> (resource, fn(params)); shared by the one-shot commands and the worker
+
+# Worker jobs carry their own `output_dir`; one-shot commands write to the settings paths
+
+def run_events_job(params):
+    from ad_event_detection import get_event
+    events = get_event(params["video_path"], outputs=settings.output_paths(params.get("output_dir")))
+    if events is None:
+        raise FileNotFoundError(params["video_path"])
+    return {"events": events}
+
+
+def run_storyboard_job(params):
+    from storyboard_pipeline import StoryBoard_creator
+    analysis = StoryBoard_creator(params["video_path"], outputs=settings.output_paths(params.get("output_dir")))
+    if analysis is None:
+        raise FileNotFoundError(params["video_path"])
+    return {"analysis": analysis}
+
+
+def run_script_job(params):
+    from Ad_script_pipline import get_script
+    result = get_script(params["brand"], params["moment"], outputs=settings.output_paths(params.get("output_dir")))
+    if result is None:
+        raise RuntimeError(f"No script generated for {params['brand']}")
+    return result
+
+
+def run_scripts_job(params):
+    from Ad_script_pipline import get_scripts
+    results = list(get_scripts(params["brands"], params["moments"], params.get("max_concurrency"),
+                               outputs=settings.output_paths(params.get("output_dir"))))
+    return {"scripts": [{k: v for k, v in r.items() if k != "moment"} |
+                        {"event_type": r["moment"].get("event_type"), "start_time": r["moment"].get("start_time")}
+                        for r in results]}
+
+
+def run_match_job_handler(params):
+    from match_job_pipeline import run_match_job
+    report = run_match_job(params["video_path"], brands=params.get("brands", ()),
+                           extract_clips=params.get("extract_clips"), storyboard=params.get("storyboard", False),
+                           outputs=settings.output_paths(params.get("output_dir")))
+    if report is None:
+        raise FileNotFoundError(params["video_path"])
+    return report
+
+
+JOB_HANDLERS = {
+    "events": ("cpu", run_events_job),
+    "storyboard": ("cpu", run_storyboard_job),
+    "match": ("cpu", run_match_job_handler),
+    "script": ("llm", run_script_job),
+    "scripts": ("llm", run_scripts_job),
+}
+
+
+# ---------------------------------------------------------------------- commands
+
+def cmd_events(args):
+    from ad_event_detection import get_event
+    return 0 if get_event(args.video) is not None else 1
+
+
+def cmd_stream(args):
+    from ad_event_detection import get_event_stream
+    for _ in get_event_stream(args.source, follow=args.follow):
+        pass
+    return 0
+
+
+def cmd_storyboard(args):
+    from storyboard_pipeline import StoryBoard_creator
+    return 0 if StoryBoard_creator(args.video) is not None else 1
+
+
+def cmd_script(args):
+    from Ad_script_pipline import get_script
+    failed = 0
+    for moment in _load_moments(args.events, args.top):
+        failed += get_script(args.brand, moment) is None
+    return 1 if failed else 0
+
+
+def cmd_scripts(args):
+    from Ad_script_pipline import get_scripts
+    results = list(get_scripts(args.brands, _load_moments(args.events, args.top), args.concurrency))
+    return 1 if any(r["script"] is None for r in results) else 0
+
+
+def cmd_match(args):
+    from match_job_pipeline import run_match_job
+    report = run_match_job(args.video, brands=args.brands, extract_clips=args.clips, storyboard=args.storyboard)
+    return 0 if report is not None else 1
+
+
+def cmd_worker(args):
+    from scripts.pipeline.worker import PipelineWorker
+    worker = PipelineWorker(JOB_HANDLERS, queue_dir=args.queue_dir,
+                            cpu_jobs=args.cpu_jobs, llm_jobs=args.llm_jobs)
+    if args.warm_whisper:
+        from scripts.detection.transcriber import Transcriber
+        Transcriber().model_init()
+    if args.warm_brands:
+        from Ad_script_pipline import get_generator
+        errors = get_generator().brand_manager.prewarm(args.warm_brands)
+        for brand, error in errors.items():
+            print(f"⚠️ Could not warm {brand} knowledge base: {error}")
+    worker.serve(http=args.port != 0, host=args.host, port=args.port)
+    return 0
+
+
+def cmd_submit(args):
+    from scripts.pipeline.worker import enqueue_job
+    if args.kind not in JOB_HANDLERS:
+        print(f"❌ Unknown job kind {args.kind!r}")
+        return 1
+    params = json.loads(args.json) if args.json else {}
+    for pair in args.params:
+        key, _, value = pair.partition("=")
+        try:
+            params[key] = json.loads(value)
+        except ValueError:
+            params[key] = value
+    try:
+        job_id = enqueue_job(args.kind, params, job_id=args.id, queue_dir=args.queue_dir)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    print(f"📨 Queued {args.kind} job {job_id}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("events", help="detect events in a video (and cut clips if EXTRACT_CLIPS)")
+    p.add_argument("video")
+    p.set_defaults(func=cmd_events)
+
+    p = sub.add_parser("stream", help="detect events live from a growing file or stream URL")
+    p.add_argument("source")
+    p.add_argument("--follow", action="store_true", help="keep reading a file that is still being written")
+    p.set_defaults(func=cmd_stream)
+
+    p = sub.add_parser("storyboard", help="build a six-scene storyboard for a video")
+    p.add_argument("video")
+    p.set_defaults(func=cmd_storyboard)
+
+    p = sub.add_parser("script", help="write an ad script for one brand")
+    p.add_argument("brand")
+    p.add_argument("--events", default=settings.DETECTED_EVENTS_FILE, help="detected events or a single moment (JSON)")
+    p.add_argument("--top", type=int, default=1, help="moments to use, most confident first (0 = all)")
+    p.set_defaults(func=cmd_script)
+
+    p = sub.add_parser("scripts", help="write ad scripts for several brands × moments concurrently")
+    p.add_argument("brands", nargs="+")
+    p.add_argument("--events", default=settings.DETECTED_EVENTS_FILE)
+    p.add_argument("--top", type=int, default=0)
+    p.add_argument("--concurrency", type=int, default=None)
+    p.set_defaults(func=cmd_scripts)
+
+    p = sub.add_parser("match", help="full match job: events, clips and scripts as one dependency graph")
+    p.add_argument("video")
+    p.add_argument("--brands", nargs="*", default=[])
+    p.add_argument("--clips", action=argparse.BooleanOptionalAction, default=None)
+    p.add_argument("--storyboard", action="store_true")
+    p.set_defaults(func=cmd_match)
+
+    p = sub.add_parser("worker", help="resident worker taking jobs from the queue directory and HTTP")
+    p.add_argument("--queue-dir", default=settings.WORKER_QUEUE_DIR)
+    p.add_argument("--host", default=settings.WORKER_HTTP_HOST)
+    p.add_argument("--port", type=int, default=settings.WORKER_HTTP_PORT, help="0 = no HTTP endpoint")
+    p.add_argument("--cpu-jobs", type=int, default=settings.WORKER_CPU_JOBS)
+    p.add_argument("--llm-jobs", type=int, default=settings.WORKER_LLM_JOBS)
+    p.add_argument("--warm-whisper", action=argparse.BooleanOptionalAction, default=True,
+                   help="load the Whisper model before taking jobs")
+    p.add_argument("--warm-brands", nargs="*", default=[], help="brand knowledge bases to load up front")
+    p.set_defaults(func=cmd_worker)
+
+    p = sub.add_parser("submit", help="queue a job for a running worker")
+    p.add_argument("kind", help=", ".join(JOB_HANDLERS))
+    p.add_argument("params", nargs="*", help="key=value (values parsed as JSON when they can be)")
+    p.add_argument("--json", help="params as one JSON object")
+    p.add_argument("--id")
+    p.add_argument("--queue-dir", default=settings.WORKER_QUEUE_DIR)
+    p.set_defaults(func=cmd_submit)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,74 +1,245 @@
 import os
-from dotenv import load_dotenv
+
+def _load_env_file():
+    """
+    Loads the nearest .env file (from this package's directory upwards, as python-dotenv's
+    own lookup does). python-dotenv is only imported when there is a file to read.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, ".env")
+        if os.path.isfile(path):
+            from dotenv import load_dotenv
+            load_dotenv(path)
+            return
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return
+        directory = parent
 
 # Load environment variables from .env file
-load_dotenv()
+_load_env_file()
 
 class Config:
     """
     Central configuration for API keys, endpoints, file paths, and constants.
     """
     def __init__(self):
-        def __init__(self):
-            # ... (Previous API keys and config code remains the same) ...
-            
-            # ==========================================
-            # API KEYS & ENDPOINTS
-            # ==========================================
-            self.AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
-            self.AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
-            self.AZURE_API_VERSION = os.getenv("AZURE_API_VERSION", "2023-12-01-preview")
-            self.AZURE_DEPLOYMENT_NAME = os.getenv("AZURE_DEPLOYMENT_NAME", "gpt-4.1")
-            self.FIRECRAWL_API_KEY = os.getenv("FIRECRAWL_API_KEY")
-
-            if self.AZURE_OPENAI_ENDPOINT and self.AZURE_DEPLOYMENT_NAME:
-                self.AZURE_CHAT_URL = f"{self.AZURE_OPENAI_ENDPOINT}/openai/deployments/{self.AZURE_DEPLOYMENT_NAME}/chat/completions?api-version={self.AZURE_API_VERSION}"
-            else:
-                self.AZURE_CHAT_URL = ""
-
-            # ==========================================
-            # WHISPER / AUDIO CONFIG
-            # ==========================================
-            self.WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "turbo")
-            self.AUDIO_SAMPLE_RATE = int(os.getenv("AUDIO_SAMPLE_RATE", 16000))
-            self.EXTRACTED_AUDIO_FILE = "extracted_audio.wav"
-
-            # ==========================================
-            # DETECTION CONSTANTS
-            # ==========================================
-            self.DEFAULT_WORDS_PER_SECOND = 2.5
-            self.CHUNK_WORDS = 40
-            self.PREFILTER = True
-            
-            # --- NEW FLAG: Set to True to enable clip cutting ---
-            self.EXTRACT_CLIPS = False 
-
-            self.KEYWORDS = [
-                "four", "4", "boundary", "six", "6", "sixer",
-                "wicket", "bowled", "caught", "stumped", "run out", "run-out", "lbw",
-                "appeal", "umpire", "out", "not out", "review", "drs",
-                "fifty", "50", "half-century", "century", "100",
-                "partnership", "partnerships", "drop", "dropped", "missed", "hattrick", "hat-trick",
-                "timeout", "strategic timeout", "powerplay", "end of over", "over",
-                "celebrat", "win", "victory", "walk off", "walk-off", "huge one"
-            ]
-
-            self.ALLOWED_EVENTS = [
-                "four", "six", "wicket", "appeal_umpire_decision", "end_of_over_score_recap",
-                "strategic_timeout", "fifty_century", "partnership_50_plus", "dropped_catch_missed_runout",
-                "end_of_innings", "winning_celebration", "back_to_back_boundaries", "bowlers_hattrick",
-                "middle_over_wicket_cluster", "wicket_and_bowler_celebration"
-            ]
-
-            # ==========================================
-            # OUTPUT DIRECTORIES & FILES
-            # ==========================================
-            self.VIDEO_CLIPS_DIR = "assets/video_clips"
-            self.FRAMES_OUTPUT_DIR = "assets/random_frames"
-            self.SKETCH_OUTPUT_DIR = "assets/sketch_images"
-            self.ANALYSIS_OUTPUT_FILE = "data/video_analysis.json"
-            self.DETECTED_EVENTS_FILE = "data/detected_events.json"
-            self.TRANSCRIPT_FILE = "data/transcript.txt"
+        # ... (Previous API keys and config code remains the same) ...
+        
+        # ==========================================
+        # API KEYS & ENDPOINTS
+        # ==========================================
+        self.AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
+        self.AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
+        self.AZURE_API_VERSION = os.getenv("AZURE_API_VERSION", "2023-12-01-preview")
+        self.AZURE_DEPLOYMENT_NAME = os.getenv("AZURE_DEPLOYMENT_NAME", "gpt-4.1")
+        self.FIRECRAWL_API_KEY = os.getenv("FIRECRAWL_API_KEY")
+
+        if self.AZURE_OPENAI_ENDPOINT and self.AZURE_DEPLOYMENT_NAME:
+            self.AZURE_CHAT_URL = f"{self.AZURE_OPENAI_ENDPOINT}/openai/deployments/{self.AZURE_DEPLOYMENT_NAME}/chat/completions?api-version={self.AZURE_API_VERSION}"
+        else:
+            self.AZURE_CHAT_URL = ""
+
+        # ==========================================
+        # WHISPER / AUDIO CONFIG
+        # ==========================================
+        self.WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "turbo")
+        # "auto" picks cuda when CTranslate2 sees a GPU, otherwise cpu
+        self.WHISPER_DEVICE = os.getenv("WHISPER_DEVICE", "auto")
+        self.AUDIO_SAMPLE_RATE = int(os.getenv("AUDIO_SAMPLE_RATE", 16000))
+        # Decoded audio longer than this is backed by a memory-mapped temp file
+        self.AUDIO_MMAP_THRESHOLD_SECONDS = float(os.getenv("AUDIO_MMAP_THRESHOLD_SECONDS", 3600))
+        self.WHISPER_BEAM_SIZE = int(os.getenv("WHISPER_BEAM_SIZE", 5))
+        # Concurrent transcriptions per loaded model, and CPU threads per worker (0 = auto)
+        self.WHISPER_NUM_WORKERS = int(os.getenv("WHISPER_NUM_WORKERS", 2))
+        self.WHISPER_CPU_THREADS = int(os.getenv("WHISPER_CPU_THREADS", 0))
+        # Chunked multi-process transcription for long matches on CPU (1 = off);
+        # one pool of warmed processes per process, shared by all jobs
+        self.PARALLEL_TRANSCRIBE_WORKERS = int(os.getenv("PARALLEL_TRANSCRIBE_WORKERS", 1))
+        self.PARALLEL_CHUNK_SECONDS = float(os.getenv("PARALLEL_CHUNK_SECONDS", 300))
+
+        # Transcript cache (keyed by media hash + Whisper config)
+        self.TRANSCRIPT_CACHE_ENABLED = os.getenv("TRANSCRIPT_CACHE_ENABLED", "1") == "1"
+        self.TRANSCRIPT_CACHE_DIR = os.getenv("TRANSCRIPT_CACHE_DIR", "data/transcript_cache")
+        self.TRANSCRIPT_CACHE_MAX_MB = int(os.getenv("TRANSCRIPT_CACHE_MAX_MB", 512))
+
+        # ==========================================
+        # LIVE STREAMING CONFIG
+        # ==========================================
+        self.LIVE_WINDOW_SECONDS = float(os.getenv("LIVE_WINDOW_SECONDS", 20))
+        self.LIVE_OVERLAP_SECONDS = float(os.getenv("LIVE_OVERLAP_SECONDS", 4))
+        self.LIVE_BEAM_SIZE = int(os.getenv("LIVE_BEAM_SIZE", 1))
+        # Stop following a growing file after this many seconds without new data
+        self.LIVE_FOLLOW_TIMEOUT = float(os.getenv("LIVE_FOLLOW_TIMEOUT", 10))
+
+        # ==========================================
+        # LLM REQUESTS & BATCHING
+        # ==========================================
+        self.LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", 120))
+        # In-flight requests per deployment, and its token-per-minute budget (0 = unlimited)
+        self.LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 4))
+        self.LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", 0))
+        self.LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", 16))
+        self.LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 4))
+        self.LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", 1))
+        self.LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", 30))
+        # Persistent cache for temperature-0 responses (set LLM_CACHE_ENABLED=0 to bypass)
+        self.LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+        self.LLM_CACHE_FILE = os.getenv("LLM_CACHE_FILE", "data/llm_cache.sqlite")
+        self.LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+        self.LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 5000))
+        # Approximate prompt tokens of segment text per event-detection request
+        self.LLM_BATCH_TOKEN_BUDGET = int(os.getenv("LLM_BATCH_TOKEN_BUDGET", 3000))
+        # Segments repeated at the start of each batch so boundary events keep their context
+        self.LLM_BATCH_OVERLAP_SEGMENTS = int(os.getenv("LLM_BATCH_OVERLAP_SEGMENTS", 2))
+
+        # ==========================================
+        # DETECTION CONSTANTS
+        # ==========================================
+        self.DEFAULT_WORDS_PER_SECOND = 2.5
+        self.CHUNK_WORDS = 40
+        self.PREFILTER = True
+        
+        # --- NEW FLAG: Set to True to enable clip cutting ---
+        self.EXTRACT_CLIPS = False 
+
+        # "fast" = keyframe-aligned stream copy, "accurate" = re-encode up to the first keyframe
+        self.CLIP_CUT_MODE = os.getenv("CLIP_CUT_MODE", "fast")
+        self.CLIP_CUT_WORKERS = int(os.getenv("CLIP_CUT_WORKERS", 4))
+
+        # Brand knowledge bases kept in memory, and the age after which one is rebuilt
+        # in the background while the old copy keeps being served (0 = never)
+        self.BRAND_KB_CACHE_ENTRIES = int(os.getenv("BRAND_KB_CACHE_ENTRIES", 64))
+        self.BRAND_KB_TTL_SECONDS = int(os.getenv("BRAND_KB_TTL_SECONDS", 30 * 24 * 3600))
+
+        # New-brand scraping: parallel Firecrawl scrapes, per-URL timeout, characters kept per
+        # page and in total (scraping stops once the total is reached), and the word-shingle
+        # similarity above which a page counts as a duplicate of one already kept
+        self.BRAND_SCRAPE_WORKERS = int(os.getenv("BRAND_SCRAPE_WORKERS", 5))
+        self.BRAND_SCRAPE_TIMEOUT_SECONDS = float(os.getenv("BRAND_SCRAPE_TIMEOUT_SECONDS", 30))
+        self.BRAND_SCRAPE_PAGE_CHARS = int(os.getenv("BRAND_SCRAPE_PAGE_CHARS", 8000))
+        self.BRAND_SCRAPE_CHAR_BUDGET = int(os.getenv("BRAND_SCRAPE_CHAR_BUDGET", 15000))
+        self.BRAND_SCRAPE_DEDUPE_THRESHOLD = float(os.getenv("BRAND_SCRAPE_DEDUPE_THRESHOLD", 0.8))
+
+        # Match jobs (scripts/pipeline/orchestrator.py): events above this confidence get a clip
+        self.JOB_CLIP_CONFIDENCE = float(os.getenv("JOB_CLIP_CONFIDENCE", 0.6))
+        self.JOB_REPORT_FILE = os.getenv("JOB_REPORT_FILE", "data/job_report.json")
+
+        # Resident worker (python cli.py worker): job queue directory, local HTTP endpoint
+        # (port 0 = queue directory only), and how many jobs run at once that transcribe or
+        # cut video vs ones that only call the LLM
+        self.WORKER_QUEUE_DIR = os.getenv("WORKER_QUEUE_DIR", "data/jobs")
+        self.WORKER_HTTP_HOST = os.getenv("WORKER_HTTP_HOST", "127.0.0.1")
+        self.WORKER_HTTP_PORT = int(os.getenv("WORKER_HTTP_PORT", 8765))
+        self.WORKER_CPU_JOBS = int(os.getenv("WORKER_CPU_JOBS", 1))
+        self.WORKER_LLM_JOBS = int(os.getenv("WORKER_LLM_JOBS", 4))
+        self.WORKER_POLL_SECONDS = float(os.getenv("WORKER_POLL_SECONDS", 1.0))
+
+        # Per-stage spans and counters (scripts/utils/instrumentation.py): JSON run report,
+        # and a Prometheus text file when a path is set
+        self.METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+        self.METRICS_REPORT_FILE = os.getenv("METRICS_REPORT_FILE", "data/run_metrics.json")
+        self.METRICS_PROMETHEUS_FILE = os.getenv("METRICS_PROMETHEUS_FILE", "")
+        # Stages to profile, comma-separated names or globs ("transcriber.*", "*"),
+        # with "cprofile" (.prof per call) or "py-spy" (speedscope, needs py-spy on PATH)
+        self.PROFILE_STAGES = os.getenv("PROFILE_STAGES", "")
+        self.PROFILE_MODE = os.getenv("PROFILE_MODE", "cprofile")
+        self.PROFILE_DIR = os.getenv("PROFILE_DIR", "data/profiles")
+
+        # Storyboard frames are sampled from the source; scene clips are only cut on request
+        self.STORYBOARD_GENERATE_CLIPS = os.getenv("STORYBOARD_GENERATE_CLIPS", "0") == "1"
+        self.STORYBOARD_FRAME_CANDIDATES = int(os.getenv("STORYBOARD_FRAME_CANDIDATES", 8))
+        # Width (px) frames are downscaled to before scoring
+        self.FRAME_SCORE_WIDTH = int(os.getenv("FRAME_SCORE_WIDTH", 160))
+        # Each candidate is compared with the frame this many frames earlier to spot a nearby cut
+        self.FRAME_SCORE_LOOKBACK_FRAMES = int(os.getenv("FRAME_SCORE_LOOKBACK_FRAMES", 3))
+
+        self.KEYWORDS = [
+            "four", "4", "boundary", "six", "6", "sixer",
+            "wicket", "bowled", "caught", "stumped", "run out", "run-out", "lbw",
+            "appeal", "umpire", "out", "not out", "review", "drs",
+            "fifty", "50", "half-century", "century", "100",
+            "partnership", "partnerships", "drop", "dropped", "missed", "hattrick", "hat-trick",
+            "timeout", "strategic timeout", "powerplay", "end of over", "over",
+            "celebrat", "win", "victory", "walk off", "walk-off", "huge one"
+        ]
+
+        # Substrings that back up an event type in the excerpt (ConfidenceRefiner)
+        self.EVENT_KEYWORDS = {
+            "four": ["shot", "boundary", "four"],
+            "six": ["maximum", "six", "huge"],
+            "wicket": ["out", "bowled", "caught", "gone", "depart"],
+            "winning_celebration": ["win", "champion", "victory"],
+            "fifty_century": ["fifty", "century", "hundred", "milestone"]
+        }
+
+        # Batch refinement: same-type events closer than this are one event, and transcript
+        # evidence is gathered this far either side of each event
+        self.REFINE_MERGE_GAP_SECONDS = float(os.getenv("REFINE_MERGE_GAP_SECONDS", 2))
+        self.REFINE_CONTEXT_SECONDS = float(os.getenv("REFINE_CONTEXT_SECONDS", 10))
+
+        # Event/clip boundaries snap to the midpoint of a silence between words at least
+        # this long, if one is within SNAP_MAX_SHIFT_SECONDS
+        self.SNAP_MIN_SILENCE_SECONDS = float(os.getenv("SNAP_MIN_SILENCE_SECONDS", 0.3))
+        self.SNAP_MAX_SHIFT_SECONDS = float(os.getenv("SNAP_MAX_SHIFT_SECONDS", 1.5))
+
+        # Local rule-based pre-detection: unambiguous events at or above the threshold
+        # are kept without an LLM call; the event window is padded around the matched words
+        self.RULE_DETECTOR_ENABLED = os.getenv("RULE_DETECTOR_ENABLED", "1") == "1"
+        self.RULE_CONFIDENCE_THRESHOLD = float(os.getenv("RULE_CONFIDENCE_THRESHOLD", 0.76))
+        self.RULE_PRE_ROLL_SECONDS = float(os.getenv("RULE_PRE_ROLL_SECONDS", 6))
+        self.RULE_POST_ROLL_SECONDS = float(os.getenv("RULE_POST_ROLL_SECONDS", 3))
+
+        self.ALLOWED_EVENTS = [
+            "four", "six", "wicket", "appeal_umpire_decision", "end_of_over_score_recap",
+            "strategic_timeout", "fifty_century", "partnership_50_plus", "dropped_catch_missed_runout",
+            "end_of_innings", "winning_celebration", "back_to_back_boundaries", "bowlers_hattrick",
+            "middle_over_wicket_cluster", "wicket_and_bowler_celebration"
+        ]
+
+        # ==========================================
+        # OUTPUT DIRECTORIES & FILES
+        # ==========================================
+        self.VIDEO_CLIPS_DIR = "assets/video_clips"
+        self.FRAMES_OUTPUT_DIR = "assets/random_frames"
+        self.SKETCH_OUTPUT_DIR = "assets/sketch_images"
+        self.ANALYSIS_OUTPUT_FILE = "data/video_analysis.json"
+        self.DETECTED_EVENTS_FILE = "data/detected_events.json"
+        self.TRANSCRIPT_FILE = "data/transcript.txt"
+
+        # Sketch rendering: worker threads (0 = one per core), "gaussian" or "box" blur,
+        # and the resolution fraction the blur runs at (1.0 = exact, lower = faster)
+        self.SKETCH_WORKERS = int(os.getenv("SKETCH_WORKERS", 0))
+        self.SKETCH_BLUR = os.getenv("SKETCH_BLUR", "gaussian")
+        self.SKETCH_BLUR_SCALE = float(os.getenv("SKETCH_BLUR_SCALE", 1.0))
+
+    def output_paths(self, root=None):
+        """
+        Files and directories a pipeline run writes: the settings above, or the same
+        layout under `root` so concurrent runs (one root each) never share an output.
+        """
+        if root is None:
+            return {
+                "transcript": self.TRANSCRIPT_FILE,
+                "events": self.DETECTED_EVENTS_FILE,
+                "analysis": self.ANALYSIS_OUTPUT_FILE,
+                "job_report": self.JOB_REPORT_FILE,
+                "clips": self.VIDEO_CLIPS_DIR,
+                "frames": self.FRAMES_OUTPUT_DIR,
+                "sketches": self.SKETCH_OUTPUT_DIR,
+                "scripts": "data/output_scripts",
+            }
+        return {
+            "transcript": os.path.join(root, "transcript.txt"),
+            "events": os.path.join(root, "detected_events.json"),
+            "analysis": os.path.join(root, "video_analysis.json"),
+            "job_report": os.path.join(root, "job_report.json"),
+            "clips": os.path.join(root, "video_clips"),
+            "frames": os.path.join(root, "random_frames"),
+            "sketches": os.path.join(root, "sketch_images"),
+            "scripts": os.path.join(root, "output_scripts"),
+        }
 
     def get_firecrawl_client(self):
         from firecrawl import Firecrawl
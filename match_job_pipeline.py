@@ -0,0 +1,13 @@
+from scripts.pipeline.orchestrator import MatchJobOrchestrator
+
+def run_match_job(video_path, brands=(), extract_clips=None, storyboard=False, outputs=None):
+    """
+    Full match job in one go: transcription, event detection, highlight clips and an
+    ad script per brand for every detected moment, overlapped as a dependency graph.
+    Returns the job report (per-stage timings, clips, scripts and moment-to-ad latency).
+    `outputs` (settings.output_paths()) says where files are written.
+    """
+    print(f"🚀 Match job for {video_path} (brands: {', '.join(brands) or 'none'})")
+    orchestrator = MatchJobOrchestrator(brands=brands, extract_clips=extract_clips, storyboard=storyboard,
+                                        outputs=outputs)
+    return orchestrator.run(video_path)
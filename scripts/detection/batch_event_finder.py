@@ -0,0 +1,119 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from config.settings import settings
+from scripts.detection.event_finder import EventFinder
+from scripts.utils.transcript_utils import TranscriptUtils
+from scripts.utils.instrumentation import metrics
+
+class BatchEventFinder:
+    """
+    Runs EventFinder over the full candidate list in token-budgeted, overlapping batches,
+    several requests at a time, and merges the events found across batch boundaries.
+    """
+    # Timestamps and JSON keys around each segment's text in the prompt
+    SEGMENT_OVERHEAD_TOKENS = 20
+
+    def __init__(self, url=None, max_concurrency=None, token_budget=None, overlap_segments=None):
+        self.max_concurrency = max_concurrency or settings.LLM_MAX_CONCURRENCY
+        self.token_budget = token_budget or settings.LLM_BATCH_TOKEN_BUDGET
+        self.overlap_segments = settings.LLM_BATCH_OVERLAP_SEGMENTS if overlap_segments is None else overlap_segments
+        # Connection pooling, retries and per-deployment limits live in the shared transport
+        self.finder = EventFinder(url=url, verbose=False)
+        self.stats = {}
+
+    def estimate_tokens(self, segment):
+        return len(segment["text"]) // 4 + self.SEGMENT_OVERHEAD_TOKENS
+
+    def plan_batches(self, segments):
+        """Returns consecutive slices of `segments` that each fit the token budget."""
+        batches = []
+        start = 0
+        while start < len(segments):
+            end, tokens = start, 0
+            while end < len(segments) and (end == start or tokens + self.estimate_tokens(segments[end]) <= self.token_budget):
+                tokens += self.estimate_tokens(segments[end])
+                end += 1
+            batches.append(segments[start:end])
+            if end >= len(segments):
+                break
+            # Step back for overlap, but always make progress
+            start = max(start + 1, end - self.overlap_segments)
+        return batches
+
+    def iter_batch_events(self, segments):
+        """
+        Yields (batch_index, events, latency_seconds) as each batch request completes.
+        """
+        batches = self.plan_batches(segments)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            futures = {pool.submit(self._run_batch, batch): i for i, batch in enumerate(batches)}
+            for future in as_completed(futures):
+                events, latency = future.result()
+                yield futures[future], events, latency
+
+    def _run_batch(self, batch):
+        t0 = time.perf_counter()
+        events = self.finder.detect_events_via_llm(batch)
+        return events, time.perf_counter() - t0
+
+    def detect_events(self, segments):
+        """
+        Detects events over all candidate segments; returns the merged, deduplicated list.
+        """
+        if not segments:
+            return []
+
+        print(f"🤖 Calling Azure OpenAI for event detection on {len(segments)} segments...")
+        t0 = time.perf_counter()
+        all_events, latencies = [], []
+        with metrics.span("event_finder.detect_events") as span:
+            for _, events, latency in self.iter_batch_events(segments):
+                all_events.extend(events)
+                latencies.append(latency)
+            span.count("segments", len(segments))
+            span.count("batches", len(latencies))
+            span.count("raw_events", len(all_events))
+        elapsed = time.perf_counter() - t0
+
+        merged = self.merge_events(all_events)
+        latencies.sort()
+        self.stats = {
+            "segments": len(segments),
+            "batches": len(latencies),
+            "raw_events": len(all_events),
+            "events": len(merged),
+            "elapsed_s": round(elapsed, 3),
+            "segments_per_s": round(len(segments) / elapsed, 1) if elapsed else 0.0,
+            "batch_latency_p50_s": round(latencies[len(latencies) // 2], 3),
+            "batch_latency_max_s": round(latencies[-1], 3),
+        }
+        print(f"📦 {self.stats['batches']} batches, {self.stats['segments_per_s']} segments/s, "
+              f"p50 {self.stats['batch_latency_p50_s']}s / max {self.stats['batch_latency_max_s']}s per batch")
+        return merged
+
+    @staticmethod
+    def merge_events(events, tolerance_seconds=0.0):
+        """
+        Collapses events of the same type whose time ranges overlap (reported twice
+        by neighbouring batches), keeping the most confident report. Events without
+        a usable start/end time are dropped.
+        """
+        parsed = []
+        for event in events:
+            s = TranscriptUtils.coerce_time(event.get("start_time"))
+            e = TranscriptUtils.coerce_time(event.get("end_time"))
+            if s is not None and e is not None:
+                parsed.append((event.get("event_type"), s, max(s, e), event))
+
+        parsed.sort(key=lambda x: (str(x[0]), x[1]))
+        merged = []
+        for etype, s, e, event in parsed:
+            if merged and merged[-1][0] == etype and s <= merged[-1][2] + tolerance_seconds:
+                prev = merged[-1]
+                keep = event if event.get("confidence", 0) > prev[3].get("confidence", 0) else prev[3]
+                merged[-1] = (etype, prev[1], max(prev[2], e), keep)
+            else:
+                merged.append((etype, s, e, event))
+
+        merged.sort(key=lambda m: m[1])
+        return [m[3] for m in merged]
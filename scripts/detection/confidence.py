@@ -1,57 +1,152 @@
-import re
+import math
+import numpy as np
 from typing import Dict, List
-from src.utils.transcript_utils import TranscriptUtils
+from config.settings import settings
+from scripts.utils.keyword_index import keyword_index
+from scripts.utils.transcript_index import TranscriptIndex
+from scripts.utils.transcript_utils import TranscriptUtils
+from scripts.utils.instrumentation import metrics
 
 class ConfidenceRefiner:
     """
-    Refines LLM confidence scores using rule-based heuristics.
+    Refines LLM (and rule) confidence scores using rule-based heuristics. refine() and
+    refine_batch() share one scoring path, so events from both sources compare directly.
     """
 
-    def refine(self, event: Dict, all_segments: List[Dict], llm_confidence: float) -> float:
+    def refine(self, event: Dict, all_segments, llm_confidence: float) -> float:
         """
-        Calculates final score based on keywords, duration, and LLM input.
+        Scores a single event (no clustering) on the same scale as refine_batch, with
+        `llm_confidence` as the model's (or a rule's) half of the blend.
         """
-        keyword_score = self._calculate_keyword_strength(event["event_type"], event.get("excerpt", ""))
-        duration_score = self._calculate_duration_plausibility(event)
-        
-        # Weighted Score
-        base_score = (keyword_score * 0.6) + (duration_score * 0.4)
-        
-        # Blend with LLM (50% rules, 50% LLM)
-        final_score = (base_score * 0.5) + (llm_confidence * 0.5)
-        
-        event["confidence_breakdown"] = {
-            "keyword_score": round(keyword_score, 2),
-            "duration_score": round(duration_score, 2),
-            "llm_score": llm_confidence
-        }
-        
-        return round(min(1.0, final_score), 3)
+        starts, ends = self._parse_times([event])
+        self._score([event], starts, ends, all_segments, np.array([float(llm_confidence)]))
+        return event["confidence"]
+
+    def refine_batch(self, events: List[Dict], all_segments) -> List[Dict]:
+        """
+        Refines a whole batch of LLM events at once. `all_segments` is the word-level
+        transcript or a TranscriptIndex over it. Overlapping reports of the same event
+        type are clustered into one event (the most confident report, spanning the cluster),
+        then keyword, duration and neighbouring-segment evidence are scored as arrays.
+        Returns the surviving events in time order, each with an updated `confidence`.
+        """
+        if not events:
+            return []
+        with metrics.span("confidence.refine_batch") as span:
+            refined = self._refine_batch(events, all_segments)
+            span.count("events_in", len(events))
+            span.count("events_out", len(refined))
+            return refined
+
+    def _refine_batch(self, events, all_segments):
+        starts, ends = self._parse_times(events)
+        events, starts, ends = self._cluster(events, starts, ends)
+        self._score(events, starts, ends, all_segments)
+        return events
+
+    @staticmethod
+    def _parse_times(events):
+        starts = TranscriptUtils.parse_time_array([e.get("start_time") for e in events])
+        ends = TranscriptUtils.parse_time_array([e.get("end_time") for e in events])
+        invalid = np.isnan(starts) | np.isnan(ends)
+        starts[invalid] = ends[invalid] = np.nan
+        return starts, np.maximum(starts, ends)
+
+    def _score(self, events, starts, ends, all_segments, prior=None):
+        """
+        The one scoring path for LLM and rule events: keyword, duration and context
+        evidence blended 50/50 with `prior` (default: each event's own confidence).
+        Sets `confidence` and `confidence_breakdown` on every event.
+        """
+        keyword_score = np.array([self._calculate_keyword_strength(e["event_type"], e.get("excerpt", ""))
+                                  for e in events])
+
+        # Events typically last 3-20 seconds; unparseable times stay neutral
+        duration = ends - starts
+        duration_score = np.where((duration >= 3) & (duration <= 20), 1.0, 0.5)
+
+        context_score = self._context_scores(events, starts, ends, all_segments)
+        if prior is None:
+            prior = np.array([float(e.get("confidence", 0.5)) for e in events])
+
+        base = keyword_score * 0.5 + duration_score * 0.3 + context_score * 0.2
+        final = np.minimum(1.0, base * 0.5 + prior * 0.5).round(3)
+
+        for i, event in enumerate(events):
+            event["confidence"] = float(final[i])
+            event["confidence_breakdown"] = {
+                "keyword_score": round(float(keyword_score[i]), 2),
+                "duration_score": round(float(duration_score[i]), 2),
+                "context_score": round(float(context_score[i]), 2),
+                "rule_score" if event.get("source") == "rules" else "llm_score": float(prior[i]),
+            }
+
+    def _cluster(self, events, starts, ends):
+        """
+        Folds overlapping or near-touching reports of the same type into one event.
+        Returns (events, starts, ends) sorted by start; unparseable events come last, untouched.
+        """
+        gap = settings.REFINE_MERGE_GAP_SECONDS
+        types = np.array([str(e.get("event_type")) for e in events])
+        order = np.lexsort((starts, types))  # NaN starts sort last within each type
+
+        s_list, e_list, t_list = starts.tolist(), ends.tolist(), types.tolist()
+        clusters = []  # [event index of the kept report, start, end, reports]
+        for i in order.tolist():
+            s, e = s_list[i], e_list[i]
+            head = clusters[-1] if clusters else None
+            if (not math.isnan(s) and head is not None and not math.isnan(head[1]) and t_list[head[0]] == t_list[i]
+                    and s <= head[2] + gap):
+                if events[i].get("confidence", 0) > events[head[0]].get("confidence", 0):
+                    head[0] = i
+                head[2] = max(head[2], e)
+                head[3] += 1
+            else:
+                clusters.append([i, s, e, 1])
+
+        # Time order, unparseable last
+        clusters.sort(key=lambda c: (math.isnan(c[1]), 0.0 if math.isnan(c[1]) else c[1]))
+        merged = []
+        for i, s, e, reports in clusters:
+            event = events[i]
+            if reports > 1:
+                event = dict(event, merged_reports=reports,
+                             start_time=TranscriptUtils.format_seconds(s),
+                             end_time=TranscriptUtils.format_seconds(e))
+            merged.append(event)
+        return (merged,
+                np.array([c[1] for c in clusters], dtype=np.float64),
+                np.array([c[2] for c in clusters], dtype=np.float64))
+
+    def _context_scores(self, events, starts, ends, all_segments):
+        """
+        Evidence from the transcript around each event: distinct patterns of the event's
+        type in segments overlapping the event widened by REFINE_CONTEXT_SECONDS.
+        """
+        scores = np.full(len(events), 0.2)
+        valid = ~np.isnan(starts)
+        if not valid.any():
+            return scores
+        index = all_segments if isinstance(all_segments, TranscriptIndex) else TranscriptIndex.from_segments(all_segments or [])
+        if not index.transcript.num_segments:
+            return scores
+        pad = settings.REFINE_CONTEXT_SECONDS
+        lo, hi = index.segment_range(starts - pad, ends + pad)
+
+        types = np.array([e["event_type"] for e in events])
+        for etype in dict.fromkeys(types[valid].tolist()):
+            patterns = keyword_index.event_patterns(etype)
+            if not patterns:
+                continue
+            prefix = index.pattern_prefix(patterns)
+            idx = np.flatnonzero(valid & (types == etype))
+            distinct = ((prefix[hi[idx]] - prefix[lo[idx]]) > 0).sum(axis=1)
+            scores[idx] = np.minimum(1.0, 0.2 + 0.2 * distinct)
+        return scores
 
     def _calculate_keyword_strength(self, event_type: str, excerpt: str) -> float:
-        excerpt_lower = excerpt.lower()
-        strong_keywords = {
-            "four": [r"shot", r"boundary", r"four"],
-            "six": [r"maximum", r"six", r"huge"],
-            "wicket": [r"out", r"bowled", r"caught", r"gone", r"depart"],
-            "winning_celebration": [r"win", r"champion", r"victory"]
-        }
-        
-        score = 0.2 # Base
-        if event_type in strong_keywords:
-            for pattern in strong_keywords[event_type]:
-                if re.search(pattern, excerpt_lower): score += 0.4
+        # +0.4 for each distinct strong pattern of this event type (settings.EVENT_KEYWORDS)
+        patterns = keyword_index.event_hits(excerpt, event_type)
+        score = 0.2 + 0.4 * len(patterns) # Base + hits
         
         return min(1.0, score)
-
-    def _calculate_duration_plausibility(self, event: Dict) -> float:
-        try:
-            s = TranscriptUtils.parse_time_str(event["start_time"])
-            e = TranscriptUtils.parse_time_str(event["end_time"])
-            if s is None or e is None: return 0.5
-            duration = e - s
-            # Events typically last 3-20 seconds
-            if 3 <= duration <= 20: return 1.0
-            return 0.5
-        except:
-            return 0.5
\ No newline at end of file
@@ -1,47 +1,51 @@
 import json
-import requests
 from config.settings import settings
-from src.utils.transcript_utils import TranscriptUtils
+from scripts.utils.llm_client import LLMRequestError, llm_transport
+from scripts.utils.transcript_utils import TranscriptUtils
+from scripts.utils.instrumentation import metrics
 
 class EventFinder:
     """
     Interacts with Azure OpenAI to identify cricket events from text segments.
     """
-    
+    def __init__(self, url=None, transport=None, verbose=True):
+        self.url = url
+        self.transport = transport or llm_transport
+        self.verbose = verbose
+
     def detect_events_via_llm(self, candidate_segments: list):
         """
         Sends segments to LLM and returns raw JSON list of events.
         """
-        # 1. Build Payload
-        messages = self._build_chat_messages(candidate_segments)
-        
-        body = {
-            "messages": messages,
-            "max_tokens": 10000,
-            "temperature": 0.0,
-            "top_p": 1.0,
-            "n": 1,
-        }
-
-        # 2. Call API
-        print("🤖 Calling Azure OpenAI for event detection...")
-        resp = requests.post(
-            settings.AZURE_CHAT_URL, 
-            headers={"Content-Type": "application/json", "api-key": settings.AZURE_OPENAI_API_KEY}, 
-            data=json.dumps(body)
-        )
-        
-        if resp.status_code != 200:
-            print(f"❌ Azure Request Failed: {resp.status_code} - {resp.text}")
-            return []
+        with metrics.span("event_finder.llm_call") as span:
+            # 1. Build Payload
+            messages = self._build_chat_messages(candidate_segments)
+            span.count("segments", len(candidate_segments))
+            span.count("prompt_chars", sum(len(m["content"]) for m in messages))
 
-        # 3. Parse Response
-        try:
-            content = resp.json()["choices"][0]["message"]["content"]
-            return self._extract_json(content)
-        except Exception as e:
-            print(f"❌ Error parsing response: {e}")
-            return []
+            # 2. Call API
+            if self.verbose:
+                print("🤖 Calling Azure OpenAI for event detection...")
+            # 3. Parse Response (only parseable responses are cached)
+            try:
+                events = self.transport.chat_content(
+                    messages,
+                    parse=self._extract_json,
+                    url=self.url,
+                    max_tokens=10000,
+                    temperature=0.0,
+                    top_p=1.0,
+                    n=1,
+                )
+            except LLMRequestError as e:
+                print(f"❌ {e}")
+                span.count("failures")
+                return []
+            except ValueError as e:
+                print(f"❌ Error parsing response: {e}")
+                return []
+            span.count("events", len(events))
+            return events
 
     def _build_chat_messages(self, segments):
         # Format segments for the prompt
@@ -68,11 +72,16 @@ class EventFinder:
         ]
 
     def _extract_json(self, text):
-        try:
-            start = text.find("[")
-            end = text.rfind("]")
-            if start != -1 and end != -1:
-                return json.loads(text[start:end+1])
-            return json.loads(text)
-        except:
-            return []
\ No newline at end of file
+        """The JSON array of events in `text`; raises ValueError if there is none."""
+        if not isinstance(text, str):
+            raise ValueError("Response has no text content")
+        start = text.find("[")
+        end = text.rfind("]")
+        if start != -1 and end != -1:
+            events = json.loads(text[start:end+1])
+        else:
+            events = json.loads(text)
+        if not isinstance(events, list):
+            raise ValueError(f"Expected a JSON array of events, got {type(events).__name__}")
+        # Callers index events as dicts; anything else from the model is dropped
+        return [event for event in events if isinstance(event, dict)]
\ No newline at end of file
@@ -0,0 +1,157 @@
+import asyncio
+import bisect
+import time
+from config.settings import settings
+from scripts.detection.transcriber import Transcriber
+from scripts.detection.event_finder import EventFinder
+from scripts.detection.confidence import ConfidenceRefiner
+from scripts.detection.rule_detector import RuleEventDetector
+from scripts.media.audio_decoder import AudioDecoder
+from scripts.utils.transcript_index import TranscriptIndex
+from scripts.utils.transcript_utils import TranscriptUtils
+
+class LiveEventDetector:
+    """
+    Rolling-window transcription and event detection for live match feeds.
+    """
+    def __init__(self, window_seconds=None, overlap_seconds=None):
+        self.window_seconds = window_seconds or settings.LIVE_WINDOW_SECONDS
+        self.overlap_seconds = settings.LIVE_OVERLAP_SECONDS if overlap_seconds is None else overlap_seconds
+        self.transcriber = Transcriber()
+        self.decoder = AudioDecoder()
+        self.finder = EventFinder()
+        self.refiner = ConfidenceRefiner()
+        self.rules = RuleEventDetector(verbose=False) if settings.RULE_DETECTOR_ENABLED else None
+        self.segments = []
+        self.lags = []
+        self.llm_calls_avoided = 0
+
+    def stream_events(self, source, follow=False, stdin=None):
+        """
+        Yields refined events as soon as the window containing them is transcribed.
+        Each event carries `lag_seconds`: wall time from its audio arriving to it being emitted.
+        """
+        self.transcriber.model_init()
+        self.segments = []
+        self.lags = []
+        self.llm_calls_avoided = 0
+        arrival_ends, arrival_times = [], []
+        committed_until = 0.0
+        pending = []
+
+        for window_start, samples, received_at in self.decoder.iter_windows(
+            source, self.window_seconds, self.overlap_seconds, follow=follow, stdin=stdin
+        ):
+            window_end = window_start + len(samples) / self.decoder.sample_rate
+            arrival_ends.append(window_end)
+            arrival_times.append(received_at)
+
+            segments, _ = self.transcriber.model.transcribe(
+                samples,
+                beam_size=settings.LIVE_BEAM_SIZE,
+                word_timestamps=True,
+                task="transcribe"
+            )
+            window_segments = Transcriber.segments_to_dicts(segments, time_offset=window_start)
+
+            # The next window starts at `commit_limit`. Segments starting before it are
+            # committed whole (even if they run into the overlap); segments starting inside
+            # the overlap are held back, the next window transcribes them with full context.
+            commit_limit = window_end - self.overlap_seconds
+            ready, pending = [], []
+            for seg in window_segments:
+                seg = self._unseen_part(seg, committed_until)
+                if seg is None:
+                    continue
+                (ready if seg["segment_start"] < commit_limit else pending).append(seg)
+
+            yield from self._emit(ready, arrival_ends, arrival_times)
+            if ready:
+                committed_until = ready[-1]["segment_end"]
+
+        # The feed has ended, nothing will revisit the held-back tail
+        yield from self._emit(pending, arrival_ends, arrival_times)
+
+    async def astream_events(self, source, follow=False, stdin=None):
+        """
+        Async iterator over `stream_events`; decoding and inference run in a worker thread.
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        done = object()
+
+        def produce():
+            try:
+                for event in self.stream_events(source, follow=follow, stdin=stdin):
+                    loop.call_soon_threadsafe(queue.put_nowait, event)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        producer = loop.run_in_executor(None, produce)
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            yield item
+        await producer
+
+    @staticmethod
+    def _unseen_part(seg, committed_until):
+        """
+        Drops the words of `seg` that an earlier window already committed (the overlap
+        re-transcribes the tail of the last committed segment). None if nothing is new.
+        """
+        if seg["segment_start"] >= committed_until:
+            return seg
+        if not seg["words"]:
+            # Midpoint test tolerates timestamp jitter at the window seam
+            return seg if (seg["segment_start"] + seg["segment_end"]) / 2 >= committed_until else None
+        words = [w for w in seg["words"] if (w["start"] + w["end"]) / 2 >= committed_until]
+        if not words:
+            return None
+        if len(words) == len(seg["words"]):
+            return seg
+        for w_idx, w in enumerate(words, start=1):
+            w["word_index"] = w_idx
+        return dict(seg, segment_start=words[0]["start"], words=words,
+                    text="".join(w["word"] for w in words).strip())
+
+    def _emit(self, new_segments, arrival_ends, arrival_times):
+        if not new_segments:
+            return
+        for seg in new_segments:
+            seg["segment_index"] = len(self.segments) + 1
+            self.segments.append(seg)
+
+        if settings.PREFILTER:
+            candidates = TranscriptUtils.prefilter_segments(new_segments)
+        else:
+            candidates = new_segments
+        if not candidates:
+            return
+
+        # Context scoring only looks REFINE_CONTEXT_SECONDS around the new events, so index
+        # the recent tail instead of rebuilding over the whole match every window
+        horizon = new_segments[0]["segment_start"] - 2 * settings.REFINE_CONTEXT_SECONDS
+        tail = len(self.segments)
+        while tail > 0 and self.segments[tail - 1]["segment_end"] >= horizon:
+            tail -= 1
+        index = TranscriptIndex.from_segments(self.segments[tail:])
+
+        # Clear-cut events skip the LLM round trip entirely
+        events = []
+        if self.rules is not None:
+            events, candidates = self.rules.split(candidates, index=index)
+            self.llm_calls_avoided += not candidates
+        if candidates:
+            events += self.refiner.refine_batch(self.finder.detect_events_via_llm(candidates), index)
+
+        for event in events:
+            # Lag is measured from when the audio at the event's end reached us
+            event_end = TranscriptUtils.coerce_time(event.get("end_time"))
+            if event_end is None:
+                event_end = new_segments[-1]["segment_end"]
+            idx = min(bisect.bisect_left(arrival_ends, event_end), len(arrival_ends) - 1)
+            event["lag_seconds"] = round(time.monotonic() - arrival_times[idx], 3)
+            self.lags.append(event["lag_seconds"])
+            yield event
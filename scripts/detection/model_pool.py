@@ -0,0 +1,126 @@
+import time
+import threading
+from contextlib import contextmanager
+from config.settings import settings
+from scripts.utils.instrumentation import metrics
+
+class PooledModel:
+    """
+    A loaded WhisperModel shared by concurrent callers, up to `num_workers` at a time.
+    """
+    def __init__(self, model, key, num_workers, load_time):
+        self.model = model
+        self.key = key
+        self.num_workers = num_workers
+        self.load_time = load_time
+        self._slots = threading.Semaphore(num_workers)
+        self._stats_lock = threading.Lock()
+        self.transcriptions = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @contextmanager
+    def acquire(self):
+        t0 = time.perf_counter()
+        self._slots.acquire()
+        wait = time.perf_counter() - t0
+        with self._stats_lock:
+            self.transcriptions += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+        try:
+            yield self.model
+        finally:
+            self._slots.release()
+
+    def transcribe(self, audio, **kwargs):
+        """
+        Same signature as WhisperModel.transcribe, but segments are decoded while
+        holding a worker slot and returned as a list instead of a lazy generator.
+        """
+        with self.acquire() as model:
+            segments, info = model.transcribe(audio, **kwargs)
+            return list(segments), info
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "model": "/".join(self.key),
+                "num_workers": self.num_workers,
+                "load_time_s": round(self.load_time, 3),
+                "transcriptions": self.transcriptions,
+                "avg_queue_wait_s": round(self.total_wait / self.transcriptions, 3) if self.transcriptions else 0.0,
+                "max_queue_wait_s": round(self.max_wait, 3),
+            }
+
+
+class WhisperModelPool:
+    """
+    Process-wide registry of warmed Whisper models keyed by (size, device, compute_type).
+    """
+    def __init__(self):
+        self._models = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._device = None
+
+    def default_device(self):
+        """
+        settings.WHISPER_DEVICE, resolving "auto" through CTranslate2 (faster-whisper's
+        backend) rather than torch, which is far heavier to import. Cached per process.
+        """
+        if self._device is None:
+            device = settings.WHISPER_DEVICE
+            if device == "auto":
+                try:
+                    import ctranslate2
+                    device = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+                except Exception:
+                    device = "cpu"
+            self._device = device
+        return self._device
+
+    def get(self, model_size, device, compute_type, num_workers=None, cpu_threads=None):
+        key = (model_size, device, compute_type)
+        pooled = self._models.get(key)
+        if pooled is not None:
+            return pooled
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # Only one thread loads a given model; the rest wait for it
+        with key_lock:
+            pooled = self._models.get(key)
+            if pooled is None:
+                pooled = self._load(key, num_workers or settings.WHISPER_NUM_WORKERS,
+                                    settings.WHISPER_CPU_THREADS if cpu_threads is None else cpu_threads)
+                self._models[key] = pooled
+        return pooled
+
+    def _load(self, key, num_workers, cpu_threads):
+        from faster_whisper import WhisperModel
+        model_size, device, compute_type = key
+        print(f"🚀 Loading Whisper Model ({model_size}) on {device} "
+              f"[{compute_type}, {num_workers} workers, {cpu_threads or 'auto'} threads]...")
+        t0 = time.perf_counter()
+        model = WhisperModel(
+            model_size, device=device, compute_type=compute_type,
+            num_workers=num_workers, cpu_threads=cpu_threads
+        )
+        load_time = time.perf_counter() - t0
+        print(f"✅ Whisper Model ready in {load_time:.1f}s")
+        return PooledModel(model, key, num_workers, load_time)
+
+    def release(self, model_size=None, device=None, compute_type=None):
+        """Drops one model (or all, with no arguments) so its memory can be reclaimed."""
+        with self._lock:
+            if model_size is None:
+                self._models.clear()
+            else:
+                self._models.pop((model_size, device, compute_type), None)
+
+    def stats(self):
+        return [pooled.stats() for pooled in list(self._models.values())]
+
+model_pool = WhisperModelPool()
+metrics.register_collector("whisper_models", lambda: {"models": model_pool.stats()})
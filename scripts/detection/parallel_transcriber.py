@@ -0,0 +1,144 @@
+import os
+import time
+import atexit
+import threading
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from config.settings import settings
+
+_worker_model = None
+
+
+def _init_worker(model_size, compute_type, cpu_threads):
+    global _worker_model
+    from faster_whisper import WhisperModel
+    _worker_model = WhisperModel(model_size, device="cpu", compute_type=compute_type,
+                                 cpu_threads=cpu_threads, num_workers=1)
+
+
+def _transcribe_chunk(offset_seconds, samples, beam_size):
+    from scripts.detection.transcriber import Transcriber
+    segments, _ = _worker_model.transcribe(
+        samples,
+        beam_size=beam_size,
+        word_timestamps=True,
+        task="transcribe"
+    )
+    return Transcriber.segments_to_dicts(segments, time_offset=offset_seconds)
+
+
+class ParallelTranscriber:
+    """
+    Splits long audio at voice-activity gaps and transcribes the chunks in a process pool.
+    """
+    def __init__(self, num_workers=None, chunk_seconds=None):
+        self.num_workers = num_workers or settings.PARALLEL_TRANSCRIBE_WORKERS
+        self.chunk_seconds = chunk_seconds or settings.PARALLEL_CHUNK_SECONDS
+        self.sample_rate = settings.AUDIO_SAMPLE_RATE
+        self.cpu_threads = max(1, (os.cpu_count() or 1) // self.num_workers)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # Workers keep their model between calls; only the first call pays the loads
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.num_workers,
+                    initializer=_init_worker,
+                    initargs=(settings.WHISPER_MODEL_SIZE, "int8", self.cpu_threads),
+                )
+            return self._executor
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def plan_chunks(self, audio):
+        """
+        Returns (start_sample, end_sample) chunks of roughly `chunk_seconds`,
+        cut in the middle of silences so no word straddles a boundary.
+        """
+        from faster_whisper.vad import VadOptions, get_speech_timestamps
+        speech = get_speech_timestamps(audio, VadOptions(min_silence_duration_ms=300))
+        if not speech:
+            return []
+
+        target = int(self.chunk_seconds * self.sample_rate)
+        chunks = []
+        chunk_start = 0
+        for prev, nxt in zip(speech, speech[1:]):
+            if prev["end"] - chunk_start >= target:
+                cut = (prev["end"] + nxt["start"]) // 2
+                chunks.append((chunk_start, cut))
+                chunk_start = cut
+        chunks.append((chunk_start, len(audio)))
+        return chunks
+
+    def transcribe(self, audio):
+        """
+        Transcribes a float32 mono array; output matches Transcriber.create_transcript.
+        """
+        chunks = self.plan_chunks(audio)
+        if not chunks:
+            return []
+
+        print(f"⚡ Transcribing {len(chunks)} chunks across {self.num_workers} workers "
+              f"({self.cpu_threads} threads each)...")
+        t0 = time.perf_counter()
+        executor = self._get_executor()
+        futures = [
+            executor.submit(_transcribe_chunk, start / self.sample_rate,
+                            np.ascontiguousarray(audio[start:end]), settings.WHISPER_BEAM_SIZE)
+            for start, end in chunks
+        ]
+        merged = self.merge([f.result() for f in futures])
+
+        audio_seconds = len(audio) / self.sample_rate
+        elapsed = time.perf_counter() - t0
+        print(f"✅ Transcribed {audio_seconds:.0f}s of audio in {elapsed:.1f}s "
+              f"({audio_seconds / max(elapsed, 1e-9):.1f}x real time)")
+        return merged
+
+    @staticmethod
+    def merge(chunk_segments):
+        """
+        Concatenates per-chunk segment lists (already rebased to absolute time)
+        and renumbers segment_index / word_index as one continuous transcript.
+        """
+        merged = []
+        for segments in chunk_segments:
+            for seg in segments:
+                seg["segment_index"] = len(merged) + 1
+                for w_idx, w in enumerate(seg["words"], start=1):
+                    w["word_index"] = w_idx
+                merged.append(seg)
+        return merged
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_parallel_transcriber():
+    """
+    Process-wide ParallelTranscriber (like model_pool), so every Transcriber in a
+    resident worker submits to one set of warmed processes instead of spawning its own.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ParallelTranscriber()
+            atexit.register(close_shared_parallel_transcriber)
+        return _shared
+
+
+def close_shared_parallel_transcriber():
+    """Shuts the shared pool's processes down; the next caller starts a fresh one."""
+    global _shared
+    with _shared_lock:
+        shared, _shared = _shared, None
+    if shared is not None:
+        shared.close()
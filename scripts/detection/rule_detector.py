@@ -0,0 +1,182 @@
+import re
+import time
+from config.settings import settings
+from scripts.detection.confidence import ConfidenceRefiner
+from scripts.utils.keyword_index import keyword_index
+from scripts.utils.transcript_utils import TranscriptUtils
+
+class RuleEventDetector:
+    """
+    Detects unambiguous events (four, six, wicket, fifty/century) locally from commentary
+    phrases, timed from the matched words. Segments it fully explains (every keyword is
+    part of a confident rule match) are taken out of the LLM request; everything else,
+    including hedged calls ("not out", "almost a six?"), still goes to EventFinder.
+    """
+    # (pattern, strength) per event type, matched against lowercased segment text
+    STRONG_PATTERNS = {
+        "four": [
+            (r"\bfour runs\b", 0.9),
+            (r"\b(?:that's|thats|it's|that is) (?:a |another )?four\b", 0.9),
+            (r"\bfour more\b", 0.85),
+            (r"\bto the (?:fence|rope)s?\b", 0.75),
+        ],
+        "six": [
+            (r"\b(?:that's|thats|it's|that is) (?:a |another )?six\b", 0.9),
+            (r"\bsix runs\b", 0.9),
+            (r"\bsixer\b", 0.9),
+            (r"\bmaximum\b", 0.85),
+            (r"\bout of the (?:ground|park|stadium)\b", 0.8),
+            (r"\bhuge one\b", 0.75),
+        ],
+        "wicket": [
+            (r"\b(?:clean )?bowled him\b", 0.9),
+            (r"\bcaught (?:at|by|behind|and bowled)\b", 0.85),
+            (r"\bstumped\b", 0.85),
+            (r"\b(?:he's|hes|he is|that's|thats) (?:gone|out)\b(?! of\b)", 0.85),
+            (r"\brun[- ]out\b", 0.8),
+            (r"\bgot him\b", 0.8),
+        ],
+        "fifty_century": [
+            (r"\bhalf[- ]century\b", 0.9),
+            (r"\bfifty (?:up|for)\b", 0.85),
+            (r"\b(?:his|her|a|the|brilliant|magnificent|superb) (?:century|hundred)\b", 0.85),
+        ],
+    }
+    # Hedges and reviews just before a match make the call the LLM's job
+    AMBIGUOUS_BEFORE = re.compile(
+        r"\b(?:not|no|almost|nearly|just short|didn't|wasn't|isn't|won't|could|would|might|if"
+        r"|appeal|appealing|review|drs|dropped|missed)\b[^.!?]{0,25}$"
+    )
+    AMBIGUOUS_AFTER = re.compile(r"^[^.!]{0,15}\?")
+    # Boundary types that contradict each other within one segment
+    CONFLICTS = [{"four", "six"}]
+
+    def __init__(self, threshold=None, pre_roll=None, post_roll=None, verbose=True):
+        self.threshold = settings.RULE_CONFIDENCE_THRESHOLD if threshold is None else threshold
+        self.pre_roll = settings.RULE_PRE_ROLL_SECONDS if pre_roll is None else pre_roll
+        self.post_roll = settings.RULE_POST_ROLL_SECONDS if post_roll is None else post_roll
+        self.verbose = verbose
+        self.refiner = ConfidenceRefiner()
+        self._patterns = {
+            event_type: [(re.compile(p), strength) for p, strength in rules]
+            for event_type, rules in self.STRONG_PATTERNS.items()
+        }
+        self.stats = {}
+
+    def match_segment(self, segment, index=None):
+        """
+        Returns (events, ambiguous) for one segment: rule events with their
+        confidence, and whether anything in it needs the LLM: a hedged or
+        contradicted phrase, or a keyword no rule match accounts for
+        ("... end of the over, strategic timeout now").
+        `index` (a TranscriptIndex) gives the confidence score its transcript context,
+        as for LLM events; without it only the segment itself is used.
+        """
+        text = segment["text"]
+        keywords = keyword_index.keyword_matches(text)
+        if not keywords:
+            return [], False
+        lowered = text.lower()
+
+        best = {}  # event_type -> (strength, char start, char end)
+        matched = []  # char spans of every confident phrase
+        ambiguous = False
+        for event_type, rules in self._patterns.items():
+            for pattern, strength in rules:
+                for m in pattern.finditer(lowered):
+                    if (self.AMBIGUOUS_BEFORE.search(lowered, 0, m.start())
+                            or self.AMBIGUOUS_AFTER.match(lowered[m.end():])):
+                        ambiguous = True
+                        continue
+                    matched.append((m.start(), m.end()))
+                    if event_type not in best or strength > best[event_type][0]:
+                        best[event_type] = (strength, m.start(), m.end())
+
+        if any(conflict <= best.keys() for conflict in self.CONFLICTS):
+            return [], True
+        # Other events may share the segment; the rules only explain the phrases they matched
+        if any(not any(c0 <= k0 and k1 <= c1 for c0, c1 in matched) for _, k0, k1 in keywords):
+            ambiguous = True
+
+        events = []
+        for event_type, (strength, c0, c1) in best.items():
+            if "!" in text:
+                strength = min(1.0, strength + 0.05)
+            t0, t1 = self._char_span_to_time(segment, c0, c1)
+            event = {
+                "event_type": event_type,
+                "start_time": TranscriptUtils.format_seconds(max(0.0, t0 - self.pre_roll)),
+                "end_time": TranscriptUtils.format_seconds(t1 + self.post_roll),
+                "excerpt": text,
+                "notes": f"rule match: {lowered[c0:c1]!r}",
+                "source": "rules",
+            }
+            # Scored exactly like LLM events, with the rule strength as the other half
+            self.refiner.refine(event, index if index is not None else [segment], strength)
+            events.append(event)
+        return events, ambiguous
+
+    @staticmethod
+    def _char_span_to_time(segment, c0, c1):
+        """Maps a character span of the segment text to word timestamps."""
+        words = segment.get("words") or []
+        seg_start, seg_end = segment["segment_start"], segment["segment_end"]
+        joined = "".join(w["word"] for w in words)
+        lead = len(joined) - len(joined.lstrip())
+        if not words or joined.strip() != segment["text"]:
+            # No usable word timings: interpolate across the segment
+            n = max(1, len(segment["text"]))
+            return (seg_start + (seg_end - seg_start) * c0 / n,
+                    seg_start + (seg_end - seg_start) * c1 / n)
+
+        t0 = t1 = None
+        pos = -lead
+        for w in words:
+            w_start, w_end = pos, pos + len(w["word"])
+            pos = w_end
+            if w_end <= c0:
+                continue
+            if w_start >= c1:
+                break
+            if t0 is None:
+                t0 = w["start"]
+            t1 = w["end"]
+        if t0 is None:
+            return seg_start, seg_end
+        return t0, t1
+
+    def split(self, segments, planner=None, index=None):
+        """
+        Returns (local_events, llm_segments). A segment leaves the LLM request only when
+        every event in it clears the threshold and nothing in it is ambiguous.
+        `planner` (a BatchEventFinder) turns the dropped segments into avoided requests;
+        `index` is the TranscriptIndex the LLM events are refined against.
+        """
+        t0 = time.perf_counter()
+        local_events, remaining, dropped = [], [], []
+        for seg in segments:
+            events, ambiguous = self.match_segment(seg, index)
+            confident = [e for e in events if e["confidence"] >= self.threshold]
+            if confident and len(confident) == len(events) and not ambiguous:
+                local_events.extend(confident)
+                dropped.append(seg)
+            else:
+                remaining.append(seg)
+        elapsed = time.perf_counter() - t0
+
+        self.stats = {
+            "segments": len(segments),
+            "local_segments": len(dropped),
+            "local_events": len(local_events),
+            "llm_segments": len(remaining),
+            "elapsed_ms": round(elapsed * 1000, 2),
+        }
+        if planner is not None:
+            self.stats["llm_calls_avoided"] = len(planner.plan_batches(segments)) - len(planner.plan_batches(remaining))
+            self.stats["llm_tokens_avoided"] = sum(planner.estimate_tokens(s) for s in dropped)
+        if self.verbose:
+            print(f"📏 Rules resolved {len(local_events)} events locally; "
+                  f"{len(remaining)}/{len(segments)} segments left for the LLM"
+                  + (f" ({self.stats['llm_calls_avoided']} calls, ~{self.stats['llm_tokens_avoided']} tokens avoided)"
+                     if planner is not None else ""))
+        return local_events, remaining
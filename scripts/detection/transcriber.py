@@ -1,8 +1,8 @@
-import torch
-import json
-from faster_whisper import WhisperModel
-from moviepy.editor import VideoFileClip
 from config.settings import settings
+from scripts.detection.model_pool import model_pool
+from scripts.media.audio_decoder import AudioDecoder
+from scripts.utils.transcript_cache import TranscriptCache
+from scripts.utils.instrumentation import metrics
 
 class Transcriber:
     """
@@ -10,54 +10,96 @@ class Transcriber:
     """
     def __init__(self):
         self.model_size = settings.WHISPER_MODEL_SIZE
-        self.extracted_audio_file = settings.EXTRACTED_AUDIO_FILE
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.device = model_pool.default_device()
         self.compute_type = "float16" if self.device == "cuda" else "int8"
         self.model = None
+        self.cache = TranscriptCache() if settings.TRANSCRIPT_CACHE_ENABLED else None
+        self.decoder = AudioDecoder()
 
     def model_init(self):
+        # Models are shared process-wide; only the first Transcriber pays the load
         if self.model is None:
-            print(f"🚀 Loading Whisper Model ({self.model_size}) on {self.device}...")
-            self.model = WhisperModel(self.model_size, device=self.device, compute_type=self.compute_type)
+            self.model = model_pool.get(self.model_size, self.device, self.compute_type)
 
     def audio_extract(self, video_path):
+        """
+        Decodes the audio track through an ffmpeg pipe into a float32 array
+        (memory-mapped for very long matches). Returns None on failure.
+        """
         print(f"🔊 Extracting audio from {video_path}...")
-        try:
-            video = VideoFileClip(video_path)
-            audio = video.audio
-            audio.write_audiofile(
-                self.extracted_audio_file, 
-                fps=settings.AUDIO_SAMPLE_RATE, 
-                nbytes=2, 
-                codec='pcm_s16le',
-                verbose=False, logger=None
-            )
-            video.close()
-        except Exception as e:
-            print(f"❌ Error extracting audio: {e}")
+        with metrics.span("transcriber.audio_extract") as span:
+            try:
+                audio = self.decoder.decode(video_path)
+            except Exception as e:
+                print(f"❌ Error extracting audio: {e}")
+                return None
+            span.count("audio_seconds", round(len(audio) / settings.AUDIO_SAMPLE_RATE, 3))
+            span.count("audio_bytes", audio.nbytes)
+            return audio
 
-    def create_transcript(self, video_path):
+    def create_transcript(self, video_path, use_cache=True):
         """
         Generates a transcript with word-level timestamps.
         Returns a list of segment dictionaries.
         """
-        self.audio_extract(video_path)
-        self.model_init()
+        with metrics.span("transcriber.create_transcript") as span:
+            segments = self._create_transcript(video_path, use_cache)
+            span.count("segments", len(segments))
+            span.count("words", sum(len(s.get("words") or ()) for s in segments))
+            return segments
+
+    def _create_transcript(self, video_path, use_cache):
+        parallel = settings.PARALLEL_TRANSCRIBE_WORKERS > 1 and self.device == "cpu"
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = self.cache.make_key(
+                video_path, self.model_size, settings.WHISPER_BEAM_SIZE, settings.AUDIO_SAMPLE_RATE,
+                self.device, self.compute_type, settings.PARALLEL_CHUNK_SECONDS if parallel else None
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                print(f"⚡ Loaded cached transcript for {video_path}")
+                metrics.count("transcript_cache_hits")
+                return cached
 
-        print("📝 Transcribing audio...")
-        segments, info = self.model.transcribe(
-            self.extracted_audio_file,
-            beam_size=5,
-            word_timestamps=True,
-            task="transcribe"
-        )
+        audio = self.audio_extract(video_path)
+        if audio is None:
+            return []
 
+        if parallel:
+            with metrics.span("transcriber.whisper_parallel"):
+                from scripts.detection.parallel_transcriber import shared_parallel_transcriber
+                word_level_output = shared_parallel_transcriber().transcribe(audio)
+        else:
+            with metrics.span("transcriber.model_init"):
+                self.model_init()
+
+            print("📝 Transcribing audio...")
+            with metrics.span("transcriber.whisper"):
+                segments, info = self.model.transcribe(
+                    audio,
+                    beam_size=settings.WHISPER_BEAM_SIZE,
+                    word_timestamps=True,
+                    task="transcribe"
+                )
+                word_level_output = self.segments_to_dicts(segments)
+
+        if cache_key is not None:
+            self.cache.put(cache_key, word_level_output)
+        return word_level_output
+
+    @staticmethod
+    def segments_to_dicts(segments, time_offset=0.0, start_index=1):
+        """
+        Converts Faster-Whisper segments into the word-level dict format.
+        `time_offset` rebases timestamps of audio that started mid-video.
+        """
         word_level_output = []
-        for seg_idx, segment in enumerate(segments, start=1):
+        for seg_idx, segment in enumerate(segments, start=start_index):
             seg_dict = {
                 "segment_index": seg_idx,
-                "segment_start": float(segment.start),
-                "segment_end": float(segment.end),
+                "segment_start": float(segment.start) + time_offset,
+                "segment_end": float(segment.end) + time_offset,
                 "text": segment.text.strip(),
                 "words": []
             }
@@ -65,8 +107,8 @@ class Transcriber:
                 word_info = {
                     "word_index": w_idx,
                     "word": w.word,
-                    "start": float(w.start),
-                    "end": float(w.end)
+                    "start": float(w.start) + time_offset,
+                    "end": float(w.end) + time_offset
                 }
                 seg_dict["words"].append(word_info)
             word_level_output.append(seg_dict)
@@ -1,47 +1,123 @@
+import os
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from config.settings import settings
-from src.utils.brand_manager import BrandManager
+from scripts.utils.brand_manger import BrandManager
+from scripts.utils.llm_client import llm_transport
+from scripts.utils.instrumentation import metrics
 
 class AdScriptGenerator:
     """
     Generates creative ad scripts based on live moments and brand DNA.
+    Keep one instance around: it holds the BrandManager, and requests go through
+    the shared pooled transport.
     """
-    def __init__(self):
-        self.client = settings.get_openai_client()
+    def __init__(self, brand_manager=None, max_concurrency=None):
         self.deployment_name = settings.AZURE_DEPLOYMENT_NAME
-        self.brand_manager = BrandManager()
+        self.brand_manager = brand_manager or BrandManager()
+        self.max_concurrency = max_concurrency or settings.LLM_MAX_CONCURRENCY
 
-    def create_script(self, brand_name, moment_data):
-        brand_insights = self.brand_manager.get_knowledge_base(brand_name)
+    @metrics.timed("ad_script.create_script")
+    def create_script(self, brand_name, moment_data, brand_insights=None):
+        if brand_insights is None:
+            brand_insights = self.brand_manager.get_knowledge_base(brand_name)
         event = moment_data.get('event_type', 'event')
-        excerpt = moment_data.get('excerpt', '')
 
         print(f"\n🎬 Generating script for Moment: {event}")
+        return self._generate(brand_name, brand_insights, moment_data)
 
-        prompt = f"""
-        You are a Creative Director for {brand_name}.
-        
-        **BRAND DNA:**
-        {json.dumps(brand_insights, indent=2)}
+    def create_scripts(self, brands, moments, max_concurrency=None):
+        """
+        Scripts for every brand × moment, yielded as each completes:
+        {"brand", "moment", "script", "error", "seconds"}.
+        Each knowledge base is loaded once; a brand's scripts are queued together as
+        soon as its knowledge base is ready, so requests sharing its prompt prefix
+        reach the provider back to back.
+        """
+        brands = list(dict.fromkeys(brands))
+        moments = list(moments)
+        workers = max_concurrency or self.max_concurrency
 
-        **LIVE MOMENT:**
-        - Event: {event}
-        - Commentary: "{excerpt}"
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = {pool.submit(self.brand_manager.get_knowledge_base, b): ("kb", b, None) for b in brands}
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    kind, brand, moment = pending.pop(future)
+                    if kind == "script":
+                        script, error, seconds = future.result()
+                        yield {"brand": brand, "moment": moment, "script": script, "error": error, "seconds": seconds}
+                        continue
+                    try:
+                        insights = future.result()
+                    except Exception as e:
+                        for m in moments:
+                            yield {"brand": brand, "moment": m, "script": None,
+                                   "error": f"knowledge base: {e}", "seconds": 0.0}
+                        continue
+                    for m in moments:
+                        pending[pool.submit(self._timed_generate, brand, insights, m)] = ("script", brand, m)
+
+    def _timed_generate(self, brand_name, brand_insights, moment_data):
+        t0 = time.perf_counter()
+        try:
+            script, error = self._generate(brand_name, brand_insights, moment_data), None
+        except Exception as e:
+            script, error = None, str(e)
+        return script, error, round(time.perf_counter() - t0, 3)
+
+    def _generate(self, brand_name, brand_insights, moment_data):
+        with metrics.span("ad_script.generate") as span:
+            messages = self._build_messages(brand_name, brand_insights, moment_data)
+            span.count("prompt_chars", sum(len(m["content"]) for m in messages))
+            script = llm_transport.chat_content(messages, deployment=self.deployment_name, temperature=0.7)
+            span.count("script_chars", len(script or ""))
+            return script
+
+    def _build_messages(self, brand_name, brand_insights, moment_data):
+        # Everything that doesn't depend on the moment goes first, byte-identical for every
+        # call for this brand, so the provider can reuse the cached prompt prefix
+        system_prompt = f"""
+        You are a Creative Director.
 
         **TASK:**
-        Write a 10-second TVC script connecting this specific cricket moment to the brand's promise.
-        
+        Write a 10-second TVC script connecting the given cricket moment to the brand's promise.
+
         **OUTPUT FORMAT:**
         - Title:
         - Visual:
         - Audio:
         - Voiceover:
+
+        **BRAND:** {brand_name}
+
+        **BRAND DNA:**
+        {json.dumps(brand_insights, indent=2, sort_keys=True)}
         """
 
-        response = self.client.chat.completions.create(
-            model=self.deployment_name,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-        )
+        event = moment_data.get('event_type', 'event')
+        excerpt = moment_data.get('excerpt', '')
+        moment_prompt = f"""
+        **LIVE MOMENT:**
+        - Event: {event}
+        - Commentary: "{excerpt}"
+        """
+
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": moment_prompt},
+        ]
+
+    @staticmethod
+    def save_script(brand_name, moment_data, script, output_dir="data/output_scripts"):
+        """Writes a generated script to `output_dir` and returns its path."""
+        os.makedirs(output_dir, exist_ok=True)
+
+        filename = f"{brand_name}_{moment_data['event_type']}_{moment_data['start_time'].replace(':','-')}.txt"
+        output_path = os.path.join(output_dir, filename)
 
-        return response.choices[0].message.content
\ No newline at end of file
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(script)
+        metrics.count("script_bytes_written", len(script.encode("utf-8")))
+        return output_path
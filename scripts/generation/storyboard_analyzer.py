@@ -1,16 +1,19 @@
 import json
-import requests
 from config.settings import settings
+from scripts.utils.llm_client import llm_transport
+from scripts.utils.instrumentation import metrics
 
 class StoryboardAnalyzer:
     """
     Uses Azure OpenAI to analyze video frames/scripts.
     """
-    def analyze_scenes(self, splits):
+    @metrics.timed("storyboard.analyze_scenes")
+    def analyze_scenes(self, splits, frames_dir=None):
         video_clip_data = {"frames": []}
+        frames_dir = frames_dir or settings.FRAMES_OUTPUT_DIR
         
         for i, element in enumerate(splits):
-            frame_path = f"{settings.FRAMES_OUTPUT_DIR}/scene{i}.png"
+            frame_path = f"{frames_dir}/scene{i}.png"
             video_clip_data["frames"].append({
                 "id": f"f{i+1}",
                 "file_name": frame_path,
@@ -19,23 +22,14 @@ class StoryboardAnalyzer:
 
         messages = self._build_messages(video_clip_data)
         
-        body = {
-            "messages": messages,
-            "max_tokens": 10000,
-            "temperature": 0.0
-        }
-
         print("🧠 Calling Azure OpenAI for Scene Analysis...")
         try:
-            resp = requests.post(settings.AZURE_CHAT_URL, headers={"Content-Type": "application/json", "api-key": settings.AZURE_OPENAI_API_KEY}, data=json.dumps(body))
-            if resp.status_code == 200:
-                content = resp.json()["choices"][0]["message"]["content"]
-                parsed = self._safe_parse(content)
-                # Merge script back
-                for i, item in enumerate(parsed):
-                    if i < len(splits): item['script'] = splits[i]['text']
-                return parsed
-            return []
+            # Parsed inside the transport so an unparseable answer is never cached
+            parsed = llm_transport.chat_content(messages, parse=self._parse, max_tokens=10000, temperature=0.0)
+            # Merge script back
+            for i, item in enumerate(parsed):
+                if i < len(splits): item['script'] = splits[i]['text']
+            return parsed
         except Exception as e:
             print(f"❌ Analysis failed: {e}")
             return []
@@ -46,9 +40,9 @@ class StoryboardAnalyzer:
             {"role": "user", "content": f"Analyze these frames: {json.dumps(data)}"}
         ]
 
-    def _safe_parse(self, text):
-        try:
-            text = text.replace("```json", "").replace("```", "").strip()
-            return json.loads(text)
-        except:
-            return []
\ No newline at end of file
+    def _parse(self, text):
+        text = text.replace("```json", "").replace("```", "").strip()
+        parsed = json.loads(text)
+        if not isinstance(parsed, list):
+            raise ValueError(f"Expected a JSON array of scenes, got {type(parsed).__name__}")
+        return parsed
\ No newline at end of file
@@ -0,0 +1,125 @@
+import os
+import subprocess
+import tempfile
+import time
+import threading
+import numpy as np
+from config.settings import settings
+
+class AudioDecoder:
+    """
+    Decodes audio with ffmpeg straight into mono float32 PCM arrays.
+    """
+    def __init__(self, sample_rate=None):
+        self.sample_rate = sample_rate or settings.AUDIO_SAMPLE_RATE
+
+    def _ffmpeg_cmd(self, source, follow=False):
+        cmd = ["ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error"]
+        if follow:
+            # Keep reading a file that is still being written, until it stops growing
+            cmd += ["-follow", "1", "-rw_timeout", str(int(settings.LIVE_FOLLOW_TIMEOUT * 1e6))]
+            source = f"file:{source}"
+        cmd += ["-i", source, "-vn", "-ac", "1", "-ar", str(self.sample_rate), "-f", "f32le", "pipe:1"]
+        return cmd
+
+    def decode(self, source, mmap_threshold_seconds=None):
+        """
+        Decodes the whole audio track into an in-memory float32 array.
+        Past `mmap_threshold_seconds` of audio the samples spill into an unlinked
+        temp file and a read-only np.memmap is returned instead.
+        """
+        if mmap_threshold_seconds is None:
+            mmap_threshold_seconds = settings.AUDIO_MMAP_THRESHOLD_SECONDS
+        threshold_bytes = int(mmap_threshold_seconds * self.sample_rate) * 4
+
+        proc = subprocess.Popen(
+            self._ffmpeg_cmd(source), stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        # Drained alongside stdout: a chatty ffmpeg filling the stderr pipe would
+        # otherwise block while we wait on stdout
+        stderr_chunks = []
+        stderr_reader = threading.Thread(target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True)
+        stderr_reader.start()
+        buffer = bytearray()
+        spill = None
+        try:
+            for chunk in iter(lambda: proc.stdout.read(1 << 20), b""):
+                if spill is None:
+                    buffer += chunk
+                    if len(buffer) > threshold_bytes:
+                        spill = tempfile.NamedTemporaryFile(prefix="audio_", suffix=".f32", delete=False)
+                        spill.write(buffer)
+                        buffer = bytearray()
+                else:
+                    spill.write(chunk)
+        finally:
+            proc.stdout.close()
+            proc.wait()
+            stderr_reader.join()
+            proc.stderr.close()
+            if spill is not None:
+                spill.close()
+        stderr = b"".join(stderr_chunks)
+
+        if proc.returncode != 0:
+            if spill is not None:
+                os.remove(spill.name)
+            raise RuntimeError(f"ffmpeg failed to decode {source}: {stderr.decode(errors='ignore').strip()}")
+
+        if spill is None:
+            usable = len(buffer) - len(buffer) % 4
+            return np.frombuffer(buffer, dtype=np.float32, count=usable // 4)
+
+        # A partial trailing sample (killed ffmpeg, full disk) would make the view fail
+        samples = np.memmap(spill.name, dtype=np.float32, mode="r", shape=(os.path.getsize(spill.name) // 4,))
+        try:
+            # The mapping keeps the data alive; the name is no longer needed
+            os.remove(spill.name)
+        except OSError:
+            pass
+        return samples
+
+    def iter_windows(self, source, window_seconds, overlap_seconds, follow=False, stdin=None):
+        """
+        Yields (window_start_seconds, samples, received_at) for overlapping fixed-size windows.
+        `source` is anything ffmpeg can open ("pipe:0" together with `stdin` for a pipe).
+        `received_at` is the time.monotonic() at which the last sample of the window arrived.
+        """
+        window = int(window_seconds * self.sample_rate)
+        hop = window - int(overlap_seconds * self.sample_rate)
+        if hop <= 0:
+            raise ValueError("overlap_seconds must be smaller than window_seconds")
+
+        proc = subprocess.Popen(
+            self._ffmpeg_cmd(source, follow=follow),
+            stdin=stdin if stdin is not None else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+        )
+        buffer = np.empty(0, dtype=np.float32)
+        offset = 0  # absolute sample index of buffer[0]
+        emitted_until = 0  # absolute sample index up to which audio was already yielded
+        try:
+            while True:
+                needed = window - len(buffer)
+                raw = proc.stdout.read(needed * 4) if needed > 0 else b""
+                eof = needed > 0 and len(raw) < needed * 4
+                if raw:
+                    usable = len(raw) - len(raw) % 4
+                    buffer = np.concatenate([buffer, np.frombuffer(raw[:usable], dtype=np.float32)])
+
+                if len(buffer) >= window:
+                    yield offset / self.sample_rate, buffer[:window], time.monotonic()
+                    emitted_until = offset + window
+                    buffer = buffer[hop:]
+                    offset += hop
+                if eof:
+                    # Flush the tail only if it holds audio no window has covered yet
+                    if offset + len(buffer) > emitted_until:
+                        yield offset / self.sample_rate, buffer, time.monotonic()
+                    break
+        finally:
+            proc.stdout.close()
+            if proc.poll() is None:
+                proc.terminate()
+            proc.wait()
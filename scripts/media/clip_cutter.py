@@ -0,0 +1,194 @@
+import os
+import json
+import math
+import time
+import bisect
+import tempfile
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from config.settings import settings
+
+FFMPEG = ["ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error", "-y"]
+
+
+def _run(cmd):
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+
+def _stream_copy(src, start, end, out_path, extra_args=()):
+    # Input-side -ss with stream copy starts at the keyframe at/before `start`
+    _run(FFMPEG + ["-ss", f"{start:.3f}", "-i", src, "-t", f"{end - start:.3f}",
+                   "-map", "0:v:0?", "-map", "0:a:0?", "-c", "copy", *extra_args,
+                   "-avoid_negative_ts", "make_zero", out_path])
+
+
+def _ceil_ms(t):
+    # Input-side -ss snaps back to the keyframe at/before it, so a keyframe time
+    # rounded down by .3f (e.g. NTSC) would land on the previous keyframe
+    return math.ceil(t * 1000) / 1000
+
+
+def _reencode(src, start, end, out_path, video_args=()):
+    _run(FFMPEG + ["-ss", f"{start:.3f}", "-i", src, "-t", f"{end - start:.3f}",
+                   "-map", "0:v:0?", "-map", "0:a:0?",
+                   "-c:v", "libx264", "-preset", "veryfast", "-crf", "18", *video_args, "-c:a", "aac", out_path])
+
+
+def probe_streams(path):
+    """Codec parameters a stream-copied tail must share with the re-encoded head."""
+    out = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "stream=codec_type,codec_name,profile,pix_fmt",
+         "-of", "json", path],
+        check=True, capture_output=True, text=True
+    ).stdout
+    params = {"video": None, "audio": None}
+    for stream in json.loads(out).get("streams", []):
+        kind = stream.get("codec_type")
+        if kind == "video" and params["video"] is None:
+            params["video"] = [stream.get("codec_name"), stream.get("profile"), stream.get("pix_fmt")]
+        elif kind == "audio" and params["audio"] is None:
+            params["audio"] = stream.get("codec_name")
+    return params
+
+
+# ffprobe profile name -> libx264 -profile:v
+X264_PROFILES = {"Constrained Baseline": "baseline", "Baseline": "baseline", "Main": "main", "High": "high"}
+
+
+def _head_args(streams):
+    """libx264 options that make the head match an H.264 source, or None if it cannot."""
+    codec, profile, pix_fmt = streams["video"] or (None, None, None)
+    if codec != "h264" or profile not in X264_PROFILES or not pix_fmt:
+        return None
+    return ["-profile:v", X264_PROFILES[profile], "-pix_fmt", pix_fmt]
+
+
+def _cut_clip(job):
+    """
+    Worker entry point. `job` holds src, start, end, out_path, mode, the
+    keyframe times bracketing the cut (prev_kf <= start <= next_kf) and, in
+    accurate mode, the source's probed stream parameters.
+    """
+    t0 = time.perf_counter()
+    src, start, end, out_path = job["src"], job["start"], job["end"], job["out_path"]
+    prev_kf, next_kf = job["prev_kf"], job["next_kf"]
+    try:
+        if job["mode"] == "fast":
+            _stream_copy(src, _ceil_ms(prev_kf) if prev_kf is not None else start, end, out_path)
+        elif next_kf is None or next_kf >= end:
+            # No keyframe inside the clip: nothing to copy
+            _reencode(src, start, end, out_path)
+        else:
+            tail_start = _ceil_ms(next_kf)
+            head_args = _head_args(job["streams"])
+            if next_kf - start < 0.01:
+                _stream_copy(src, tail_start, end, out_path)
+            elif head_args is None:
+                # A libx264 head cannot be spliced onto this source's stream
+                _reencode(src, start, end, out_path)
+            else:
+                # Re-encode only the GOP fragment before the first keyframe, copy the rest.
+                # Both parts go through MPEG-TS (Annex-B, SPS/PPS repeated in-band) so the
+                # tail keeps its own parameter sets: an MP4 concat would keep only the
+                # head's avcC, which breaks on level / ref-frame / extradata differences
+                with tempfile.TemporaryDirectory(prefix="clip_") as tmp:
+                    head = os.path.join(tmp, "head.ts")
+                    tail = os.path.join(tmp, "tail.ts")
+                    concat_list = os.path.join(tmp, "list.txt")
+                    _reencode(src, start, tail_start, head, head_args)
+                    _stream_copy(src, tail_start, end, tail, ["-bsf:v", "h264_mp4toannexb"])
+                    # concat -c copy "succeeds" on mismatched codecs and writes a corrupt
+                    # clip, so only splice when the head really matches the source
+                    if probe_streams(head) != job["streams"]:
+                        _reencode(src, start, end, out_path)
+                    else:
+                        with open(concat_list, "w") as f:
+                            f.write(f"file '{head}'\nfile '{tail}'\n")
+                        try:
+                            _run(FFMPEG + ["-f", "concat", "-safe", "0", "-i", concat_list,
+                                           "-c", "copy", "-bsf:a", "aac_adtstoasc", out_path])
+                        except subprocess.CalledProcessError:
+                            _reencode(src, start, end, out_path)
+        return {"out_path": out_path, "start": start, "end": end, "mode": job["mode"],
+                "seconds": round(time.perf_counter() - t0, 3), "ok": True}
+    except subprocess.CalledProcessError as e:
+        return {"out_path": out_path, "start": start, "end": end, "mode": job["mode"],
+                "seconds": round(time.perf_counter() - t0, 3), "ok": False,
+                "error": e.stderr.decode(errors="ignore").strip()[-500:] if e.stderr else str(e)}
+
+
+class ClipCutter:
+    """
+    Cuts many clips from one source with ffmpeg, concurrently, without re-encoding whole clips.
+    Modes: "fast" stream-copies from the keyframe at/before the start;
+    "accurate" re-encodes only up to the first keyframe and stream-copies the rest.
+    """
+    def __init__(self, mode=None, max_workers=None):
+        self.mode = mode or settings.CLIP_CUT_MODE
+        if self.mode not in ("fast", "accurate"):
+            raise ValueError(f"Unknown clip cut mode: {self.mode}")
+        self.max_workers = max_workers or settings.CLIP_CUT_WORKERS
+        self._keyframes = {}
+        self._streams = {}
+
+    def keyframes(self, src):
+        """Sorted keyframe timestamps of the first video stream (read from packets, no decode)."""
+        if src not in self._keyframes:
+            out = subprocess.run(
+                ["ffprobe", "-v", "error", "-select_streams", "v:0",
+                 "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", src],
+                check=True, capture_output=True, text=True
+            ).stdout
+            times = []
+            for line in out.splitlines():
+                pts, _, flags = line.partition(",")
+                if "K" in flags and pts not in ("", "N/A"):
+                    times.append(float(pts))
+            self._keyframes[src] = sorted(times)
+        return self._keyframes[src]
+
+    def streams(self, src):
+        """Probed codec parameters of `src` (see probe_streams), cached per source."""
+        if src not in self._streams:
+            self._streams[src] = probe_streams(src)
+        return self._streams[src]
+
+    @staticmethod
+    def duration(src):
+        out = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", src],
+            check=True, capture_output=True, text=True
+        ).stdout.strip()
+        return float(out) if out and out != "N/A" else None
+
+    def plan(self, src, ranges):
+        """Worker jobs for [(start, end, out_path), ...], with the bracketing keyframes resolved."""
+        keyframes = self.keyframes(src)
+        streams = self.streams(src) if self.mode == "accurate" else None
+        jobs = []
+        for start, end, out_path in ranges:
+            before = bisect.bisect_right(keyframes, start + 1e-3)
+            after = bisect.bisect_left(keyframes, start - 1e-3)
+            jobs.append({
+                "src": src, "start": start, "end": end, "out_path": out_path, "mode": self.mode,
+                "prev_kf": keyframes[before - 1] if before > 0 else None,
+                "next_kf": keyframes[after] if after < len(keyframes) else None,
+                "streams": streams,
+            })
+        return jobs
+
+    def submit(self, executor, src, start, end, out_path):
+        """Schedules one cut on a caller-owned executor; the future resolves to its result dict."""
+        return executor.submit(_cut_clip, self.plan(src, [(start, end, out_path)])[0])
+
+    def cut(self, src, ranges):
+        """
+        Cuts [(start, end, out_path), ...] from `src`.
+        Returns one result dict per clip, in input order, with per-clip timing.
+        """
+        jobs = self.plan(src, ranges)
+        if not jobs:
+            return []
+
+        with ProcessPoolExecutor(max_workers=min(self.max_workers, len(jobs))) as pool:
+            return list(pool.map(_cut_clip, jobs))
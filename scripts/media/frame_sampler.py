@@ -0,0 +1,90 @@
+from config.settings import settings
+from scripts.media.frame_scorer import FrameScorer
+
+class FrameSampler:
+    """
+    Decodes only the frames it needs by seeking in the source video.
+    Frames are returned as RGB NumPy arrays.
+    """
+    # Closer than this, decoding forward beats a seek back to the previous keyframe
+    FORWARD_GRAB_SECONDS = 2.0
+
+    def __init__(self, scorer=None, lookback_frames=None):
+        self.scorer = scorer or FrameScorer()
+        self.lookback_frames = settings.FRAME_SCORE_LOOKBACK_FRAMES if lookback_frames is None else lookback_frames
+
+    def duration(self, video_path):
+        import cv2
+        cap = cv2.VideoCapture(video_path)
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS) or 0
+            frames = cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0
+            return frames / fps if fps else 0.0
+        finally:
+            cap.release()
+
+    def sample(self, video_path, timestamps):
+        """Returns one RGB frame (or None) per timestamp, in input order."""
+        return self._sample(video_path, timestamps)[0]
+
+    def _sample(self, video_path, timestamps, lookback_frames=0):
+        """
+        Returns (frames, references): the RGB frame at each timestamp and, with
+        `lookback_frames`, the frame that many frames before it (None otherwise).
+        """
+        import cv2
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise IOError(f"Cannot open video: {video_path}")
+
+        fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+        forward_limit = int(self.FORWARD_GRAB_SECONDS * fps)
+        frames = [None] * len(timestamps)
+        references = [None] * len(timestamps)
+        position = None  # index of the frame the next read() returns
+
+        def read_at(target):
+            nonlocal position
+            if position is None or not (position <= target < position + forward_limit):
+                cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+                position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+            # Skip forward without converting frames we don't keep
+            while position < target and cap.grab():
+                position += 1
+            ok, bgr = cap.read()
+            position += 1
+            return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB) if ok else None
+
+        try:
+            for idx in sorted(range(len(timestamps)), key=lambda i: timestamps[i]):
+                target = int(round(max(0.0, timestamps[idx]) * fps))
+                if lookback_frames > 0 and target >= lookback_frames:
+                    # Read on the way to the candidate, so it costs a few extra decodes, not a seek
+                    references[idx] = read_at(target - lookback_frames)
+                frames[idx] = read_at(target)
+        finally:
+            cap.release()
+        return frames, references
+
+    def sample_scenes(self, video_path, splits, candidates=1):
+        """
+        Picks one frame per split ({"start", "end"}). Candidates are spread evenly
+        across the split (one candidate = the midpoint) and FrameScorer picks the best.
+        Returns [(timestamp, frame), ...], frame None when nothing could be decoded.
+        """
+        grids = []
+        for split in splits:
+            step = (split["end"] - split["start"]) / (max(1, candidates) + 1)
+            grids.append([split["start"] + step * (k + 1) for k in range(max(1, candidates))])
+
+        flat = [ts for grid in grids for ts in grid]
+        lookback = self.lookback_frames if candidates > 1 else 0
+        decoded, references = self._sample(video_path, flat, lookback_frames=lookback)
+
+        results, pos = [], 0
+        for grid in grids:
+            frames = decoded[pos:pos + len(grid)]
+            best = self.scorer.best_index(frames, references[pos:pos + len(grid)])
+            results.append((None, None) if best is None else (grid[best], frames[best]))
+            pos += len(grid)
+        return results
@@ -0,0 +1,69 @@
+import numpy as np
+from config.settings import settings
+
+class FrameScorer:
+    """
+    Scores candidate frames in batches at low resolution. Rewards sharpness
+    (Laplacian variance) and good exposure, penalises frames that differ sharply from
+    the frame a few frames earlier (cuts, fades, replay wipes). Ties go to the earliest frame, so picks are deterministic.
+    """
+    def __init__(self, width=None, weights=None):
+        self.width = width or settings.FRAME_SCORE_WIDTH
+        self.weights = weights or {"sharpness": 0.5, "exposure": 0.3, "stability": 0.2}
+
+    def prepare(self, frames):
+        """Downscales RGB frames into one (N, H, W) float32 grayscale stack in [0, 1]."""
+        import cv2
+        h, w = frames[0].shape[:2]
+        size = (self.width, max(1, int(round(h * self.width / w))))
+        stack = np.empty((len(frames), size[1], size[0]), dtype=np.float32)
+        for i, frame in enumerate(frames):
+            small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+            stack[i] = cv2.cvtColor(small, cv2.COLOR_RGB2GRAY)
+        stack *= 1.0 / 255.0
+        return stack
+
+    def score_batch(self, frames, references=None):
+        """
+        Scores a list of RGB frames. `references[i]` is the frame a few frames before
+        frames[i] (or None); a large difference to it means a cut or transition is nearby.
+        Frames without a reference are scored on sharpness and exposure alone, with the
+        weights renormalised, so they are neither favoured nor penalised for it.
+        Returns a dict of per-frame arrays: sharpness, exposure, change, total.
+        """
+        g = self.prepare(frames)
+
+        # 4-neighbour Laplacian over the whole batch at once
+        lap = (g[:, :-2, 1:-1] + g[:, 2:, 1:-1] + g[:, 1:-1, :-2] + g[:, 1:-1, 2:]
+               - 4.0 * g[:, 1:-1, 1:-1])
+        sharp = np.log1p(lap.var(axis=(1, 2)) * 1e4)
+        sharp = sharp / sharp.max() if sharp.max() > 0 else sharp
+
+        # Mid-grey with some contrast is best; black/white/flat transition frames score low
+        mean = g.mean(axis=(1, 2))
+        std = g.std(axis=(1, 2))
+        exposure = (1.0 - np.abs(mean - 0.5) * 2.0) * np.minimum(1.0, std * 4.0)
+
+        change = np.zeros(len(frames), dtype=np.float32)
+        stability_weight = np.zeros(len(frames), dtype=np.float32)
+        have_ref = [i for i, ref in enumerate(references or ()) if ref is not None]
+        if have_ref:
+            refs = self.prepare([references[i] for i in have_ref])
+            change[have_ref] = np.minimum(1.0, np.abs(g[have_ref] - refs).mean(axis=(1, 2)) * 4.0)
+            stability_weight[have_ref] = self.weights["stability"]
+
+        w = self.weights
+        total = ((w["sharpness"] * sharp + w["exposure"] * exposure + stability_weight * (1.0 - change))
+                 / (w["sharpness"] + w["exposure"] + stability_weight))
+        return {"sharpness": sharp, "exposure": exposure, "change": change, "total": total}
+
+    def best_index(self, frames, references=None):
+        """Index of the best frame (None entries are skipped), or None if there is none."""
+        valid = [i for i, f in enumerate(frames) if f is not None]
+        if not valid:
+            return None
+        if len(valid) == 1:
+            return valid[0]
+        refs = [references[i] for i in valid] if references is not None else None
+        scores = self.score_batch([frames[i] for i in valid], refs)["total"]
+        return valid[int(np.argmax(scores))]
@@ -1,33 +1,147 @@
 import os
-import cv2
+import time
+import threading
+import numpy as np
 from glob import glob
+from concurrent.futures import ThreadPoolExecutor
 from config.settings import settings
+from scripts.utils.instrumentation import metrics
 
 class ImageProcessor:
     """
     Handles image manipulations like filters and sketches.
     """
+    BLUR_KERNEL = 21
+
+    def __init__(self, workers=None, blur=None, blur_scale=None):
+        self.workers = workers or settings.SKETCH_WORKERS or os.cpu_count() or 1
+        self.blur = blur or settings.SKETCH_BLUR
+        # Fraction of full resolution at which the blur runs (1.0 = exact)
+        self.blur_scale = blur_scale or settings.SKETCH_BLUR_SCALE
+        self._local = threading.local()
+
+    def _buffers(self, shape):
+        # One set of working buffers per thread, reused while image sizes repeat
+        bufs = getattr(self._local, "bufs", None)
+        if bufs is None or bufs["shape"] != shape:
+            h, w = shape
+            bh, bw = max(1, int(h * self.blur_scale)), max(1, int(w * self.blur_scale))
+            bufs = {
+                "shape": shape,
+                "gray": np.empty((h, w), dtype=np.uint8),
+                "inv": np.empty((h, w), dtype=np.uint8),
+                "blur": np.empty((h, w), dtype=np.uint8),
+                "small": np.empty((bh, bw), dtype=np.uint8),
+                "small_blur": np.empty((bh, bw), dtype=np.uint8),
+                "out": np.empty((h, w), dtype=np.uint8),
+            }
+            self._local.bufs = bufs
+        return bufs
+
+    def _sketch(self, img, rgb=False):
+        """Pencil sketch of a BGR(A) (or RGB(A)) image; the result lives in a reused buffer."""
+        import cv2
+        if img.ndim == 2:
+            b = self._buffers(img.shape)
+            b["gray"][...] = img
+        else:
+            b = self._buffers(img.shape[:2])
+            if img.shape[2] == 4:
+                code = cv2.COLOR_RGBA2GRAY if rgb else cv2.COLOR_BGRA2GRAY
+            else:
+                code = cv2.COLOR_RGB2GRAY if rgb else cv2.COLOR_BGR2GRAY
+            cv2.cvtColor(img, code, dst=b["gray"])
+        cv2.bitwise_not(b["gray"], dst=b["inv"])
+
+        if self.blur_scale < 1.0:
+            # Blur a downscaled copy with a proportionally smaller kernel, then upscale
+            k = max(3, int(self.BLUR_KERNEL * self.blur_scale) | 1)
+            small = b["small"]
+            cv2.resize(b["inv"], (small.shape[1], small.shape[0]), dst=small, interpolation=cv2.INTER_AREA)
+            self._blur(small, k, b["small_blur"])
+            cv2.resize(b["small_blur"], (b["blur"].shape[1], b["blur"].shape[0]), dst=b["blur"],
+                       interpolation=cv2.INTER_LINEAR)
+        else:
+            self._blur(b["inv"], self.BLUR_KERNEL, b["blur"])
+
+        cv2.bitwise_not(b["blur"], dst=b["blur"])
+        cv2.divide(b["gray"], b["blur"], dst=b["out"], scale=256.0)
+        return b["out"]
+
+    def _blur(self, src, k, dst):
+        import cv2
+        if self.blur == "box":
+            cv2.blur(src, (k, k), dst=dst)
+        else:
+            cv2.GaussianBlur(src, (k, k), 0, dst=dst)
+
     def convert_to_sketch(self, image_path, save_path):
+        import cv2
         try:
             img = cv2.imread(image_path)
             if img is None: return
 
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            inverted_gray = 255 - gray
-            blurred = cv2.GaussianBlur(inverted_gray, (21, 21), 0)
-            inverted_blur = 255 - blurred
-            sketch = cv2.divide(gray, inverted_blur, scale=256.0)
-
-            cv2.imwrite(save_path, sketch)
+            cv2.imwrite(save_path, self._sketch(img))
         except Exception as e:
             print(f"Error sketching {image_path}: {e}")
 
-    def process_all_frames(self):
-        os.makedirs(settings.SKETCH_OUTPUT_DIR, exist_ok=True)
+    def sketch_batch(self, images, save_paths=None, rgb=False, return_arrays=False):
+        """
+        Sketches many images in parallel. `images` are file paths or arrays
+        (BGR, or RGB with rgb=True). Results are written to `save_paths` when given,
+        and returned as arrays when `return_arrays` is set (None for failures).
+        """
+        import cv2
+
+        def work(i):
+            img = images[i]
+            label = img if isinstance(img, str) else f"image {i}"
+            try:
+                if isinstance(img, str):
+                    img = cv2.imread(img)
+                    if img is None:
+                        return None
+                    sketch = self._sketch(img)
+                else:
+                    sketch = self._sketch(img, rgb=rgb)
+                if save_paths is not None:
+                    cv2.imwrite(save_paths[i], sketch)
+                return sketch.copy() if return_arrays else None
+            except Exception as e:
+                print(f"Error sketching {label}: {e}")
+                return None
+
+        t0 = time.perf_counter()
+        with metrics.span("image.sketch_batch") as span:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                results = list(pool.map(work, range(len(images))))
+            span.count("images", len(images))
+            if save_paths is not None:
+                span.count("bytes_written", sum(os.path.getsize(p) for p in save_paths if os.path.exists(p)))
+        elapsed = time.perf_counter() - t0
+        if images:
+            print(f"🎨 Sketched {len(images)} images in {elapsed:.2f}s "
+                  f"({len(images) / max(elapsed, 1e-9):.1f} images/s, {self.workers} workers)")
+        return results
+
+    def process_all_frames(self, frames=None, frames_dir=None, output_dir=None):
+        """
+        Sketches every PNG in `frames_dir` (FRAMES_OUTPUT_DIR), or the given in-memory RGB
+        scene frames (as returned by VideoManager.extract_random_frames) without re-reading
+        them, into `output_dir` (SKETCH_OUTPUT_DIR).
+        """
+        frames_dir = frames_dir or settings.FRAMES_OUTPUT_DIR
+        output_dir = output_dir or settings.SKETCH_OUTPUT_DIR
+        os.makedirs(output_dir, exist_ok=True)
         print("🎨 Converting frames to sketches...")
-        
-        frames = glob(os.path.join(settings.FRAMES_OUTPUT_DIR, "*.png"))
-        for frame_path in frames:
-            name = os.path.basename(frame_path)
-            save_path = os.path.join(settings.SKETCH_OUTPUT_DIR, f"{name.split('.')[0]}_sketch.jpg")
-            self.convert_to_sketch(frame_path, save_path)
\ No newline at end of file
+
+        if frames is not None:
+            indexed = [(f"scene{i}", f) for i, f in enumerate(frames) if f is not None]
+            images = [f for _, f in indexed]
+            names = [name for name, _ in indexed]
+        else:
+            images = glob(os.path.join(frames_dir, "*.png"))
+            names = [os.path.basename(p).split('.')[0] for p in images]
+
+        save_paths = [os.path.join(output_dir, f"{name}_sketch.jpg") for name in names]
+        self.sketch_batch(images, save_paths, rgb=frames is not None)
@@ -1,110 +1,143 @@
 import os
-import random
-from moviepy.editor import VideoFileClip
-from PIL import Image
 from config.settings import settings
-from scriptd.utils.transcript_utils import TranscriptUtils
+from scripts.utils.transcript_utils import TranscriptUtils
+from scripts.utils.transcript import Transcript
+from scripts.utils.transcript_index import TranscriptIndex
+from scripts.media.clip_cutter import ClipCutter
+from scripts.media.frame_sampler import FrameSampler
+from scripts.utils.instrumentation import metrics
 
 class VideoManager:
     """
     Handles video splitting, clip generation, and frame extraction.
     """
     def split_transcript_by_words(self, segments, num_splits=6):
-        all_words = []
-        for seg in segments: all_words.extend(seg['words'])
-        
-        if not all_words: return []
+        """
+        Splits the transcript into `num_splits` parts of equal word count.
+        Accepts a columnar Transcript, a TranscriptIndex or the word-level segment dicts;
+        with an index, scene boundaries move to the pause between the scenes' words.
+        """
+        with metrics.span("video.split_transcript"):
+            if isinstance(segments, TranscriptIndex):
+                splits = segments.transcript.split_by_words(num_splits)
+                for split in splits:
+                    split["start"], split["end"] = segments.snap(split["start"], split["end"])
+                return splits
+            transcript = segments if isinstance(segments, Transcript) else Transcript.from_segments(segments)
+            return transcript.split_by_words(num_splits)
+
+    def generate_clips(self, video_path, splits, mode=None, output_dir=None):
+        output_dir = output_dir or settings.VIDEO_CLIPS_DIR
+        with metrics.span("video.generate_clips") as span:
+            os.makedirs(output_dir, exist_ok=True)
+            print(f"✂️ Generating {len(splits)} video clips...")
 
-        total = len(all_words)
-        n = total // num_splits
-        splits = []
+            ranges = [
+                (element['start'], element['end'], os.path.join(output_dir, f"scene{i}.mp4"))
+                for i, element in enumerate(splits) if element['start'] < element['end']
+            ]
+            return self._report_cuts(ClipCutter(mode=mode).cut(video_path, ranges), span)
+
+    def extract_random_frames(self, video_path=None, splits=None, candidates=1, output_dir=None, clips_dir=None):
+        """
+        Saves one frame per scene to `output_dir` (FRAMES_OUTPUT_DIR) and returns them as
+        RGB arrays. With `video_path` and `splits` frames are read by seeking in the source
+        video; otherwise they are taken from the scene clips generate_clips wrote to `clips_dir`.
+        """
+        output_dir = output_dir or settings.FRAMES_OUTPUT_DIR
+        clips_dir = clips_dir or settings.VIDEO_CLIPS_DIR
+        with metrics.span("video.extract_frames") as span:
+            os.makedirs(output_dir, exist_ok=True)
+            sampler = FrameSampler()
 
-        for i in range(num_splits):
-            start_idx = i * n
-            end_idx = (i + 1) * n if i < num_splits - 1 else total
-            part = all_words[start_idx:end_idx]
-            
-            if part:
-                splits.append({
-                    "text": " ".join(w['word'].strip() for w in part),
-                    "start": part[0]['start'],
-                    "end": part[-1]['end']
-                })
-        return splits
-    def generate_clips(self, video_path, splits):
-        os.makedirs(settings.VIDEO_CLIPS_DIR, exist_ok=True)
-        video = VideoFileClip(video_path)
-        print(f"✂️ Generating {len(splits)} video clips...")
-        
-        for i, element in enumerate(splits):
-            start, end = element['start'], element['end']
-            if start < end:
-                out_path = os.path.join(settings.VIDEO_CLIPS_DIR, f"scene{i}.mp4")
-                video.subclip(start, end).write_videofile(
-                    out_path, codec="libx264", audio_codec="aac", 
-                    verbose=False, logger=None
-                )
+            if video_path is not None and splits is not None:
+                print(f"📸 Sampling frames for {len(splits)} scenes from {video_path}...")
+                picks = sampler.sample_scenes(video_path, splits, candidates=candidates)
+                names = [f"scene{i}" for i in range(len(splits))]
+            else:
+                clips = sorted([f for f in os.listdir(clips_dir) if f.endswith('.mp4')])
+                print(f"📸 Extracting frames from {len(clips)} clips...")
+                picks, names = [], []
+                for clip_file in clips:
+                    path = os.path.join(clips_dir, clip_file)
+                    try:
+                        picks.append(sampler.sample_scenes(
+                            path, [{"start": 0.0, "end": sampler.duration(path)}], candidates=candidates
+                        )[0])
+                    except Exception as e:
+                        print(f"Error on {clip_file}: {e}")
+                        picks.append((None, None))
+                    names.append(os.path.splitext(clip_file)[0])
 
-        video.close()
-    def extract_random_frames(self):
-        os.makedirs(settings.FRAMES_OUTPUT_DIR, exist_ok=True)
-        clips = sorted([f for f in os.listdir(settings.VIDEO_CLIPS_DIR) if f.endswith('.mp4')])
-        
-        print(f"📸 Extracting frames from {len(clips)} clips...")
-        for clip_file in clips:
-            try:
-                path = os.path.join(settings.VIDEO_CLIPS_DIR, clip_file)
-                with VideoFileClip(path) as vid:
-                    ts = random.uniform(0, vid.duration)
-                    frame = vid.get_frame(ts)
-                    out = os.path.join(settings.FRAMES_OUTPUT_DIR, f"{os.path.splitext(clip_file)[0]}.png")
-                    Image.fromarray(frame).save(out)
-            except Exception as e:
-                print(f"Error on {clip_file}: {e}")
+            from PIL import Image
+            frames = []
+            for name, (ts, frame) in zip(names, picks):
+                if frame is None:
+                    print(f"Error on {name}: no frame decoded")
+                    frames.append(None)
+                    continue
+                path = os.path.join(output_dir, f"{name}.png")
+                Image.fromarray(frame).save(path)
+                span.count("frames")
+                span.count("bytes_written", os.path.getsize(path))
+                frames.append(frame)
+            return frames
 
-    def extract_event_clips(self, video_path, events, buffer_seconds=0):
+    def extract_event_clips(self, video_path, events, buffer_seconds=0, mode=None, index=None, clips_dir=None):
         """
-        Cuts video clips for specific detected events.
+        Cuts video clips for specific detected events into `clips_dir`/highlights. With a
+        TranscriptIndex, the buffered range is widened to the nearest pauses so clips don't
+        cut mid-word.
         """
-        output_dir = os.path.join(settings.VIDEO_CLIPS_DIR, "highlights")
-        os.makedirs(output_dir, exist_ok=True)
-        
-        video = VideoFileClip(video_path)
-        print(f"✂️ Extracting {len(events)} highlight clips to '{output_dir}'...")
+        with metrics.span("video.extract_event_clips") as span:
+            output_dir = os.path.join(clips_dir or settings.VIDEO_CLIPS_DIR, "highlights")
+            os.makedirs(output_dir, exist_ok=True)
 
-        for i, event in enumerate(events):
-            try:
-                # Parse start/end times
-                start = event.get('start_time')
-                end = event.get('end_time')
+            cutter = ClipCutter(mode=mode)
+            duration = cutter.duration(video_path)
+            print(f"✂️ Extracting {len(events)} highlight clips to '{output_dir}' ({cutter.mode} mode)...")
 
-                if isinstance(start, str):
-                    start = TranscriptUtils.parse_time_str(start)
-                if isinstance(end, str):
-                    end = TranscriptUtils.parse_time_str(end)
+            ranges = []
+            for i, event in enumerate(events):
+                clip_range = self.event_clip_range(event, i, output_dir, buffer_seconds, duration, index)
+                if clip_range is not None:
+                    ranges.append(clip_range)
 
-                if start is None or end is None:
-                    continue
+            return self._report_cuts(cutter.cut(video_path, ranges), span)
+
+    @staticmethod
+    def event_clip_range(event, i, output_dir, buffer_seconds=0, duration=None, index=None):
+        """(start, end, out_path) of the highlight clip for one event, or None if it has no valid range."""
+        # Parse start/end times
+        start = TranscriptUtils.coerce_time(event.get('start_time'))
+        end = TranscriptUtils.coerce_time(event.get('end_time'))
+
+        if start is None or end is None:
+            return None
 
-                # Add buffer
-                start = max(0, start - buffer_seconds)
-                end = min(video.duration, end + buffer_seconds)
+        # Add buffer
+        start = max(0, start - buffer_seconds)
+        end = end + buffer_seconds
+        if index is not None:
+            start, end = index.snap(start, end)
+        if duration is not None:
+            end = min(duration, end)
 
-                if start < end:
-                    safe_event_type = event.get('event_type', 'event').replace(" ", "_")
-                    filename = f"event_{i}_{safe_event_type}.mp4"
-                    out_path = os.path.join(output_dir, filename)
+        if start >= end:
+            return None
+        safe_event_type = event.get('event_type', 'event').replace(" ", "_")
+        filename = f"event_{i}_{safe_event_type}.mp4"
+        return start, end, os.path.join(output_dir, filename)
 
-                    print(f"   Saving: {filename} ({start:.2f}s - {end:.2f}s)")
-                    
-                    video.subclip(start, end).write_videofile(
-                        out_path, 
-                        codec="libx264", 
-                        audio_codec="aac", 
-                        verbose=False, 
-                        logger=None
-                    )
-            except Exception as e:
-                print(f"❌ Error extracting clip for event {i}: {e}")
-        
-        video.close()
\ No newline at end of file
+    def _report_cuts(self, results, span=None):
+        for r in results:
+            name = os.path.basename(r['out_path'])
+            if span is not None:
+                span.count("clips" if r['ok'] else "clip_failures")
+                if r['ok'] and os.path.exists(r['out_path']):
+                    span.count("bytes_written", os.path.getsize(r['out_path']))
+            if r['ok']:
+                print(f"   Saved: {name} ({r['start']:.2f}s - {r['end']:.2f}s) in {r['seconds']:.2f}s")
+            else:
+                print(f"❌ Error extracting {name}: {r['error']}")
+        return results
@@ -0,0 +1,298 @@
+import os
+import json
+import time
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from config.settings import settings
+from scripts.detection.transcriber import Transcriber
+from scripts.detection.batch_event_finder import BatchEventFinder
+from scripts.detection.confidence import ConfidenceRefiner
+from scripts.detection.rule_detector import RuleEventDetector
+from scripts.media.clip_cutter import ClipCutter
+from scripts.media.video_manager import VideoManager
+from scripts.utils.instrumentation import metrics
+from scripts.utils.transcript_index import TranscriptIndex
+from scripts.utils.transcript_utils import TranscriptUtils
+
+
+class StageTimings:
+    """
+    Wall-clock spans per pipeline stage, relative to the start of the job.
+    A stage that runs many times (one clip per event) keeps its busy time and its
+    first-start/last-end window, so overlap between stages is visible.
+    Every span is also recorded in the process-wide metrics as "job.<stage>".
+    """
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.stages = {}
+
+    def now(self):
+        return time.perf_counter() - self.t0
+
+    def record(self, stage, start, end):
+        s = self.stages.setdefault(stage, {"calls": 0, "busy_s": 0.0, "first_start_s": start, "last_end_s": end})
+        s["calls"] += 1
+        s["busy_s"] += end - start
+        s["first_start_s"] = min(s["first_start_s"], start)
+        s["last_end_s"] = max(s["last_end_s"], end)
+        metrics.record(f"job.{stage}", end - start)
+
+    async def timed(self, stage, awaitable):
+        start = self.now()
+        try:
+            return await awaitable
+        finally:
+            self.record(stage, start, self.now())
+
+    def report(self):
+        return {
+            stage: {k: round(v, 3) if isinstance(v, float) else v for k, v in s.items()}
+            for stage, s in self.stages.items()
+        }
+
+
+class MatchJobOrchestrator:
+    """
+    Runs a full match job as a dependency graph instead of one script after another:
+
+        transcribe ─┬─ rules ──────────────┐
+                    ├─ LLM batches ────────┼─► per event: clip cut (process pool)
+        brand KBs ──┘  (as each completes) └─► per event × brand: ad script (async I/O)
+                    └─ storyboard (optional)
+
+    Each event is dispatched to clip cutting and script generation the moment its
+    batch returns, so moment-to-ad latency follows the critical path rather than
+    the sum of all stages. Blocking network calls run on a thread pool behind
+    asyncio; ffmpeg cuts run on a process pool.
+    """
+    def __init__(self, brands=(), extract_clips=None, clip_confidence=None, buffer_seconds=2.0,
+                 storyboard=False, io_workers=None, cpu_workers=None, outputs=None):
+        self.brands = list(brands)
+        self.extract_clips = settings.EXTRACT_CLIPS if extract_clips is None else extract_clips
+        self.clip_confidence = settings.JOB_CLIP_CONFIDENCE if clip_confidence is None else clip_confidence
+        self.buffer_seconds = buffer_seconds
+        self.storyboard = storyboard
+        self.outputs = outputs or settings.output_paths()
+        self.io_workers = io_workers or settings.LLM_MAX_CONCURRENCY * 2
+        self.cpu_workers = cpu_workers or settings.CLIP_CUT_WORKERS
+        self._generator = None
+        self._generator_lock = threading.Lock()
+
+    def run(self, video_path):
+        """Synchronous entry point; returns the job report."""
+        return asyncio.run(self.run_async(video_path))
+
+    async def run_async(self, video_path):
+        if not os.path.exists(video_path):
+            print(f"❌ Video not found: {video_path}")
+            return None
+
+        self.timings = StageTimings()
+        self.loop = asyncio.get_running_loop()
+        self.io_pool = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="job-io")
+        self.cpu_pool = ProcessPoolExecutor(max_workers=self.cpu_workers) if self.extract_clips else None
+        self.events, self.clips, self.scripts = [], [], []
+        try:
+            # Brand knowledge bases load/scrape while the audio is transcribed
+            brand_kbs = {b: asyncio.create_task(self._io("brand_kb", self._brand_kb, b)) for b in self.brands}
+            if self.extract_clips:
+                self._cutter, self._clip_count = ClipCutter(), 0
+                self._clip_dir = os.path.join(self.outputs["clips"], "highlights")
+                os.makedirs(self._clip_dir, exist_ok=True)
+                duration = asyncio.create_task(self._io("probe", self._cutter.duration, video_path))
+            segments = await self._io("transcribe", Transcriber().create_transcript, video_path)
+            if self.extract_clips:
+                self._duration = await duration
+            self._save_transcript(segments)
+            index = TranscriptIndex.from_segments(segments)
+
+            side_tasks = []
+            if self.storyboard:
+                side_tasks.append(asyncio.create_task(self._storyboard(video_path, index)))
+
+            event_tasks = []
+            async for event in self._detect(segments, index):
+                event_tasks.append(asyncio.create_task(self._handle_event(video_path, event, index, brand_kbs)))
+
+            await asyncio.gather(*event_tasks, *side_tasks, *brand_kbs.values())
+        finally:
+            self.io_pool.shutdown(wait=True)
+            if self.cpu_pool is not None:
+                self.cpu_pool.shutdown(wait=True)
+
+        return self._finish()
+
+    async def _io(self, stage, fn, *args):
+        return await self.timings.timed(stage, self.loop.run_in_executor(self.io_pool, fn, *args))
+
+    async def _detect(self, segments, index):
+        """Yields refined events as the rules and then each LLM batch produce them."""
+        candidates = TranscriptUtils.prefilter_segments(segments) if settings.PREFILTER else segments
+        finder = BatchEventFinder()
+
+        if settings.RULE_DETECTOR_ENABLED:
+            start = self.timings.now()
+            rule_events, candidates = RuleEventDetector().split(candidates, planner=finder, index=index)
+            self.timings.record("rules", start, self.timings.now())
+            for event in rule_events:
+                yield self._accept(event)
+
+        if not candidates:
+            return
+        queue, done = asyncio.Queue(), object()
+        refiner = ConfidenceRefiner()
+
+        def produce():
+            try:
+                for _, events, latency in finder.iter_batch_events(candidates):
+                    end = self.timings.now()
+                    self.loop.call_soon_threadsafe(self.timings.record, "llm_batch", end - latency, end)
+                    for event in refiner.refine_batch(events, index):
+                        self.loop.call_soon_threadsafe(queue.put_nowait, event)
+            finally:
+                self.loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        producer = self.loop.run_in_executor(self.io_pool, produce)
+        while True:
+            event = await queue.get()
+            if event is done:
+                break
+            # Neighbouring batches overlap, so the same moment can come back twice
+            if not self._is_duplicate(event):
+                yield self._accept(event)
+        await producer
+
+    def _accept(self, event):
+        event["detected_at_s"] = round(self.timings.now(), 3)
+        self.events.append(event)
+        return event
+
+    def _is_duplicate(self, event):
+        s = TranscriptUtils.coerce_time(event.get("start_time"))
+        e = TranscriptUtils.coerce_time(event.get("end_time"))
+        if s is None or e is None:
+            return False
+        for seen in self.events:
+            if seen.get("event_type") != event.get("event_type"):
+                continue
+            ss = TranscriptUtils.coerce_time(seen.get("start_time"))
+            se = TranscriptUtils.coerce_time(seen.get("end_time"))
+            if ss is not None and se is not None and s <= se and ss <= e:
+                return True
+        return False
+
+    async def _handle_event(self, video_path, event, index, brand_kbs):
+        work = []
+        if self.extract_clips and event.get("confidence", 0) > self.clip_confidence:
+            work.append(self._cut(video_path, event, index))
+        for brand in self.brands:
+            work.append(self._script(brand, event, brand_kbs[brand]))
+        await asyncio.gather(*work)
+
+    async def _cut(self, video_path, event, index):
+        clip_range = VideoManager.event_clip_range(
+            event, self._clip_count, self._clip_dir, self.buffer_seconds, self._duration, index)
+        if clip_range is None:
+            return
+        self._clip_count += 1
+        # Keyframe lookup (ffprobe, cached per source) stays off the event loop
+        future = await self.loop.run_in_executor(
+            self.io_pool, self._cutter.submit, self.cpu_pool, video_path, *clip_range)
+        result = await self.timings.timed("clip", asyncio.wrap_future(future))
+        self.clips.append(result)
+        status = "Saved" if result["ok"] else "Failed"
+        print(f"   ✂️ {status}: {os.path.basename(result['out_path'])} ({result['seconds']:.2f}s)")
+
+    async def _script(self, brand, event, brand_kb):
+        insights = await brand_kb
+        script = await self._io("ad_script", self._create_script, brand, event, insights)
+        if script is None:
+            return
+        path = self._generator.save_script(brand, event, script, output_dir=self.outputs["scripts"])
+        ready = self.timings.now()
+        self.scripts.append({
+            "brand": brand,
+            "event_type": event.get("event_type"),
+            "start_time": event.get("start_time"),
+            "path": path,
+            "moment_to_ad_s": round(ready - event["detected_at_s"], 3),
+            "ready_at_s": round(ready, 3),
+        })
+        print(f"   ✨ {brand} script for {event.get('event_type')} @ {event.get('start_time')} -> {path}")
+
+    def _generator_instance(self):
+        with self._generator_lock:
+            if self._generator is None:
+                from scripts.generation.ad_script_genrator import AdScriptGenerator
+                self._generator = AdScriptGenerator()
+            return self._generator
+
+    def _brand_kb(self, brand):
+        try:
+            return self._generator_instance().brand_manager.get_knowledge_base(brand)
+        except Exception as e:
+            # create_script retries the load; the job goes on for the other brands
+            print(f"❌ Error loading {brand} knowledge base: {e}")
+            return None
+
+    def _create_script(self, brand, event, insights=None):
+        try:
+            return self._generator_instance().create_script(brand, event, brand_insights=insights)
+        except Exception as e:
+            print(f"❌ Error generating {brand} script: {e}")
+            return None
+
+    async def _storyboard(self, video_path, index):
+        from scripts.media.image_manager import ImageProcessor
+        from scripts.generation.storyboard_analyzer import StoryboardAnalyzer
+
+        mgr = VideoManager()
+        splits = mgr.split_transcript_by_words(index, num_splits=6)
+        frames_task = self._io("storyboard_frames", mgr.extract_random_frames, video_path, splits,
+                               settings.STORYBOARD_FRAME_CANDIDATES, self.outputs["frames"])
+        analysis_task = self._io("storyboard_analysis", StoryboardAnalyzer().analyze_scenes, splits,
+                                 self.outputs["frames"])
+        frames, analysis = await asyncio.gather(frames_task, analysis_task)
+        os.makedirs(os.path.dirname(self.outputs["analysis"]), exist_ok=True)
+        with open(self.outputs["analysis"], "w", encoding="utf-8") as f:
+            json.dump(analysis, f, indent=2, ensure_ascii=False)
+        await self._io("storyboard_sketches", ImageProcessor().process_all_frames, frames,
+                       None, self.outputs["sketches"])
+
+    def _save_transcript(self, segments):
+        os.makedirs(os.path.dirname(self.outputs["transcript"]), exist_ok=True)
+        with open(self.outputs["transcript"], "w") as f:
+            json.dump(segments, f, indent=2)
+
+    def _finish(self):
+        events = BatchEventFinder.merge_events(self.events)
+        events.sort(key=lambda x: x["confidence"], reverse=True)
+        os.makedirs(os.path.dirname(self.outputs["events"]), exist_ok=True)
+        with open(self.outputs["events"], "w") as f:
+            json.dump(events, f, indent=2)
+
+        stages = self.timings.report()
+        latencies = sorted(s["moment_to_ad_s"] for s in self.scripts)
+        report = {
+            "wall_s": round(self.timings.now(), 3),
+            "sum_of_stages_s": round(sum(s["busy_s"] for s in stages.values()), 3),
+            "stages": stages,
+            "events": len(events),
+            "clips": self.clips,
+            "scripts": self.scripts,
+            "moment_to_ad_p50_s": latencies[len(latencies) // 2] if latencies else None,
+            "moment_to_ad_max_s": latencies[-1] if latencies else None,
+        }
+        os.makedirs(os.path.dirname(self.outputs["job_report"]), exist_ok=True)
+        with open(self.outputs["job_report"], "w") as f:
+            json.dump(report, f, indent=2)
+        metrics.write_report()
+
+        print(f"\n⏱️ Job finished in {report['wall_s']}s "
+              f"(stages add up to {report['sum_of_stages_s']}s): {len(events)} events, "
+              f"{len(report['clips'])} clips, {len(self.scripts)} scripts")
+        for stage, s in stages.items():
+            print(f"   {stage:<20} {s['calls']:>4}x  busy {s['busy_s']:>8.2f}s  "
+                  f"window {s['first_start_s']:.2f}-{s['last_end_s']:.2f}s")
+        return report
@@ -0,0 +1,271 @@
+import os
+import re
+import json
+import time
+import uuid
+import threading
+from glob import glob
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from config.settings import settings
+from scripts.detection.model_pool import model_pool
+from scripts.utils.brand_kb_store import brand_kb_store
+from scripts.utils.instrumentation import metrics
+
+# Job ids name files under the queue directory, so they may not carry path separators or dots
+JOB_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]+")
+
+
+def check_job_id(job_id):
+    """Returns `job_id` as a string; raises ValueError unless it is [A-Za-z0-9_-]+."""
+    job_id = str(job_id)
+    if not JOB_ID_PATTERN.fullmatch(job_id):
+        raise ValueError(f"Invalid job id {job_id!r} (letters, digits, '_' and '-' only)")
+    return job_id
+
+
+def write_json_atomic(path, data):
+    """Writes JSON next to `path` and renames it into place, so readers never see half a file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+    os.replace(tmp_path, path)
+
+
+def enqueue_job(kind, params=None, job_id=None, queue_dir=None):
+    """Drops a job file into `queue_dir`/incoming for a running worker. Returns the job id."""
+    job_id = check_job_id(job_id or uuid.uuid4().hex[:12])
+    path = os.path.join(queue_dir or settings.WORKER_QUEUE_DIR, "incoming", f"{job_id}.json")
+    write_json_atomic(path, {"id": job_id, "kind": kind, "params": params or {}})
+    return job_id
+
+
+class PipelineWorker:
+    """
+    Long-running process that executes pipeline jobs, so Whisper models, the pooled
+    Azure transport and brand knowledge bases stay loaded between jobs.
+
+    Jobs are {"id", "kind", "params"} and arrive from two places:
+    - queue directory: files in `incoming/` are claimed by renaming them into `running/`,
+      then moved to `done/` or `failed/`
+    - HTTP: POST /jobs, then GET /jobs/<id>; GET /health reports counters and cache state,
+      GET /metrics the per-stage metrics in Prometheus text format
+
+    `handlers` maps kind -> (resource, fn(params) -> JSON-serialisable result). "cpu" jobs
+    (transcription, clips) and "llm" jobs run on separate pools sized by the CPU/LLM limits,
+    so a long video never holds up script requests. LLM calls inside any job still share
+    the transport's per-deployment limits. Every result is written atomically to
+    `results/<id>.json`; the files a job produces (transcript, events, frames, clips...)
+    go to its own `outputs/<id>/`, so concurrent jobs never write the same path.
+    """
+    def __init__(self, handlers, queue_dir=None, cpu_jobs=None, llm_jobs=None, poll_seconds=None):
+        self.handlers = handlers
+        self.queue_dir = queue_dir or settings.WORKER_QUEUE_DIR
+        self.poll_seconds = poll_seconds or settings.WORKER_POLL_SECONDS
+        self.dirs = {name: os.path.join(self.queue_dir, name)
+                     for name in ("incoming", "running", "done", "failed", "results", "outputs")}
+        for path in self.dirs.values():
+            os.makedirs(path, exist_ok=True)
+
+        limits = {"cpu": cpu_jobs or settings.WORKER_CPU_JOBS, "llm": llm_jobs or settings.WORKER_LLM_JOBS}
+        self._pools = {resource: ThreadPoolExecutor(max_workers=n, thread_name_prefix=f"job-{resource}")
+                       for resource, n in limits.items()}
+        self.limits = limits
+        self._jobs = {}  # job id -> status record
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._http = None
+        self.counters = {"submitted": 0, "succeeded": 0, "failed": 0}
+        self.started_at = time.time()
+
+    # ------------------------------------------------------------------ jobs
+
+    def submit(self, job, source_path=None):
+        """Validates and schedules a job; returns its id. Raises ValueError for unknown kinds or bad ids."""
+        kind = job.get("kind")
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind {kind!r} (expected one of {', '.join(sorted(self.handlers))})")
+        job_id = check_job_id(job.get("id") or uuid.uuid4().hex[:12])
+        resource, _ = self.handlers[kind]
+        with self._lock:
+            if job_id in self._jobs and self._jobs[job_id]["status"] in ("queued", "running"):
+                raise ValueError(f"Job {job_id} is already {self._jobs[job_id]['status']}")
+            self._jobs[job_id] = {"id": job_id, "kind": kind, "status": "queued", "submitted_at": time.time()}
+            self.counters["submitted"] += 1
+        params = dict(job.get("params") or {}, output_dir=os.path.join(self.dirs["outputs"], job_id))
+        self._pools[resource].submit(self._run, job_id, kind, params, source_path)
+        return job_id
+
+    def _run(self, job_id, kind, params, source_path):
+        _, fn = self.handlers[kind]
+        with self._lock:
+            record = self._jobs[job_id]
+            record.update(status="running", started_at=time.time())
+        print(f"▶️ Job {job_id} ({kind}) started")
+        t0 = time.perf_counter()
+        try:
+            result = fn(params)
+            outcome = {"status": "done", "result": result}
+        except Exception as e:
+            outcome = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+        seconds = round(time.perf_counter() - t0, 3)
+        metrics.record(f"worker.{kind}", seconds, failed=outcome["status"] != "done")
+
+        with self._lock:
+            record.update(outcome, seconds=seconds, finished_at=time.time())
+            self.counters["succeeded" if outcome["status"] == "done" else "failed"] += 1
+            snapshot = dict(record)
+        write_json_atomic(os.path.join(self.dirs["results"], f"{job_id}.json"), snapshot)
+        if source_path is not None:
+            target = self.dirs["done" if outcome["status"] == "done" else "failed"]
+            os.replace(source_path, os.path.join(target, os.path.basename(source_path)))
+        # The result file holds the payload; keep memory flat on a long-running worker
+        with self._lock:
+            record.pop("result", None)
+        # Cumulative since the worker started, so a Prometheus textfile collector can scrape it
+        metrics.write_report(verbose=False)
+
+        if outcome["status"] == "done":
+            print(f"✅ Job {job_id} ({kind}) done in {seconds:.1f}s")
+        else:
+            print(f"❌ Job {job_id} ({kind}) failed after {seconds:.1f}s: {outcome['error']}")
+
+    def status(self, job_id):
+        """Status record for a job, with its result once finished (None if unknown)."""
+        job_id = check_job_id(job_id)
+        with self._lock:
+            record = dict(self._jobs[job_id]) if job_id in self._jobs else None
+        if record is None or record["status"] in ("done", "failed"):
+            path = os.path.join(self.dirs["results"], f"{job_id}.json")
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+        return record
+
+    def stats(self):
+        with self._lock:
+            states = [j["status"] for j in self._jobs.values()]
+            counters = dict(self.counters)
+        return {
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "limits": self.limits,
+            "queued": states.count("queued"),
+            "running": states.count("running"),
+            **counters,
+            "whisper_models": model_pool.stats(),
+            "brand_kb": brand_kb_store.stats(),
+        }
+
+    # ------------------------------------------------------------------ queue directory
+
+    def recover(self):
+        """Puts jobs a previous (crashed) worker left in running/ back in the queue."""
+        for path in glob(os.path.join(self.dirs["running"], "*.json")):
+            os.replace(path, os.path.join(self.dirs["incoming"], os.path.basename(path)))
+            print(f"↩️ Requeued interrupted job {os.path.basename(path)}")
+
+    def poll_queue(self):
+        """Claims and schedules every job file waiting in incoming/. Returns how many were taken."""
+        paths = sorted(glob(os.path.join(self.dirs["incoming"], "*.json")), key=os.path.getmtime)
+        taken = 0
+        for path in paths:
+            claimed = os.path.join(self.dirs["running"], os.path.basename(path))
+            try:
+                # Atomic claim: another worker on the same directory gets FileNotFoundError
+                os.replace(path, claimed)
+            except FileNotFoundError:
+                continue
+            try:
+                with open(claimed, "r", encoding="utf-8") as f:
+                    job = json.load(f)
+                job.setdefault("id", os.path.splitext(os.path.basename(path))[0])
+                self.submit(job, source_path=claimed)
+                taken += 1
+            except Exception as e:
+                print(f"❌ Rejected job file {os.path.basename(path)}: {e}")
+                write_json_atomic(os.path.join(self.dirs["results"], os.path.basename(path)),
+                                  {"id": os.path.splitext(os.path.basename(path))[0], "status": "failed",
+                                   "error": f"{type(e).__name__}: {e}"})
+                os.replace(claimed, os.path.join(self.dirs["failed"], os.path.basename(path)))
+        return taken
+
+    # ------------------------------------------------------------------ HTTP
+
+    def start_http(self, host=None, port=None):
+        """Serves the job API on a background thread; returns the bound (host, port)."""
+        worker = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/health":
+                    return self._reply(200, worker.stats())
+                if self.path == "/metrics":
+                    return self._reply(200, metrics.prometheus(), content_type="text/plain; version=0.0.4")
+                if self.path.startswith("/jobs/"):
+                    try:
+                        record = worker.status(self.path[len("/jobs/"):])
+                    except ValueError as e:
+                        return self._reply(400, {"error": str(e)})
+                    return self._reply(200, record) if record else self._reply(404, {"error": "unknown job"})
+                self._reply(404, {"error": "not found"})
+
+            def do_POST(self):
+                if self.path != "/jobs":
+                    return self._reply(404, {"error": "not found"})
+                try:
+                    body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                    job_id = worker.submit(json.loads(body))
+                except (ValueError, AttributeError) as e:
+                    return self._reply(400, {"error": str(e)})
+                self._reply(202, {"id": job_id, "status": "queued"})
+
+            def _reply(self, code, payload, content_type="application/json"):
+                data = (payload if isinstance(payload, str) else json.dumps(payload, default=str)).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        host = settings.WORKER_HTTP_HOST if host is None else host
+        port = settings.WORKER_HTTP_PORT if port is None else port
+        self._http = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._http.serve_forever, name="worker-http", daemon=True).start()
+        return self._http.server_address[:2]
+
+    # ------------------------------------------------------------------ lifecycle
+
+    def serve(self, http=True, host=None, port=None):
+        """Runs until stop() or Ctrl+C, then lets running jobs finish."""
+        self.recover()
+        if http:
+            bound_host, bound_port = self.start_http(host, port)
+            print(f"🌐 Accepting jobs on http://{bound_host}:{bound_port}/jobs")
+        print(f"📂 Watching {self.dirs['incoming']} "
+              f"({self.limits['cpu']} video jobs, {self.limits['llm']} LLM jobs at a time)")
+        try:
+            while not self._stop.is_set():
+                self.poll_queue()
+                self._stop.wait(self.poll_seconds)
+        except KeyboardInterrupt:
+            print("\n🛑 Stopping worker...")
+        finally:
+            self.shutdown()
+
+    def stop(self):
+        self._stop.set()
+
+    def shutdown(self):
+        if self._http is not None:
+            self._http.shutdown()
+            self._http.server_close()
+            self._http = None
+        for pool in self._pools.values():
+            pool.shutdown(wait=True)
+        # Jobs are done, so the shared chunked-transcription processes can go too
+        from scripts.detection.parallel_transcriber import close_shared_parallel_transcriber
+        close_shared_parallel_transcriber()
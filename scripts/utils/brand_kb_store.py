@@ -0,0 +1,122 @@
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from config.settings import settings
+from scripts.utils.instrumentation import metrics
+
+class BrandKBStore:
+    """
+    In-process LRU of brand knowledge bases in front of the disk files.
+    - single-flight: concurrent misses for one brand share a single load/build
+    - stale-while-revalidate: entries older than the TTL are served immediately
+      while one background refresh rebuilds them
+    Loaders return (value, built_at) where built_at is a time.time() timestamp.
+    """
+    def __init__(self, max_entries=None, ttl_seconds=None):
+        self.max_entries = max_entries or settings.BRAND_KB_CACHE_ENTRIES
+        self.ttl_seconds = settings.BRAND_KB_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._entries = OrderedDict()  # key -> (value, built_at)
+        self._inflight = {}            # key -> Future of the running load
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "stale_hits": 0, "loads": 0, "refreshes": 0, "errors": 0}
+
+    def get(self, key, load, refresh=None):
+        """
+        Returns the value for `key`, calling `load(key)` on a miss. Stale entries are
+        returned as they are and rebuilt in the background with `refresh(key)` (or `load`).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                value, built_at = entry
+                if self._is_stale(built_at) and key not in self._refreshing:
+                    self.counters["stale_hits"] += 1
+                    self._refreshing.add(key)
+                    threading.Thread(target=self._refresh, args=(key, refresh or load),
+                                     name=f"brand-kb-refresh-{key}", daemon=True).start()
+                else:
+                    self.counters["hits"] += 1
+                return value
+
+            self.counters["misses"] += 1
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            value, built_at = load(key)
+        except BaseException as e:
+            with self._lock:
+                self.counters["errors"] += 1
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self.counters["loads"] += 1
+            self._put(key, value, built_at)
+            del self._inflight[key]
+        future.set_result(value)
+        return value
+
+    def _is_stale(self, built_at):
+        return bool(self.ttl_seconds) and time.time() - built_at > self.ttl_seconds
+
+    def _put(self, key, value, built_at):
+        self._entries[key] = (value, built_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _refresh(self, key, refresh):
+        try:
+            value, built_at = refresh(key)
+            with self._lock:
+                self.counters["refreshes"] += 1
+                self._put(key, value, built_at)
+        except Exception as e:
+            # Keep serving the stale copy; the next stale hit tries again
+            with self._lock:
+                self.counters["errors"] += 1
+            print(f"⚠️ Background refresh of {key} knowledge base failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def prewarm(self, keys, load, refresh=None, max_workers=None):
+        """
+        Loads every key concurrently (sharing in-flight builds) before it is needed.
+        Returns {key: error message} for the ones that failed.
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        errors = {}
+        with ThreadPoolExecutor(max_workers=max_workers or min(8, len(keys))) as pool:
+            futures = {key: pool.submit(self.get, key, load, refresh) for key in keys}
+            for key, future in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    errors[key] = str(e)
+        return errors
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {**self.counters, "entries": len(self._entries)}
+
+brand_kb_store = BrandKBStore()
+metrics.register_collector("brand_kb", brand_kb_store.stats)
@@ -1,34 +1,73 @@
 import os
+import re
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from config.settings import settings
+from scripts.utils.brand_kb_store import brand_kb_store
+from scripts.utils.llm_client import llm_transport
+from scripts.utils.instrumentation import metrics
 
 class BrandManager:
     """
     Manages the retrieval and storage of Brand Knowledge Bases.
     """
-    def __init__(self):
-        self.firecrawl = settings.get_firecrawl_client()
-        self.client = settings.get_openai_client()
+    def __init__(self, firecrawl=None):
+        # Any object with Firecrawl's search()/scrape(); created on first build if not given
+        self._firecrawl = firecrawl
         self.deployment_name = settings.AZURE_DEPLOYMENT_NAME
+        self.last_scrape_report = []
 
+    @property
+    def firecrawl(self):
+        if self._firecrawl is None:
+            self._firecrawl = settings.get_firecrawl_client()
+        return self._firecrawl
+
+    @metrics.timed("brand.get_knowledge_base")
     def get_knowledge_base(self, brand_name):
         """
         Retrieves existing insights or triggers a new scrape if missing.
+        Served from the in-process store; disk is read once per brand, concurrent callers
+        share one build, and insights older than BRAND_KB_TTL_SECONDS are rebuilt in the background.
         """
+        return brand_kb_store.get(brand_name, self._load_or_build, self._rebuild)
+
+    def prewarm(self, brand_names):
+        """Loads (or builds) every sponsor brand's knowledge base concurrently before a match."""
+        t0 = time.perf_counter()
+        errors = brand_kb_store.prewarm(brand_names, self._load_or_build, self._rebuild)
+        for brand_name, error in errors.items():
+            print(f"❌ Could not prepare knowledge base for {brand_name}: {error}")
+        print(f"🔥 Pre-warmed {len(set(brand_names)) - len(errors)} brand knowledge bases "
+              f"in {time.perf_counter() - t0:.1f}s")
+        return errors
+
+    def _paths(self, brand_name):
         base_dir = f"data/brand_knowledge/{brand_name.lower().replace(' ', '_')}"
         insights_file = f"{base_dir}/{brand_name.lower()}_insights.json"
+        return base_dir, insights_file
+
+    def _load_or_build(self, brand_name):
+        """(insights, built_at) from disk, building the knowledge base first if it is missing."""
+        base_dir, insights_file = self._paths(brand_name)
 
         # 1. Check existing
         if os.path.exists(insights_file):
             print(f"✅ Found existing knowledge base for {brand_name}. Loading...")
             with open(insights_file, "r", encoding="utf-8") as f:
-                return json.load(f)
+                return json.load(f), os.path.getmtime(insights_file)
 
         # 2. Build new
         print(f"⚠️ No knowledge base found for {brand_name}. Starting build process...")
+        return self._rebuild(brand_name)
+
+    def _rebuild(self, brand_name):
+        base_dir, insights_file = self._paths(brand_name)
         os.makedirs(base_dir, exist_ok=True)
-        return self._build_knowledge_base(brand_name, base_dir, insights_file)
+        return self._build_knowledge_base(brand_name, base_dir, insights_file), time.time()
 
+    @metrics.timed("brand.build_knowledge_base")
     def _build_knowledge_base(self, brand_name, base_dir, output_path):
         # Search
         print(f"🔍 Searching for {brand_name} advertisements...")
@@ -41,23 +80,14 @@ class BrandManager:
                 if all(k not in item.url for k in ["youtube.com", "tiktok.com", "instagram.com"])]
 
         # Scrape
-        scraped_data = []
-        print(f"🕷️ Scraping {len(urls)} URLs...")
-        for i, url in enumerate(urls):
-            try:
-                result = self.firecrawl.scrape(url=url)
-                content = result.markdown[:8000]
-                scraped_data.append(content)
-            except Exception as e:
-                print(f"Failed to scrape {url}: {e}")
+        scraped_data = self._scrape_urls(urls)
 
         # Extract Insights via LLM
         print("🧠 Extracting brand DNA with LLM...")
-        combined_text = "\n\n".join(scraped_data)[:15000]
+        combined_text = "\n\n".join(scraped_data)[:settings.BRAND_SCRAPE_CHAR_BUDGET]
         
-        response = self.client.chat.completions.create(
-            model=self.deployment_name,
-            messages=[
+        content = llm_transport.chat_content(
+            [
                 {"role": "system", "content": "You are a senior brand strategist."},
                 {"role": "user", "content": f"""
                 Analyze the following text about {brand_name} and extract a JSON summary.
@@ -67,15 +97,99 @@ class BrandManager:
                 TEXT: {combined_text}
                 """}
             ],
+            deployment=self.deployment_name,
             temperature=0.1,
             response_format={"type": "json_object"}
         )
 
-        insights = json.loads(response.choices[0].message.content)
+        insights = json.loads(content)
 
-        # Save
-        with open(output_path, "w", encoding="utf-8") as f:
+        # Save (atomically, so concurrent readers never see a half-written file)
+        tmp_path = f"{output_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
             json.dump(insights, f, indent=2)
+        os.replace(tmp_path, output_path)
             
         print(f"💾 Knowledge base saved to {output_path}")
-        return insights
\ No newline at end of file
+        return insights
+
+    def _scrape_urls(self, urls):
+        """
+        Scrapes `urls` on a bounded pool with a per-URL timeout. Stops once the kept pages
+        fill BRAND_SCRAPE_CHAR_BUDGET and drops near-duplicate pages (syndicated press
+        releases, mirrors). Returns page texts in search-rank order; per-URL timings are
+        printed and kept in `last_scrape_report`.
+        """
+        if not urls:
+            self.last_scrape_report = []
+            return []
+        timeout = settings.BRAND_SCRAPE_TIMEOUT_SECONDS
+        budget = settings.BRAND_SCRAPE_CHAR_BUDGET
+        print(f"🕷️ Scraping {len(urls)} URLs ({settings.BRAND_SCRAPE_WORKERS} at a time)...")
+
+        started = {}
+        def scrape(url):
+            started[url] = time.perf_counter()
+            return self.firecrawl.scrape(url=url).markdown or ""
+
+        t0 = time.perf_counter()
+        report = {url: {"url": url, "status": "cancelled", "seconds": None, "chars": 0} for url in urls}
+        kept, shingles, collected = {}, [], 0
+        pool = ThreadPoolExecutor(max_workers=settings.BRAND_SCRAPE_WORKERS, thread_name_prefix="scrape")
+        pending = {pool.submit(scrape, url): url for url in urls}
+        try:
+            while pending and collected < budget:
+                now = time.perf_counter()
+                # Abandon scrapes that have been running longer than the timeout
+                for future, url in list(pending.items()):
+                    if url in started and now - started[url] > timeout:
+                        del pending[future]
+                        report[url].update(status="timeout", seconds=round(now - started[url], 3))
+                if not pending:
+                    break
+                deadlines = [started[u] + timeout - now for u in pending.values() if u in started]
+                done, _ = wait(pending, timeout=max(0.05, min(deadlines)) if deadlines else 0.05,
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    url = pending.pop(future)
+                    seconds = round(time.perf_counter() - started.get(url, t0), 3)
+                    try:
+                        text = future.result()[:settings.BRAND_SCRAPE_PAGE_CHARS]
+                    except Exception as e:
+                        report[url].update(status="failed", seconds=seconds, error=str(e))
+                        continue
+                    page_shingles = self._shingles(text)
+                    if any(self._similarity(page_shingles, other) >= settings.BRAND_SCRAPE_DEDUPE_THRESHOLD
+                           for other in shingles):
+                        report[url].update(status="duplicate", seconds=seconds, chars=len(text))
+                        continue
+                    shingles.append(page_shingles)
+                    kept[url] = text
+                    collected += len(text)
+                    report[url].update(status="ok", seconds=seconds, chars=len(text))
+        finally:
+            # Don't wait for abandoned or unneeded scrapes
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        self.last_scrape_report = list(report.values())
+        metrics.record("brand.scrape", time.perf_counter() - t0, {
+            "urls": len(urls), "pages_kept": len(kept), "chars_kept": collected,
+            "timeouts": sum(r["status"] == "timeout" for r in self.last_scrape_report),
+            "duplicates": sum(r["status"] == "duplicate" for r in self.last_scrape_report),
+        })
+        for r in self.last_scrape_report:
+            took = f"{r['seconds']:.2f}s" if r["seconds"] is not None else "-"
+            print(f"   {r['status']:<9} {took:>7} {r['chars']:>6} chars  {r['url']}")
+        print(f"🕷️ Kept {len(kept)}/{len(urls)} pages ({collected} chars) in {time.perf_counter() - t0:.2f}s")
+        return [kept[url] for url in urls if url in kept]
+
+    @staticmethod
+    def _shingles(text, size=5):
+        words = re.findall(r"\w+", text.lower())
+        return {hash(" ".join(words[i:i + size])) for i in range(max(1, len(words) - size + 1))}
+
+    @staticmethod
+    def _similarity(a, b):
+        if not a or not b:
+            return 0.0
+        return len(a & b) / len(a | b)
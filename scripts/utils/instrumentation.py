@@ -0,0 +1,287 @@
+import os
+import sys
+import json
+import time
+import signal
+import threading
+import functools
+import subprocess
+from fnmatch import fnmatch
+from contextlib import contextmanager
+from config.settings import settings
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_bytes():
+    """High-water mark of this process's resident memory (0 where unavailable)."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def current_rss_bytes():
+    """Resident memory right now (Linux /proc), falling back to the peak."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return peak_rss_bytes()
+
+
+class Span:
+    """Handle yielded by Instrumentation.span; `count()` attaches counters to the stage."""
+    def __init__(self, stage):
+        self.stage = stage
+        self.counts = {}
+
+    def count(self, name, n=1):
+        self.counts[name] = self.counts.get(name, 0) + n
+
+
+class Instrumentation:
+    """
+    Process-wide timed spans and counters for the pipeline stages.
+
+        with metrics.span("transcriber.whisper") as span:
+            ...
+            span.count("segments", len(segments))
+
+    Each stage keeps calls, errors, total/min/max seconds, its counters and memory
+    snapshots (process peak RSS, and the largest RSS growth during one call).
+    Registered collectors (LLM transport, brand KB store, Whisper pool) are added to
+    the report. Stages matching PROFILE_STAGES are profiled with cProfile or py-spy.
+    """
+    def __init__(self, enabled=None, profile_stages=None, profile_mode=None, profile_dir=None):
+        self.enabled = settings.METRICS_ENABLED if enabled is None else enabled
+        stages = settings.PROFILE_STAGES if profile_stages is None else profile_stages
+        self.profile_patterns = [p.strip() for p in stages.split(",") if p.strip()]
+        self.profile_mode = profile_mode or settings.PROFILE_MODE
+        self.profile_dir = profile_dir or settings.PROFILE_DIR
+        self._lock = threading.Lock()
+        self._profiling = threading.Lock()  # one profiled span at a time
+        self._profile_runs = 0
+        self._collectors = {}
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+            self.counters = {}
+            self.started_at = time.time()
+            self._t0 = time.perf_counter()
+
+    # ------------------------------------------------------------------ recording
+
+    @contextmanager
+    def span(self, stage):
+        span = Span(stage)
+        if not self.enabled:
+            yield span
+            return
+        profiler = self._start_profile(stage)
+        rss0 = current_rss_bytes()
+        t0 = time.perf_counter()
+        failed = False
+        try:
+            yield span
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            seconds = time.perf_counter() - t0
+            if profiler is not None:
+                self._stop_profile(stage, profiler)
+            self.record(stage, seconds, span.counts, failed, current_rss_bytes() - rss0)
+
+    def timed(self, stage):
+        """Decorator form of span() for functions that return (not generators)."""
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(stage):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def record(self, stage, seconds, counts=None, failed=False, rss_growth=0):
+        """Adds one call of `stage` measured elsewhere (e.g. a batch latency)."""
+        if not self.enabled:
+            return
+        peak = peak_rss_bytes()
+        with self._lock:
+            s = self.stages.get(stage)
+            if s is None:
+                s = self.stages[stage] = {"calls": 0, "errors": 0, "total_s": 0.0, "min_s": seconds,
+                                          "max_s": seconds, "counters": {}, "peak_rss_bytes": 0,
+                                          "max_rss_growth_bytes": 0}
+            s["calls"] += 1
+            s["errors"] += failed
+            s["total_s"] += seconds
+            s["min_s"] = min(s["min_s"], seconds)
+            s["max_s"] = max(s["max_s"], seconds)
+            s["peak_rss_bytes"] = max(s["peak_rss_bytes"], peak)
+            s["max_rss_growth_bytes"] = max(s["max_rss_growth_bytes"], rss_growth)
+            for name, n in (counts or {}).items():
+                s["counters"][name] = s["counters"].get(name, 0) + n
+
+    def count(self, name, n=1):
+        """A counter that isn't tied to one stage."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def register_collector(self, name, fn):
+        """`fn()` returns a dict of service metrics, included in every report."""
+        self._collectors[name] = fn
+
+    # ------------------------------------------------------------------ profiling
+
+    def _wants_profile(self, stage):
+        return any(p == "*" or fnmatch(stage, p) for p in self.profile_patterns)
+
+    def _start_profile(self, stage):
+        if not self.profile_patterns or not self._wants_profile(stage):
+            return None
+        if not self._profiling.acquire(blocking=False):
+            return None  # another stage is already being profiled
+        self._profile_runs += 1
+        os.makedirs(self.profile_dir, exist_ok=True)
+        base = os.path.join(self.profile_dir, f"{stage}-{os.getpid()}-{self._profile_runs}")
+        try:
+            if self.profile_mode == "py-spy":
+                # Samples every thread (and native frames) without slowing the stage down
+                path = f"{base}.speedscope.json"
+                proc = subprocess.Popen(
+                    ["py-spy", "record", "--pid", str(os.getpid()), "--output", path,
+                     "--format", "speedscope", "--rate", "100", "--nonblocking"],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                )
+                return ("py-spy", proc, path)
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+            return ("cprofile", profiler, f"{base}.prof")
+        except (OSError, ValueError) as e:
+            # py-spy missing, or a profiler already active on this thread
+            print(f"⚠️ Could not profile {stage}: {e}")
+            self._profiling.release()
+            return None
+
+    def _stop_profile(self, stage, handle):
+        mode, profiler, path = handle
+        try:
+            if mode == "py-spy":
+                profiler.send_signal(signal.SIGINT)
+                profiler.wait(timeout=30)
+            else:
+                profiler.disable()
+                profiler.dump_stats(path)
+            print(f"🔬 Profile of {stage} saved to {path}")
+        except Exception as e:
+            print(f"⚠️ Profiling {stage} failed: {e}")
+        finally:
+            self._profiling.release()
+
+    # ------------------------------------------------------------------ reports
+
+    def report(self):
+        with self._lock:
+            stages = {name: {**s, "counters": dict(s["counters"])} for name, s in self.stages.items()}
+            counters = dict(self.counters)
+            uptime = time.perf_counter() - self._t0
+
+        for s in stages.values():
+            s["avg_s"] = s["total_s"] / s["calls"] if s["calls"] else 0.0
+            for key in ("total_s", "min_s", "max_s", "avg_s"):
+                s[key] = round(s[key], 4)
+            s["peak_rss_mb"] = round(s.pop("peak_rss_bytes") / 2**20, 1)
+            s["max_rss_growth_mb"] = round(s.pop("max_rss_growth_bytes") / 2**20, 1)
+
+        services = {}
+        for name, fn in self._collectors.items():
+            try:
+                services[name] = fn()
+            except Exception as e:
+                services[name] = {"error": str(e)}
+        return {
+            "started_at": self.started_at,
+            "uptime_s": round(uptime, 3),
+            "peak_rss_mb": round(peak_rss_bytes() / 2**20, 1),
+            "stages": dict(sorted(stages.items(), key=lambda kv: kv[1]["total_s"], reverse=True)),
+            "counters": counters,
+            "services": services,
+        }
+
+    def prometheus(self, report=None):
+        """The report in Prometheus text exposition format (for a node-exporter textfile collector)."""
+        report = report or self.report()
+
+        def esc(value):
+            return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        lines = []
+        def metric(name, kind, help_text, samples):
+            if not samples:
+                return
+            lines.append(f"# HELP adv_{name} {help_text}")
+            lines.append(f"# TYPE adv_{name} {kind}")
+            for labels, value in samples:
+                label_str = ",".join(f'{k}="{esc(v)}"' for k, v in labels.items())
+                lines.append(f"adv_{name}{{{label_str}}} {value}" if label_str else f"adv_{name} {value}")
+
+        stages = report["stages"]
+        metric("stage_seconds_total", "counter", "Wall time spent in each pipeline stage.",
+               [({"stage": n}, s["total_s"]) for n, s in stages.items()])
+        metric("stage_calls_total", "counter", "Calls of each pipeline stage.",
+               [({"stage": n}, s["calls"]) for n, s in stages.items()])
+        metric("stage_errors_total", "counter", "Calls of each pipeline stage that raised.",
+               [({"stage": n}, s["errors"]) for n, s in stages.items()])
+        metric("stage_seconds_max", "gauge", "Slowest single call of each pipeline stage.",
+               [({"stage": n}, s["max_s"]) for n, s in stages.items()])
+        metric("stage_rss_growth_bytes_max", "gauge", "Largest resident memory growth during one call.",
+               [({"stage": n}, int(s["max_rss_growth_mb"] * 2**20)) for n, s in stages.items()])
+        metric("stage_items_total", "counter", "Items processed per stage (segments, tokens, clips, bytes...).",
+               [({"stage": n, "item": k}, v) for n, s in stages.items() for k, v in s["counters"].items()])
+        metric("events_total", "counter", "Counters not tied to one stage.",
+               [({"name": k}, v) for k, v in report["counters"].items()])
+        metric("peak_rss_bytes", "gauge", "Peak resident memory of the process.",
+               [({}, int(report["peak_rss_mb"] * 2**20))])
+        metric("service_metric", "gauge", "Numeric metrics reported by shared services.",
+               [({"service": svc, "name": k}, v) for svc, values in report["services"].items()
+                if isinstance(values, dict)
+                for k, v in values.items() if isinstance(v, (int, float)) and not isinstance(v, bool)])
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, path=None, prometheus_path=None, verbose=True):
+        """
+        Writes the JSON run report (METRICS_REPORT_FILE) and, when configured, the
+        Prometheus text file (METRICS_PROMETHEUS_FILE). Both are replaced atomically.
+        """
+        if not self.enabled:
+            return None
+        report = self.report()
+        path = path or settings.METRICS_REPORT_FILE
+        prometheus_path = prometheus_path or settings.METRICS_PROMETHEUS_FILE
+        self._write_atomic(path, json.dumps(report, indent=2, default=str))
+        if prometheus_path:
+            self._write_atomic(prometheus_path, self.prometheus(report))
+        if verbose:
+            top = ", ".join(f"{name} {s['total_s']:.2f}s" for name, s in list(report["stages"].items())[:3])
+            print(f"📊 Metrics saved to {path}" + (f" (slowest: {top})" if top else ""))
+        return report
+
+    @staticmethod
+    def _write_atomic(path, text):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+metrics = Instrumentation()
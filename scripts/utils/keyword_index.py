@@ -0,0 +1,70 @@
+import re
+from config.settings import settings
+
+class KeywordIndex:
+    """
+    Keyword matchers compiled once at startup.
+    - keywords: settings.KEYWORDS as whole words (the prefilter semantics)
+    - event patterns: settings.EVENT_KEYWORDS substrings grouped by event type
+      (the ConfidenceRefiner semantics)
+    Lookahead alternations report overlapping hits ("not out" and "out") with positions.
+    """
+    def __init__(self, keywords=None, event_keywords=None):
+        keywords = settings.KEYWORDS if keywords is None else keywords
+        self.event_keywords = settings.EVENT_KEYWORDS if event_keywords is None else event_keywords
+
+        # Longest first, so the lookahead reports the most specific hit at each position
+        kw_alts = "|".join(re.escape(k) for k in sorted(set(keywords), key=len, reverse=True))
+        self._kw_search = re.compile(r"\b(?:" + kw_alts + r")\b", flags=re.I)
+        self._kw_scan = re.compile(r"\b(?=(" + kw_alts + r")\b)", flags=re.I)
+
+        # Pattern -> event types that count it
+        self._pattern_events = {}
+        for event_type, patterns in self.event_keywords.items():
+            for p in patterns:
+                self._pattern_events.setdefault(p.lower(), []).append(event_type)
+        ev_alts = "|".join(re.escape(p) for p in sorted(self._pattern_events, key=len, reverse=True))
+        self._ev_scan = re.compile(r"(?=(" + ev_alts + r"))", flags=re.I) if ev_alts else None
+        # Patterns are plain substrings, so single-type scoring is a few `in` tests
+        self._type_patterns = {
+            event_type: tuple(dict.fromkeys(p.lower() for p in patterns))
+            for event_type, patterns in self.event_keywords.items()
+        }
+
+    def has_keyword(self, text):
+        return self._kw_search.search(text) is not None
+
+    def keyword_matches(self, text):
+        """[(keyword, start, end), ...] for every whole-word keyword occurrence."""
+        return [(m.group(1).lower(), m.start(1), m.end(1)) for m in self._kw_scan.finditer(text)]
+
+    def event_matches(self, text):
+        """[(event_type, pattern, start, end), ...] for every event-pattern occurrence."""
+        if self._ev_scan is None:
+            return []
+        hits = []
+        for m in self._ev_scan.finditer(text):
+            pattern = m.group(1).lower()
+            for event_type in self._pattern_events[pattern]:
+                hits.append((event_type, pattern, m.start(1), m.end(1)))
+        return hits
+
+    def event_patterns(self, event_type):
+        """Lowercased patterns that back up `event_type`."""
+        return self._type_patterns.get(event_type, ())
+
+    def event_hits(self, text, event_type=None):
+        """{event_type: set of distinct patterns found}, or just that set for one `event_type`."""
+        if event_type is not None:
+            lowered = text.lower()
+            return {p for p in self._type_patterns.get(event_type, ()) if p in lowered}
+        found = {}
+        for event_type, pattern, _, _ in self.event_matches(text):
+            found.setdefault(event_type, set()).add(pattern)
+        return found
+
+    def scan(self, text):
+        """Keywords and event types matched in `text`, with positions."""
+        return {"keywords": self.keyword_matches(text), "events": self.event_matches(text)}
+
+keyword_index = KeywordIndex()
@@ -0,0 +1,102 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from config.settings import settings
+
+class LLMResponseCache:
+    """
+    Persistent SQLite cache of chat-completion responses, keyed on a canonical hash
+    of (deployment, messages, parameters). Only meant for deterministic requests.
+    """
+    def __init__(self, path=None, ttl_seconds=None, max_entries=None):
+        self.path = path or settings.LLM_CACHE_FILE
+        self.ttl_seconds = settings.LLM_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.max_entries = max_entries or settings.LLM_CACHE_MAX_ENTRIES
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(deployment, messages, params):
+        canonical = json.dumps(
+            {"deployment": deployment, "messages": messages, "params": params},
+            sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _record(self, hit):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key):
+        conn = self._conn()
+        row = conn.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None or (self.ttl_seconds and now - row[1] > self.ttl_seconds):
+            if row is not None:
+                with conn:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._record(False)
+            return None
+
+        with conn:
+            conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        self._record(True)
+        return json.loads(row[0])
+
+    def put(self, key, response):
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(response, separators=(",", ":")), now, now)
+            )
+            # Keep only the most recently used entries
+            conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def delete(self, key):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM responses")
+
+    def stats(self):
+        entries = self._conn().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "cache_hits": self.hits,
+                "cache_misses": self.misses,
+                "cache_hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "cache_entries": entries,
+            }
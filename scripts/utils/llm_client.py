@@ -0,0 +1,266 @@
+import json
+import time
+import random
+import threading
+from collections import deque
+from email.utils import parsedate_to_datetime
+from config.settings import settings
+from scripts.utils.llm_cache import LLMResponseCache
+from scripts.utils.instrumentation import metrics
+
+class LLMRequestError(Exception):
+    """Raised when a chat completion fails after all retries."""
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class DeploymentLimiter:
+    """
+    Caps in-flight requests and tokens per minute for one deployment.
+    Tokens are budgeted the way Azure counts them: prompt estimate plus max_tokens.
+    """
+    def __init__(self, max_concurrency, tokens_per_minute):
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.tokens_per_minute = tokens_per_minute
+        self._available = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve_tokens(self, tokens):
+        """Blocks until `tokens` fit in the rolling budget; returns seconds waited."""
+        if not self.tokens_per_minute:
+            return 0.0
+        tokens = min(tokens, self.tokens_per_minute)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                refill = (now - self._updated) * self.tokens_per_minute / 60.0
+                self._available = min(self.tokens_per_minute, self._available + refill)
+                self._updated = now
+                if self._available >= tokens:
+                    self._available -= tokens
+                    return waited
+                delay = (tokens - self._available) * 60.0 / self.tokens_per_minute
+            time.sleep(delay)
+            waited += delay
+
+
+class LLMTransport:
+    """
+    Shared HTTP transport for Azure OpenAI chat completions: pooled keep-alive
+    connections, exponential backoff with jitter that honours Retry-After, and
+    per-deployment concurrency / token-per-minute limits.
+    """
+    RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+    def __init__(self, max_retries=None, pool_size=None):
+        self.max_retries = settings.LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.pool_size = pool_size or settings.LLM_POOL_SIZE
+        self._session = None
+        self._lock = threading.Lock()
+        self._limiters = {}
+        self._latencies = deque(maxlen=2000)
+        self.cache = LLMResponseCache() if settings.LLM_CACHE_ENABLED else None
+        self.counters = {
+            "requests": 0, "attempts": 0, "retries": 0, "throttles": 0, "failures": 0,
+            "prompt_tokens": 0, "cached_prompt_tokens": 0, "completion_tokens": 0, "rate_limit_wait_s": 0.0,
+        }
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+        return self._session
+
+    def _limiter(self, deployment):
+        with self._lock:
+            limiter = self._limiters.get(deployment)
+            if limiter is None:
+                limiter = self._limiters[deployment] = DeploymentLimiter(
+                    settings.LLM_MAX_CONCURRENCY, settings.LLM_TOKENS_PER_MINUTE
+                )
+            return limiter
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.counters[key] += n
+
+    @staticmethod
+    def chat_url(deployment):
+        return (f"{settings.AZURE_OPENAI_ENDPOINT}/openai/deployments/{deployment}"
+                f"/chat/completions?api-version={settings.AZURE_API_VERSION}")
+
+    def chat(self, messages, deployment=None, url=None, use_cache=True, **params):
+        """
+        POSTs a chat completion and returns the decoded JSON response.
+        `params` go straight into the request body (temperature, max_tokens, response_format, ...).
+        Temperature-0 requests are served from the response cache unless `use_cache` is False.
+        """
+        data, cache_key, cached = self._chat(messages, deployment, url, use_cache, **params)
+        if cache_key is not None and not cached:
+            self.cache.put(cache_key, data)
+        return data
+
+    def _chat(self, messages, deployment=None, url=None, use_cache=True, **params):
+        """(response, cache key or None, whether it came from the cache); stores nothing."""
+        deployment = deployment or settings.AZURE_DEPLOYMENT_NAME
+        if url is None:
+            url = settings.AZURE_CHAT_URL if deployment == settings.AZURE_DEPLOYMENT_NAME else self.chat_url(deployment)
+        if not url:
+            raise LLMRequestError("Missing AZURE_OPENAI_ENDPOINT in .env file")
+
+        cache_key = None
+        if self.cache is not None and use_cache and params.get("temperature", 1.0) == 0:
+            # The URL pins both the deployment and the API version
+            cache_key = self.cache.make_key(url, messages, params)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached, cache_key, True
+
+        return self._send(url, deployment, messages, params), cache_key, False
+
+    def _send(self, url, deployment, messages, params):
+        body = json.dumps({"messages": messages, **params})
+        headers = {"Content-Type": "application/json", "api-key": settings.AZURE_OPENAI_API_KEY or ""}
+        limiter = self._limiter(deployment)
+        self._count("requests")
+
+        waited = limiter.reserve_tokens(len(body) // 4 + params.get("max_tokens", 0))
+        if waited:
+            self._count("rate_limit_wait_s", waited)
+
+        with limiter.slots:
+            return self._post_with_retries(url, body, headers)
+
+    def _post_with_retries(self, url, body, headers):
+        import requests
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count("retries")
+            self._count("attempts")
+            t0 = time.perf_counter()
+            retry_after = None
+            try:
+                resp = self.session.post(url, data=body, headers=headers, timeout=settings.LLM_TIMEOUT_SECONDS)
+            except requests.RequestException as e:
+                last_error = LLMRequestError(f"Azure request error: {e}")
+            else:
+                with self._lock:
+                    self._latencies.append(time.perf_counter() - t0)
+                if resp.status_code == 200:
+                    data = self._decode(resp)
+                    if data is not None:
+                        usage = data.get("usage") or {}
+                        self._count("prompt_tokens", usage.get("prompt_tokens", 0))
+                        # Prompt tokens served from the provider's prefix cache
+                        self._count("cached_prompt_tokens", (usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0))
+                        self._count("completion_tokens", usage.get("completion_tokens", 0))
+                        return data
+                    # A truncated or non-JSON 200 (e.g. a proxy error page) is retried like a 5xx
+                    last_error = LLMRequestError(
+                        f"Azure returned an invalid JSON body: {resp.text[:500]}", resp.status_code
+                    )
+                else:
+                    last_error = LLMRequestError(
+                        f"Azure Request Failed: {resp.status_code} - {resp.text[:500]}", resp.status_code
+                    )
+                    if resp.status_code == 429:
+                        self._count("throttles")
+                    if resp.status_code not in self.RETRY_STATUSES:
+                        break
+                    retry_after = self._retry_after(resp.headers)
+
+            if attempt < self.max_retries:
+                time.sleep(self._backoff(attempt, retry_after))
+
+        self._count("failures")
+        raise last_error
+
+    @staticmethod
+    def _decode(resp):
+        """The response body as a JSON object, or None if it is not one."""
+        try:
+            data = resp.json()
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+
+    @staticmethod
+    def _retry_after(headers):
+        ms = headers.get("retry-after-ms")
+        if ms:
+            try:
+                return float(ms) / 1000.0
+            except ValueError:
+                pass
+        value = headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                return None
+
+    @staticmethod
+    def _backoff(attempt, retry_after=None):
+        if retry_after is not None:
+            # The server said when; add a little jitter so parallel callers don't stampede
+            return retry_after + random.uniform(0, 0.25 * max(retry_after, 1.0))
+        ceiling = min(settings.LLM_BACKOFF_MAX_SECONDS, settings.LLM_BACKOFF_BASE_SECONDS * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def chat_content(self, messages, parse=None, **kwargs):
+        """
+        Like chat(), but returns only the first choice's message content, passed
+        through `parse` if given. A response is cached only once it parses, and a
+        cached one that no longer does is evicted, so a malformed completion is
+        requested again rather than replayed.
+        """
+        data, cache_key, cached = self._chat(messages, **kwargs)
+        try:
+            try:
+                content = data["choices"][0]["message"]["content"]
+            except (KeyError, IndexError, TypeError) as e:
+                raise LLMRequestError(f"Unexpected Azure response shape: {e}")
+            if parse is not None:
+                content = parse(content)
+        except Exception:
+            if cached:
+                self.cache.delete(cache_key)
+            raise
+        if cache_key is not None and not cached:
+            self.cache.put(cache_key, data)
+        return content
+
+    def metrics(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            snapshot = dict(self.counters)
+
+        def pct(p):
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(p / 100.0 * len(latencies)))], 3)
+
+        snapshot["rate_limit_wait_s"] = round(snapshot["rate_limit_wait_s"], 3)
+        snapshot.update({"latency_p50_s": pct(50), "latency_p90_s": pct(90), "latency_p99_s": pct(99)})
+        if self.cache is not None:
+            snapshot.update(self.cache.stats())
+        return snapshot
+
+llm_transport = LLMTransport()
+metrics.register_collector("llm", llm_transport.metrics)
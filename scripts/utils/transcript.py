@@ -0,0 +1,151 @@
+import sys
+import numpy as np
+
+class WordSpan:
+    """
+    Zero-copy view over a contiguous run of words in a Transcript.
+    """
+    def __init__(self, transcript, w0, w1, text=None):
+        self.transcript = transcript
+        self.w0 = w0
+        self.w1 = w1
+        self.starts = transcript.word_starts[w0:w1]
+        self.ends = transcript.word_ends[w0:w1]
+        self.word_ids = transcript.word_ids[w0:w1]
+        self._text = text
+
+    def __len__(self):
+        return self.w1 - self.w0
+
+    @property
+    def start(self):
+        return float(self.starts[0]) if len(self) else None
+
+    @property
+    def end(self):
+        return float(self.ends[-1]) if len(self) else None
+
+    @property
+    def words(self):
+        vocab = self.transcript.vocab
+        return [vocab[i] for i in self.word_ids]
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = " ".join(w.strip() for w in self.words)
+        return self._text
+
+
+class Transcript:
+    """
+    Columnar transcript: word timings in NumPy arrays, word strings interned in a vocabulary,
+    segments as offsets into the word arrays.
+    """
+    def __init__(self, word_starts, word_ends, word_ids, vocab, seg_starts, seg_ends, seg_offsets, seg_texts):
+        self.word_starts = word_starts
+        self.word_ends = word_ends
+        self.word_ids = word_ids
+        self.vocab = vocab
+        self.seg_starts = seg_starts
+        self.seg_ends = seg_ends
+        # Segment i owns words seg_offsets[i]:seg_offsets[i + 1]
+        self.seg_offsets = seg_offsets
+        self.seg_texts = seg_texts
+
+    @classmethod
+    def from_segments(cls, segments):
+        """Builds from the word-level dict format returned by Transcriber.create_transcript."""
+        n_words = sum(len(seg["words"]) for seg in segments)
+        word_starts = np.empty(n_words, dtype=np.float64)
+        word_ends = np.empty(n_words, dtype=np.float64)
+        word_ids = np.empty(n_words, dtype=np.int32)
+        seg_offsets = np.empty(len(segments) + 1, dtype=np.int64)
+        vocab, lookup = [], {}
+
+        pos = 0
+        for i, seg in enumerate(segments):
+            seg_offsets[i] = pos
+            for w in seg["words"]:
+                token = w["word"]
+                wid = lookup.get(token)
+                if wid is None:
+                    wid = lookup[token] = len(vocab)
+                    vocab.append(sys.intern(token))
+                word_starts[pos] = w["start"]
+                word_ends[pos] = w["end"]
+                word_ids[pos] = wid
+                pos += 1
+        seg_offsets[len(segments)] = pos
+
+        return cls(
+            word_starts, word_ends, word_ids, vocab,
+            np.array([seg["segment_start"] for seg in segments], dtype=np.float64),
+            np.array([seg["segment_end"] for seg in segments], dtype=np.float64),
+            seg_offsets,
+            [seg["text"] for seg in segments],
+        )
+
+    def to_segments(self):
+        """Exports the word-level dict format (JSON-compatible)."""
+        vocab = self.vocab
+        starts = self.word_starts.tolist()
+        ends = self.word_ends.tolist()
+        ids = self.word_ids.tolist()
+        offsets = self.seg_offsets.tolist()
+
+        output = []
+        for i in range(self.num_segments):
+            w0, w1 = offsets[i], offsets[i + 1]
+            output.append({
+                "segment_index": i + 1,
+                "segment_start": float(self.seg_starts[i]),
+                "segment_end": float(self.seg_ends[i]),
+                "text": self.seg_texts[i],
+                "words": [
+                    {"word_index": j - w0 + 1, "word": vocab[ids[j]], "start": starts[j], "end": ends[j]}
+                    for j in range(w0, w1)
+                ]
+            })
+        return output
+
+    @property
+    def num_words(self):
+        return len(self.word_starts)
+
+    @property
+    def num_segments(self):
+        return len(self.seg_texts)
+
+    def segment(self, i):
+        return WordSpan(self, int(self.seg_offsets[i]), int(self.seg_offsets[i + 1]), text=self.seg_texts[i])
+
+    def word_range(self, t0, t1):
+        """Index range [w0, w1) of words overlapping the time range [t0, t1)."""
+        w0 = int(np.searchsorted(self.word_ends, t0, side="right"))
+        w1 = int(np.searchsorted(self.word_starts, t1, side="left"))
+        return w0, max(w0, w1)
+
+    def slice_time(self, t0, t1):
+        w0, w1 = self.word_range(t0, t1)
+        return WordSpan(self, w0, w1)
+
+    def split_by_words(self, num_splits=6):
+        """
+        Splits into `num_splits` parts of equal word count (the last takes the remainder).
+        Same output as VideoManager.split_transcript_by_words.
+        """
+        total = self.num_words
+        if not total:
+            return []
+
+        n = total // num_splits
+        bounds = np.arange(num_splits + 1) * n
+        bounds[-1] = total
+
+        splits = []
+        for w0, w1 in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            if w1 > w0:
+                span = WordSpan(self, w0, w1)
+                splits.append({"text": span.text, "start": span.start, "end": span.end})
+        return splits
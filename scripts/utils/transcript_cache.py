@@ -0,0 +1,128 @@
+import os
+import gzip
+import json
+import glob
+import hashlib
+import threading
+from config.settings import settings
+
+class TranscriptCache:
+    """
+    On-disk transcript cache keyed by media content hash and Whisper config.
+    Entries are gzipped compact JSON; least recently used entries are evicted past the size limit.
+    Media digests are kept under hashes/ so a restarted process does not re-read the file.
+    """
+    _hash_memo = {}
+    _lock = threading.Lock()
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = cache_dir or settings.TRANSCRIPT_CACHE_DIR
+        self.max_bytes = max_bytes if max_bytes is not None else settings.TRANSCRIPT_CACHE_MAX_MB * 1024 * 1024
+
+    def content_hash(self, media_path):
+        """SHA-256 of the file contents, memoized per (path, size, mtime) in memory and on disk."""
+        stat = os.stat(media_path)
+        memo_key = (os.path.abspath(media_path), stat.st_size, stat.st_mtime_ns)
+        if memo_key in self._hash_memo:
+            return self._hash_memo[memo_key]
+
+        memo_path = os.path.join(self.cache_dir, "hashes",
+                                 hashlib.sha256(memo_key[0].encode("utf-8")).hexdigest()[:16] + ".json")
+        try:
+            with open(memo_path, encoding="utf-8") as f:
+                memo = json.load(f)
+            if [memo["path"], memo["size"], memo["mtime_ns"]] == list(memo_key):
+                self._hash_memo[memo_key] = memo["sha256"]
+                return memo["sha256"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        h = hashlib.sha256()
+        with open(media_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        self._hash_memo[memo_key] = digest
+
+        os.makedirs(os.path.dirname(memo_path), exist_ok=True)
+        tmp_path = f"{memo_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"path": memo_key[0], "size": memo_key[1], "mtime_ns": memo_key[2], "sha256": digest}, f)
+        os.replace(tmp_path, memo_path)
+        return digest
+
+    def make_key(self, media_path, model_size, beam_size, sample_rate,
+                 device="cpu", compute_type="int8", chunk_seconds=None):
+        """
+        Cache key for one media file under one Whisper configuration. `chunk_seconds`
+        is set when the parallel chunked path produced the segments, whose boundaries
+        (and so output) differ from a single pass.
+        """
+        config = f"{model_size}|beam{beam_size}|sr{sample_rate}|{device}|{compute_type}"
+        if chunk_seconds:
+            config += f"|chunk{chunk_seconds:g}"
+        config_hash = hashlib.sha256(config.encode("utf-8")).hexdigest()[:12]
+        return f"{self.content_hash(media_path)}_{config_hash}"
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json.gz")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                segments = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Touch on hit so eviction order follows recency of use
+        os.utime(path, None)
+        return segments
+
+    def put(self, key, segments):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=5) as f:
+            json.dump(segments, f, separators=(",", ":"), ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def invalidate(self, media_path=None):
+        """
+        Drops cached transcripts for one media file (any Whisper config), or everything.
+        Returns the number of entries removed.
+        """
+        if media_path is None:
+            pattern = "*.json.gz"
+        else:
+            pattern = f"{self.content_hash(media_path)}_*.json.gz"
+
+        removed = 0
+        for path in glob.glob(os.path.join(self.cache_dir, pattern)):
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def evict(self):
+        """Removes least recently used entries until the cache fits in max_bytes."""
+        with self._lock:
+            entries = []
+            for path in glob.glob(os.path.join(self.cache_dir, "*.json.gz")):
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
@@ -0,0 +1,127 @@
+import re
+import numpy as np
+from config.settings import settings
+from scripts.utils.transcript import Transcript, WordSpan
+
+class TranscriptIndex:
+    """
+    Interval index over a Transcript's words and segments. Range queries bisect the
+    sorted start arrays and a running maximum of the ends (so overlapping intervals,
+    e.g. at parallel-chunk seams, are still found), and silence gaps between words
+    are precomputed as snap targets for event and clip boundaries.
+    Every query is O(log n); word_range/segment_range also take arrays of times.
+    """
+    def __init__(self, transcript, min_silence=None):
+        self.transcript = transcript
+        self.min_silence = settings.SNAP_MIN_SILENCE_SECONDS if min_silence is None else min_silence
+
+        t = transcript
+        self._word_max_ends = np.maximum.accumulate(t.word_ends) if t.num_words else t.word_ends
+        self._seg_max_ends = np.maximum.accumulate(t.seg_ends) if t.num_segments else t.seg_ends
+
+        # Gaps between consecutive words long enough to cut in; their midpoints are the snap targets
+        gap_starts = self._word_max_ends[:-1]
+        gap_ends = t.word_starts[1:]
+        keep = (gap_ends - gap_starts) >= self.min_silence
+        self.silence_starts = gap_starts[keep]
+        self.silence_ends = gap_ends[keep]
+        self.silences = (self.silence_starts + self.silence_ends) / 2.0
+        self._pattern_prefix = {}  # patterns -> running counts, see pattern_prefix()
+
+    @classmethod
+    def from_segments(cls, segments, min_silence=None):
+        """Builds from a Transcript or the word-level segment dicts."""
+        transcript = segments if isinstance(segments, Transcript) else Transcript.from_segments(segments)
+        return cls(transcript, min_silence=min_silence)
+
+    def word_range(self, t0, t1):
+        """Index range [w0, w1) of words overlapping [t0, t1)."""
+        w0 = np.searchsorted(self._word_max_ends, t0, side="right")
+        w1 = np.searchsorted(self.transcript.word_starts, t1, side="left")
+        return w0, np.maximum(w0, w1)
+
+    def segment_range(self, t0, t1):
+        """Index range [s0, s1) of segments overlapping [t0, t1]."""
+        s0 = np.searchsorted(self._seg_max_ends, t0, side="left")
+        s1 = np.searchsorted(self.transcript.seg_starts, t1, side="right")
+        return s0, np.maximum(s0, s1)
+
+    def pattern_prefix(self, patterns):
+        """
+        (num_segments + 1, len(patterns)) running counts of segments whose lowercased text
+        contains each pattern, so "does segment range [s0, s1) mention it" is two lookups.
+        Computed once per pattern tuple and kept for the life of the index.
+        """
+        key = tuple(patterns)
+        prefix = self._pattern_prefix.get(key)
+        if prefix is None:
+            texts = [t.lower() for t in self.transcript.seg_texts]
+            # One scan of the joined text per pattern; match offsets map back to segments
+            offsets = np.cumsum([0] + [len(t) + 1 for t in texts[:-1]])
+            joined = "\n".join(texts)
+            present = np.zeros((len(texts), len(key)), dtype=np.int32)
+            for j, pattern in enumerate(key):
+                hits = [m.start() for m in re.finditer(re.escape(pattern), joined)]
+                if hits:
+                    present[np.searchsorted(offsets, hits, side="right") - 1, j] = 1
+            prefix = np.vstack([np.zeros((1, len(key)), dtype=np.int32), np.cumsum(present, axis=0)])
+            self._pattern_prefix[key] = prefix
+        return prefix
+
+    def words_between(self, t0, t1):
+        w0, w1 = self.word_range(t0, t1)
+        return WordSpan(self.transcript, int(w0), int(w1))
+
+    def segments_between(self, t0, t1):
+        """Indices of the segments overlapping [t0, t1]."""
+        s0, s1 = self.segment_range(t0, t1)
+        return range(int(s0), int(s1))
+
+    def word_at(self, t):
+        """Index of the word whose span contains `t`, or None if `t` falls in a gap."""
+        i = int(np.searchsorted(self.transcript.word_starts, t, side="right")) - 1
+        if i >= 0 and t <= self.transcript.word_ends[i]:
+            return i
+        return None
+
+    def nearest_silence(self, t, direction=0, max_shift=None):
+        """
+        Midpoint of the closest silence gap to `t`: before it (direction < 0), after it
+        (direction > 0) or either side (0). None if there is none within `max_shift`.
+        """
+        if not len(self.silences):
+            return None
+        candidates = []
+        if direction <= 0:
+            i = int(np.searchsorted(self.silences, t, side="right"))
+            if i > 0:
+                candidates.append(self.silences[i - 1])
+        if direction >= 0:
+            i = int(np.searchsorted(self.silences, t, side="left"))
+            if i < len(self.silences):
+                candidates.append(self.silences[i])
+        if not candidates:
+            return None
+        best = float(min(candidates, key=lambda s: abs(s - t)))
+        if max_shift is not None and abs(best - t) > max_shift:
+            return None
+        return best
+
+    def snap(self, t0, t1, max_shift=None):
+        """
+        Widens [t0, t1] to the nearest silence gaps within `max_shift` so cuts fall between
+        words; failing that, to the edges of any word the boundary lands inside.
+        """
+        max_shift = settings.SNAP_MAX_SHIFT_SECONDS if max_shift is None else max_shift
+        t = self.transcript
+
+        start = self.nearest_silence(t0, direction=-1, max_shift=max_shift)
+        if start is None:
+            i = self.word_at(t0)
+            start = float(t.word_starts[i]) if i is not None else t0
+
+        end = self.nearest_silence(t1, direction=1, max_shift=max_shift)
+        if end is None:
+            i = self.word_at(t1)
+            end = float(t.word_ends[i]) if i is not None else t1
+        return max(0.0, start), max(start, end)
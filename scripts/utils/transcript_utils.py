@@ -2,7 +2,11 @@ import re
 import math
 from datetime import timedelta
 from typing import List, Dict, Optional
-from config.settings import settings
+import numpy as np
+from scripts.utils.keyword_index import keyword_index
+from scripts.utils.instrumentation import metrics
+
+_TIME_RE = re.compile(r"^(\d{1,2}):(\d{2}):(\d{2})(?:[.,](\d+))?$")
 
 class TranscriptUtils:
     """
@@ -35,25 +39,48 @@ class TranscriptUtils:
     def parse_time_str(s: str) -> Optional[float]:
         """Parse text timestamps (e.g., '00:01:23.500') into float seconds."""
         if not s: return None
-        s = s.strip().strip("[]()")
-        m = re.match(r"^(\d{1,2}):(\d{2}):(\d{2})(?:[.,](\d+))?$", s)
+        m = _TIME_RE.match(s.strip().strip("[]()"))
         if m:
             h = int(m.group(1))
             mm = int(m.group(2))
             ss = int(m.group(3))
-            ms = int(m.group(4)) if m.group(4) else 0
-            ms_norm = ms
-            if m.group(4):
-                digits = len(m.group(4))
-                if digits < 3:
-                    ms_norm = int(m.group(4) * (10 ** (3 - digits)))
-                elif digits > 3:
-                    ms_norm = int(m.group(4)[:3])
+            # Fraction digits are read as milliseconds: ".5" -> 500, ".1234" -> 123
+            ms_norm = int((m.group(4) + "00")[:3]) if m.group(4) else 0
             return h*3600 + mm*60 + ss + ms_norm/1000.0
         return None
 
+    @staticmethod
+    def coerce_time(value) -> Optional[float]:
+        """
+        Seconds from an LLM-reported time, which may be a timestamp string, a number
+        of seconds or null. Returns None for anything else.
+        """
+        if isinstance(value, str):
+            return TranscriptUtils.parse_time_str(value)
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+            return float(value)
+        return None
+
+    @staticmethod
+    def parse_time_array(values) -> np.ndarray:
+        """parse_time_str over many values at once; unparseable entries are NaN."""
+        out = np.full(len(values), np.nan)
+        for i, s in enumerate(values):
+            if not s or not isinstance(s, str):
+                continue
+            m = _TIME_RE.match(s.strip().strip("[]()"))
+            if m:
+                frac = m.group(4)
+                out[i] = (int(m.group(1)) * 3600 + int(m.group(2)) * 60 + int(m.group(3))
+                          + (int((frac + "00")[:3]) / 1000.0 if frac else 0.0))
+        return out
+
     @staticmethod
     def prefilter_segments(segments: List[Dict]) -> List[Dict]:
         """Return only segments containing relevant cricket keywords."""
-        kw_regex = re.compile(r"\b(" + "|".join(re.escape(k) for k in settings.KEYWORDS) + r")\b", flags=re.I)
-        return [s for s in segments if kw_regex.search(s["text"])]
\ No newline at end of file
+        has_keyword = keyword_index.has_keyword
+        with metrics.span("transcript.prefilter") as span:
+            kept = [s for s in segments if has_keyword(s["text"])]
+            span.count("segments", len(segments))
+            span.count("candidates", len(kept))
+        return kept
\ No newline at end of file
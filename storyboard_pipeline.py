@@ -5,37 +5,49 @@ from scripts.detection.transcriber import Transcriber
 from scripts.media.video_manager import VideoManager
 from scripts.media.image_manager import ImageProcessor
 from scripts.generation.storyboard_analyzer import StoryboardAnalyzer
+from scripts.utils.transcript_index import TranscriptIndex
+from scripts.utils.instrumentation import metrics
 
-def StoryBoard_creator(video_path):
-    
+def StoryBoard_creator(video_path, outputs=None):
+    """
+    Builds a six-scene storyboard for `video_path`: frames, LLM scene analysis and
+    pencil sketches. Returns the analysis, or None if the video is missing.
+    `outputs` (settings.output_paths()) says where files are written.
+    """
     if not os.path.exists(video_path):
         print("❌ Video file not found.")
         return
+    outputs = outputs or settings.output_paths()
 
     # 2. Transcription
     transcriber = Transcriber()
-    # Returns word-level timestamps
-    whisper_data = transcriber.create_transcript(video_path)
+    # Returns word-level timestamps, kept in columnar form (and indexed) from here on
+    whisper_data = TranscriptIndex.from_segments(transcriber.create_transcript(video_path))
 
     # 3. Split Logic (Divide into 6 scenes)
     video_mgr = VideoManager()
     splits = video_mgr.split_transcript_by_words(whisper_data, num_splits=6)
     
-    # 4. Generate Clips & Extract Frames
-    video_mgr.generate_clips(video_path, splits)
-    video_mgr.extract_random_frames()
+    # 4. Extract Frames (seeking in the source) & optionally cut scene clips
+    if settings.STORYBOARD_GENERATE_CLIPS:
+        video_mgr.generate_clips(video_path, splits, output_dir=outputs["clips"])
+    frames = video_mgr.extract_random_frames(video_path, splits, candidates=settings.STORYBOARD_FRAME_CANDIDATES,
+                                             output_dir=outputs["frames"])
 
     # 5. Analyze Scenes (LLM)
     analyzer = StoryboardAnalyzer()
-    analysis_result = analyzer.analyze_scenes(splits)
+    analysis_result = analyzer.analyze_scenes(splits, frames_dir=outputs["frames"])
     
     # Save Analysis
-    with open(settings.ANALYSIS_OUTPUT_FILE, "w", encoding="utf-8") as f:
+    os.makedirs(os.path.dirname(outputs["analysis"]), exist_ok=True)
+    with open(outputs["analysis"], "w", encoding="utf-8") as f:
         json.dump(analysis_result, f, indent=2, ensure_ascii=False)
-    print(f"✅ Analysis saved to {settings.ANALYSIS_OUTPUT_FILE}")
+    print(f"✅ Analysis saved to {outputs['analysis']}")
 
     # 6. Create Pencil Sketches
     img_processor = ImageProcessor()
-    img_processor.process_all_frames()
+    img_processor.process_all_frames(frames, output_dir=outputs["sketches"])
 
     print("\n🎉 Automated Storyboard Process Complete!")
+    metrics.write_report()
+    return analysis_result